@@ -7,14 +7,20 @@ Agente local que fornece uma API REST para automaÃ§Ã£o do Obsidian
 import os
 import sys
 import json
+import base64
 import logging
 import subprocess
 import secrets
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from intelligent_agent import IntelligentAgent
+from vault_index import get_vault_index
+from vault_watcher import index_note, start_watcher, stop_watchers
+from obsidian_advanced import ObsidianAdvanced
+from date_index import period_range
+import http_pool
 
 # Configuração de logging (deve vir antes de usar logger)
 logging.basicConfig(
@@ -47,6 +53,7 @@ DEFAULT_CONFIG = {
     'port': 5001,
     'api_key': f'BO_{secrets.token_urlsafe(32)}',
     'obsidian_path': None,
+    'hub_url': 'http://localhost:5002',
 }
 
 def load_config():
@@ -108,6 +115,40 @@ def require_auth(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+def sse_event(event: str, data: dict) -> str:
+    """Evento Server-Sent Events com dados em JSON"""
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+def sse_response(events) -> Response:
+    """Resposta text/event-stream enviada à medida que os eventos são gerados"""
+    return Response(events, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # proxies não devem acumular o stream
+    })
+
+def vault_file(vault_path: str, rel_path: str):
+    """Caminho de uma nota dentro do vault (None se o caminho informado sai do vault)"""
+    vault = Path(vault_path).resolve()
+    full_path = (vault / rel_path).resolve()
+    if full_path == vault or not full_path.is_relative_to(vault):
+        return None
+    return full_path
+
+# Maior offset aceito na paginação dos endpoints
+MAX_OFFSET = 10 ** 9
+
+def int_param(value, default: int, minimum: int = 1, maximum: int = 1000) -> int:
+    """Inteiro de um parâmetro da requisição limitado a [minimum, maximum] (ValueError se inválido)"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f'Número inteiro inválido: {value!r}')
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Número inteiro inválido: {value!r}')
+    return min(max(number, minimum), maximum)
+
 # ==================== ENDPOINTS ====================
 
 @app.route('/health', methods=['GET'])
@@ -285,10 +326,39 @@ def command_execute():
             'error': str(e)
         }), 500
 
+def note_record(vault: Path, rel_path: str, mtime: float, size: int) -> dict:
+    """Representação de uma nota nas listagens"""
+    return {
+        'name': Path(rel_path).stem,
+        'path': rel_path,
+        'full_path': str(vault / rel_path),
+        'size': size,
+        'modified': datetime.fromtimestamp(mtime).isoformat()
+    }
+
+def encode_cursor(sort: str, order: str, key: tuple) -> str:
+    """Cursor opaco para a próxima página"""
+    raw = json.dumps({'s': sort, 'o': order, 'k': list(key)}, ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str, sort: str, order: str) -> tuple:
+    """Chave de continuação contida no cursor (ValueError se inválido)"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError('cursor inválido')
+    if data.get('s') != sort or data.get('o') != order:
+        raise ValueError('cursor não corresponde a sort/order da consulta')
+    return tuple(data['k'])
+
 @app.route('/obsidian/notes', methods=['GET'])
 @require_auth
 def obsidian_notes():
-    """Lista todas as notas do vault"""
+    """
+    Lista as notas do vault.
+    ?limit=N&cursor=...&sort=path|mtime&order=asc|desc para paginar;
+    ?format=ndjson para receber uma nota por linha enquanto o vault é percorrido.
+    """
     try:
         config = load_config()
         vault_path = config.get('vault_path')
@@ -299,24 +369,59 @@ def obsidian_notes():
                 'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
             }), 404
         
-        notes = []
         vault = Path(vault_path)
+        index = get_vault_index(vault_path)
+        
+        if request.args.get('format') == 'ndjson':
+            def generate():
+                for rel_path, mtime, size in index.walk():
+                    yield json.dumps(note_record(vault, rel_path, mtime, size), ensure_ascii=False) + '\n'
+            
+            return Response(generate(), mimetype='application/x-ndjson')
+        
+        try:
+            limit = int_param(request.args.get('limit'), None, minimum=0)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit deve ser um número inteiro'}), 400
         
-        for md_file in vault.rglob('*.md'):
-            notes.append({
-                'name': md_file.stem,
-                'path': str(md_file.relative_to(vault)),
-                'full_path': str(md_file),
-                'size': md_file.stat().st_size,
-                'modified': datetime.fromtimestamp(md_file.stat().st_mtime).isoformat()
+        if limit is None:
+            notes = [note_record(vault, *item) for item in index.list_files()]
+            logger.info(f'Listadas {len(notes)} notas')
+            return jsonify({
+                'success': True,
+                'notes': notes,
+                'count': len(notes)
             })
         
-        logger.info(f'Listadas {len(notes)} notas')
+        sort = request.args.get('sort', 'path')
+        order = request.args.get('order', 'desc' if sort == 'mtime' else 'asc')
+        if sort not in ('path', 'mtime') or order not in ('asc', 'desc') or limit < 1:
+            return jsonify({
+                'success': False,
+                'error': 'Parâmetros inválidos (sort: path|mtime, order: asc|desc, limit >= 1)'
+            }), 400
+        
+        cursor = request.args.get('cursor')
+        try:
+            after = decode_cursor(cursor, sort, order) if cursor else None
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # Busca um item a mais para saber se existe próxima página
+        page = index.page_files(sort=sort, after=after, limit=limit + 1, descending=(order == 'desc'))
+        has_more = len(page) > limit
+        page = page[:limit]
+        
+        next_cursor = None
+        if has_more:
+            rel_path, mtime, _ = page[-1]
+            next_cursor = encode_cursor(sort, order, (mtime, rel_path) if sort == 'mtime' else (rel_path,))
         
         return jsonify({
             'success': True,
-            'notes': notes,
-            'count': len(notes)
+            'notes': [note_record(vault, *item) for item in page],
+            'count': len(page),
+            'next_cursor': next_cursor
         })
     except Exception as e:
         logger.error(f'Erro ao listar notas: {str(e)}')
@@ -349,8 +454,14 @@ def obsidian_note_create():
                 'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
             }), 404
         
-        # Criar arquivo da nota
-        note_path = Path(vault_path) / f'{title}.md'
+        # Criar arquivo da nota (o título pode incluir subpastas: "Projetos/X")
+        note_path = vault_file(vault_path, f'{title}.md')
+        
+        if note_path is None:
+            return jsonify({
+                'success': False,
+                'error': f'Título inválido: {title}'
+            }), 400
         
         if note_path.exists():
             return jsonify({
@@ -358,9 +469,12 @@ def obsidian_note_create():
                 'error': f'Nota "{title}" jÃ¡ existe'
             }), 409
         
+        note_path.parent.mkdir(parents=True, exist_ok=True)
         with open(note_path, 'w', encoding='utf-8') as f:
             f.write(content)
         
+        # Pelo watcher, quando ativo, para que o Hub receba o evento de criação
+        index_note(vault_path, note_path.relative_to(Path(vault_path).resolve()).as_posix())
         logger.info(f'Nota criada: {title}')
         
         return jsonify({
@@ -381,7 +495,8 @@ def obsidian_note_search():
     """Busca conteÃºdo nas notas do vault"""
     try:
         data = request.get_json()
-        query = data.get('query', '').lower()
+        # Sem lower(): AND, OR, NOT e NEAR/k são operadores apenas em maiúsculas
+        query = data.get('query', '').strip()
         
         if not query:
             return jsonify({
@@ -398,33 +513,19 @@ def obsidian_note_search():
                 'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
             }), 404
         
-        results = []
-        vault = Path(vault_path)
+        ranked = bool(data.get('ranked'))
+        try:
+            limit = int_param(data.get('limit'), 10 if ranked else 100)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit deve ser um número inteiro'}), 400
         
-        for md_file in vault.rglob('*.md'):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    if query in content.lower():
-                        # Encontrar contexto
-                        lines = content.split('\n')
-                        matches = []
-                        for i, line in enumerate(lines):
-                            if query in line.lower():
-                                matches.append({
-                                    'line': i + 1,
-                                    'text': line.strip()
-                                })
-                        
-                        results.append({
-                            'name': md_file.stem,
-                            'path': str(md_file.relative_to(vault)),
-                            'full_path': str(md_file),
-                            'matches': matches[:5]  # Limitar a 5 matches por arquivo
-                        })
-            except Exception as e:
-                logger.warning(f'Erro ao ler arquivo {md_file}: {str(e)}')
-                continue
+        index = get_vault_index(vault_path)
+        if ranked:
+            # Ranqueada por relevância (BM25), com trechos destacados das k melhores
+            search = index.ranked_search(query, limit=limit)
+        else:
+            search = index.search(query, limit=limit)
+        results = search['results']
         
         logger.info(f'Busca por "{query}" retornou {len(results)} resultados')
         
@@ -432,7 +533,8 @@ def obsidian_note_search():
             'success': True,
             'query': query,
             'results': results,
-            'count': len(results)
+            'count': len(results),
+            'total': search['total']
         })
     except Exception as e:
         logger.error(f'Erro ao buscar em notas: {str(e)}')
@@ -441,6 +543,36 @@ def obsidian_note_search():
             'error': str(e)
         }), 500
 
+@app.route('/obsidian/autocomplete', methods=['GET'])
+@require_auth
+def obsidian_autocomplete():
+    """Sugestões de notas e tags para o que está sendo digitado: ?prefix=&limit=&types=notes,tags"""
+    try:
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        kinds = [k for k in request.args.get('types', 'notes,tags').split(',') if k in ('notes', 'tags')]
+        if not kinds:
+            return jsonify({'success': False, 'error': 'types deve conter notes e/ou tags'}), 400
+        
+        result = ObsidianAdvanced(vault_path).autocomplete(
+            request.args.get('prefix', ''),
+            limit=min(max(request.args.get('limit', 10, type=int), 1), 100),
+            kinds=kinds
+        )
+        result['success'] = True
+        
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f'Erro no autocompletar: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/obsidian/vault/configure', methods=['POST'])
 @require_auth
 def obsidian_vault_configure():
@@ -466,6 +598,9 @@ def obsidian_vault_configure():
         config['vault_path'] = str(path)
         save_config(config)
         
+        stop_watchers()
+        start_watcher(str(path), config.get('hub_url', DEFAULT_CONFIG['hub_url']))
+        
         logger.info(f'Vault configurado: {vault_path}')
         
         return jsonify({
@@ -480,6 +615,42 @@ def obsidian_vault_configure():
             'error': str(e)
         }), 500
 
+def add_decision_info(response_text: str, command: str, analysis: dict) -> str:
+    """Adiciona a informação da decisão na resposta (antes do [Via ...])"""
+    if command == 'ask_ai' and DECISION_LOGIC_AVAILABLE:
+        category = analysis.get('category', 'conversation').upper()
+        confidence = analysis.get('confidence', 0)
+        decision_info = f"\n\n[🧠 Decisão: {category} | Confiança: {confidence:.0%}]"
+        if '[Via ' in response_text:
+            response_text = response_text.replace('[Via ', f'{decision_info}\n[Via ')
+        else:
+            response_text += decision_info
+    return response_text
+
+def stream_process(command_result: dict, api_result: dict, analysis: dict):
+    """
+    Eventos SSE de /intelligent/process: start, token (trechos da resposta da IA)
+    e done com a resposta final completa (incluindo a informação da decisão)
+    """
+    command = command_result['command']
+    yield sse_event('start', {'command': command, 'decision': analysis if DECISION_LOGIC_AVAILABLE else None})
+    try:
+        parts = []
+        for text in intelligent_agent.generate_response_stream(command_result, api_result):
+            parts.append(text)
+            yield sse_event('token', {'text': text})
+        logger.info(f'Comando processado (stream): {command}')
+        yield sse_event('done', {
+            'success': True,
+            'command': command,
+            'response': add_decision_info(''.join(parts), command, analysis),
+            'decision': analysis if DECISION_LOGIC_AVAILABLE else None,
+            'data': api_result.get('data')
+        })
+    except Exception as e:
+        logger.error(f'Erro ao processar comando: {str(e)}')
+        yield sse_event('error', {'success': False, 'error': str(e)})
+
 @app.route('/intelligent/process', methods=['POST'])
 @require_auth
 def intelligent_process():
@@ -524,10 +695,10 @@ def intelligent_process():
             vault_path = config.get('vault_path')
             if vault_path and Path(vault_path).exists():
                 notes = []
-                for md_file in Path(vault_path).rglob('*.md'):
+                for rel_path, _, _ in get_vault_index(vault_path).list_files():
                     notes.append({
-                        'name': md_file.stem,
-                        'path': str(md_file.relative_to(vault_path))
+                        'name': Path(rel_path).stem,
+                        'path': rel_path
                     })
                 api_result = {'success': True, 'data': notes}
             else:
@@ -540,10 +711,14 @@ def intelligent_process():
                 config = load_config()
                 vault_path = config.get('vault_path')
                 if vault_path and Path(vault_path).exists():
-                    note_path = Path(vault_path) / f'{title}.md'
-                    if not note_path.exists():
+                    note_path = vault_file(vault_path, f'{title}.md')
+                    if note_path is None:
+                        api_result = {'success': False, 'error': f'Título inválido: {title}'}
+                    elif not note_path.exists():
+                        note_path.parent.mkdir(parents=True, exist_ok=True)
                         with open(note_path, 'w', encoding='utf-8') as f:
                             f.write(content)
+                        index_note(vault_path, note_path.relative_to(Path(vault_path).resolve()).as_posix())
                         api_result = {'success': True}
                     else:
                         api_result = {'success': False, 'error': 'Nota jÃ¡ existe'}
@@ -558,14 +733,8 @@ def intelligent_process():
                 config = load_config()
                 vault_path = config.get('vault_path')
                 if vault_path and Path(vault_path).exists():
-                    results = []
-                    for md_file in Path(vault_path).rglob('*.md'):
-                        try:
-                            with open(md_file, 'r', encoding='utf-8') as f:
-                                if query.lower() in f.read().lower():
-                                    results.append({'name': md_file.stem})
-                        except:
-                            continue
+                    search = get_vault_index(vault_path).search(query, limit=None, max_matches=0)
+                    results = [{'name': r['name']} for r in search['results']]
                     api_result = {'success': True, 'data': results}
                 else:
                     api_result = {'success': False, 'error': 'Vault nÃ£o configurado'}
@@ -600,18 +769,12 @@ def intelligent_process():
             else:
                 api_result = {"success": False, "error": "Comando nao especificado"}
         
+        if data.get('stream'):
+            return sse_response(stream_process(command_result, api_result, analysis))
+        
         # Gerar resposta inteligente
         response_text = intelligent_agent.generate_response(command_result, api_result)
-        
-        # Adicionar informação da decisão na resposta
-        if command == 'ask_ai' and DECISION_LOGIC_AVAILABLE:
-            category = analysis.get('category', 'conversation').upper()
-            confidence = analysis.get('confidence', 0)
-            decision_info = f"\n\n[🧠 Decisão: {category} | Confiança: {confidence:.0%}]"
-            if '[Via ' in response_text:
-                response_text = response_text.replace('[Via ', f'{decision_info}\n[Via ')
-            else:
-                response_text += decision_info
+        response_text = add_decision_info(response_text, command, analysis)
         
         logger.info(f'Comando processado: {command}')
         
@@ -645,9 +808,359 @@ def get_config():
 
 
 
+# ==================== ADVANCED ENDPOINTS ====================
+
+@app.route('/obsidian/advanced/backlinks', methods=['POST'])
+@require_auth
+def obsidian_advanced_backlinks():
+    """Encontra backlinks para uma nota (via índice de links)"""
+    try:
+        data = request.get_json()
+        note_name = data.get('note_name')
+        
+        if not note_name:
+            return jsonify({'success': False, 'error': 'note_name é obrigatório'}), 400
+        
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        backlinks = ObsidianAdvanced(vault_path).get_backlinks(note_name)
+        
+        return jsonify({
+            'success': True,
+            'note_name': note_name,
+            'backlinks': backlinks,
+            'count': len(backlinks)
+        })
+    except Exception as e:
+        logger.error(f'Erro ao buscar backlinks: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/tags', methods=['POST'])
+@require_auth
+def obsidian_advanced_tags():
+    """Encontra notas por tag (hierárquica) ou por expressão AND/OR/NOT"""
+    try:
+        data = request.get_json()
+        tag = data.get('tag')
+        query = data.get('query')
+        
+        if not tag and not query:
+            return jsonify({'success': False, 'error': 'tag ou query é obrigatório'}), 400
+        
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        advanced = ObsidianAdvanced(vault_path)
+        try:
+            notes = advanced.query_tags(query) if query else advanced.find_notes_by_tag(tag)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'tag': tag,
+            'query': query,
+            'notes': notes,
+            'count': len(notes)
+        })
+    except Exception as e:
+        logger.error(f'Erro ao buscar tags: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/graph', methods=['GET'])
+@require_auth
+def obsidian_advanced_graph():
+    """Gera dados do grafo do vault; com ?since=<versão> retorna apenas o delta"""
+    try:
+        since = request.args.get('since', type=int)
+        
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        graph = ObsidianAdvanced(vault_path).generate_graph_data(since=since)
+        graph['success'] = True
+        
+        return jsonify(graph)
+    except Exception as e:
+        logger.error(f'Erro ao gerar grafo: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/links/report', methods=['GET'])
+@require_auth
+def obsidian_advanced_links_report():
+    """Links não resolvidos e notas órfãs: ?kind=all|unresolved|orphans&limit=&offset="""
+    try:
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        try:
+            result = ObsidianAdvanced(vault_path).link_report(
+                kind=request.args.get('kind', 'all'),
+                limit=int_param(request.args.get('limit'), 100),
+                offset=int_param(request.args.get('offset'), 0, minimum=0, maximum=MAX_OFFSET)
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        result['success'] = True
+        
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f'Erro ao gerar relatório de links: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/dates', methods=['GET'])
+@require_auth
+def obsidian_advanced_dates():
+    """Notas por data: ?start=AAAA-MM-DD&end=AAAA-MM-DD ou ?period=today|week|last_week|month|..."""
+    try:
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        start = request.args.get('start')
+        end = request.args.get('end')
+        period = request.args.get('period')
+        
+        try:
+            if period:
+                start, end = period_range(period)
+            notes = ObsidianAdvanced(vault_path).notes_by_date(start, end)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'start': start,
+            'end': end,
+            'period': period,
+            'notes': notes,
+            'count': len(notes)
+        })
+    except Exception as e:
+        logger.error(f'Erro ao buscar notas por data: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/tasks', methods=['GET'])
+@require_auth
+def obsidian_advanced_tasks():
+    """Tarefas do vault: ?status=open|done|all&due_before=AAAA-MM-DD&tag=&folder=&limit=&offset="""
+    try:
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        try:
+            result = ObsidianAdvanced(vault_path).query_tasks(
+                status=request.args.get('status', 'open'),
+                due_before=request.args.get('due_before'),
+                tag=request.args.get('tag'),
+                folder=request.args.get('folder'),
+                limit=int_param(request.args.get('limit'), 100),
+                offset=int_param(request.args.get('offset'), 0, minimum=0, maximum=MAX_OFFSET)
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        result['success'] = True
+        result['count'] = len(result['tasks'])
+        
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f'Erro ao listar tarefas: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/resolve', methods=['POST'])
+@require_auth
+def obsidian_advanced_resolve():
+    """Resolve um link ([[Nota#Seção]] ou ![[Nota#^id]]) e retorna o trecho apontado"""
+    try:
+        data = request.get_json()
+        link = data.get('link')
+        
+        if not link:
+            return jsonify({'success': False, 'error': 'link é obrigatório'}), 400
+        
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        try:
+            fragment = ObsidianAdvanced(vault_path).read_fragment(link)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        if fragment is None:
+            return jsonify({'success': False, 'error': f'Alvo do link não encontrado: {link}'}), 404
+        
+        fragment['success'] = True
+        return jsonify(fragment)
+    except Exception as e:
+        logger.error(f'Erro ao resolver link: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/render', methods=['POST'])
+@require_auth
+def obsidian_advanced_render():
+    """Conteúdo de uma nota (ou texto informado) com os embeds ![[...]] expandidos"""
+    try:
+        data = request.get_json()
+        note_path = data.get('path')
+        content = data.get('content')
+        
+        if not note_path and content is None:
+            return jsonify({'success': False, 'error': 'Informe path ou content'}), 400
+        
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        try:
+            max_depth = int_param(data.get('max_depth'), 3, maximum=10)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'max_depth deve ser um número inteiro'}), 400
+        
+        if note_path:
+            full_path = vault_file(vault_path, note_path)
+            if full_path is None:
+                return jsonify({'success': False, 'error': f'Caminho fora do vault: {note_path}'}), 400
+            if not full_path.is_file():
+                return jsonify({'success': False, 'error': 'Nota não encontrada'}), 404
+            with open(full_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        
+        rendered = ObsidianAdvanced(vault_path).render_embeds(content, max_depth=max_depth)
+        
+        return jsonify({'success': True, 'path': note_path, 'content': rendered})
+    except Exception as e:
+        logger.error(f'Erro ao renderizar embeds: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/dataview', methods=['POST'])
+@require_auth
+def obsidian_advanced_dataview():
+    """Executa uma query estilo Dataview (LIST/TABLE, FROM, WHERE, SORT, LIMIT)"""
+    try:
+        data = request.get_json()
+        query = data.get('query')
+        
+        if not query:
+            return jsonify({'success': False, 'error': 'query é obrigatório'}), 400
+        
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        try:
+            result = ObsidianAdvanced(vault_path).dataview_query(query)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        result['success'] = True
+        result['query'] = query
+        result['count'] = len(result['results'])
+        
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f'Erro ao executar query dataview: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/obsidian/advanced/find', methods=['POST'])
+@require_auth
+def obsidian_advanced_find():
+    """Consulta combinada: pasta, tags, texto e data de modificação (com explain opcional)"""
+    try:
+        data = request.get_json() or {}
+        
+        config = load_config()
+        vault_path = config.get('vault_path')
+        
+        if not vault_path or not Path(vault_path).exists():
+            return jsonify({
+                'success': False,
+                'error': 'Caminho do vault nÃ£o configurado ou nÃ£o encontrado'
+            }), 404
+        
+        try:
+            limit = int_param(data.get('limit'), 100)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit deve ser um número inteiro'}), 400
+        
+        try:
+            result = ObsidianAdvanced(vault_path).find_notes(
+                folder=data.get('folder'),
+                tag=data.get('tag'),
+                text=data.get('text'),
+                modified_since=data.get('modified_since'),
+                limit=limit,
+                explain=bool(data.get('explain'))
+            )
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        result['success'] = True
+        result['count'] = len(result['results'])
+        
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f'Erro ao executar consulta combinada: {str(e)}')
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # ==================== AI INTEGRATION ENDPOINTS ====================
 
-from ai_integration import ai_integration, configure_ai, set_ai_provider, get_ai_status, list_ai_providers, chat_with_ai, set_fallback_providers
+from ai_integration import ai_integration, configure_ai, set_ai_provider, get_ai_status, list_ai_providers, chat_with_ai, chat_with_ai_stream, set_fallback_providers, set_ai_hedging
+from ai_integration import get_ai_cache_stats, configure_ai_cache, clear_ai_cache
 
 @app.route('/ai/status', methods=['GET'])
 def ai_status():
@@ -698,6 +1211,21 @@ def ai_set_fallback():
     result = set_fallback_providers(providers)
     return jsonify(result)
 
+@app.route('/ai/set-hedging', methods=['POST'])
+@require_auth
+def ai_set_hedging():
+    """Liga/desliga a corrida entre o provedor ativo e os fallbacks"""
+    data = request.get_json() or {}
+    
+    if 'enabled' not in data:
+        return jsonify({'success': False, 'error': 'enabled é obrigatório'}), 400
+    
+    try:
+        result = set_ai_hedging(bool(data['enabled']), data.get('delay'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'delay deve ser um número de segundos'}), 400
+    return jsonify(result)
+
 @app.route('/ai/chat', methods=['POST'])
 @require_auth
 def ai_chat():
@@ -706,13 +1234,51 @@ def ai_chat():
     message = data.get('message')
     context = data.get('context')
     provider = data.get('provider')  # Opcional: força um provedor específico
+    hedge = data.get('hedge')        # Opcional: corrida entre provedores só nesta mensagem
+    use_cache = data.get('cache', True)  # false: ignora o cache de respostas nesta mensagem
     
     if not message:
         return jsonify({'success': False, 'error': 'message é obrigatório'}), 400
     
-    result = chat_with_ai(message, context, provider=provider)
+    if data.get('stream'):
+        def generate():
+            for event in chat_with_ai_stream(message, context, provider=provider, use_cache=use_cache):
+                yield sse_event(event.pop('type'), event)
+        
+        return sse_response(generate())
+    
+    result = chat_with_ai(message, context, provider=provider, hedge=hedge, use_cache=use_cache)
+    return jsonify(result)
+
+@app.route('/ai/cache', methods=['GET'])
+@require_auth
+def ai_cache_stats():
+    """Estatísticas do cache de respostas (taxa de acerto, latência economizada)"""
+    return jsonify({'success': True, 'cache': get_ai_cache_stats()})
+
+@app.route('/ai/cache/configure', methods=['POST'])
+@require_auth
+def ai_cache_configure():
+    """Configura o cache de respostas (enabled, ttl em segundos, max_entries, max_bytes)"""
+    data = request.get_json() or {}
+    
+    try:
+        result = configure_ai_cache(
+            enabled=data.get('enabled'),
+            ttl=data.get('ttl'),
+            max_entries=data.get('max_entries'),
+            max_bytes=data.get('max_bytes')
+        )
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'ttl, max_entries e max_bytes devem ser números inteiros'}), 400
     return jsonify(result)
 
+@app.route('/ai/cache/clear', methods=['POST'])
+@require_auth
+def ai_cache_clear():
+    """Limpa o cache de respostas"""
+    return jsonify(clear_ai_cache())
+
 @app.route('/ai/test', methods=['POST'])
 @require_auth
 def ai_test():
@@ -724,7 +1290,7 @@ def ai_test():
         return jsonify({'success': False, 'error': 'provider é obrigatório'}), 400
     
     # Envia uma mensagem de teste
-    result = chat_with_ai("Olá! Responda apenas com 'OK' se você está funcionando.", provider=provider)
+    result = chat_with_ai("Olá! Responda apenas com 'OK' se você está funcionando.", provider=provider, use_cache=False)
     
     if result.get('success'):
         return jsonify({
@@ -751,6 +1317,13 @@ def main():
     logger.info(f'API Key: {config.get("api_key")}')
     logger.info(f'Arquivo de configuraÃ§Ã£o: {CONFIG_FILE}')
     
+    # Pool de conexões dos clientes de IA (seção http_pool: pool_connections, pool_maxsize, retries, backoff_factor)
+    http_pool.configure_http_pool(**http_pool.pool_settings(config.get('http_pool')))
+    
+    vault_path = config.get('vault_path')
+    if vault_path and Path(vault_path).exists():
+        start_watcher(vault_path, config.get('hub_url', DEFAULT_CONFIG['hub_url']))
+    
     port = config.get('port', 5001)
     logger.info(f'Servidor rodando em http://localhost:{port}')
     logger.info('Pressione Ctrl+C para parar')
@@ -764,6 +1337,7 @@ def main():
         )
     except KeyboardInterrupt:
         logger.info('Agente parado pelo usuÃ¡rio')
+        stop_watchers()
         sys.exit(0)
 
 
@@ -7,14 +7,37 @@ Suporta: GPT, Claude, Gemini, Grok, Manus, Genspark, Abacus
 
 import os
 import json
-import requests
-from typing import Dict, Any, Optional, List
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Iterator, Optional, List
+
+import http_pool
+from llm_cache import LLMCache, cache_key, DEFAULT_TTL, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+
+# Cache em disco das respostas
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.obsidian-agent', 'llm_cache.db')
+
+# Threads das chamadas em corrida (hedging); as perdedoras são abandonadas no próximo trecho recebido
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='ai-hedge')
 
 
 class AIIntegration:
     """Classe para integração com múltiplas IAs"""
     
     VERSION = "5.0.0"
+    TEMPERATURE = 0.7
+    
+    # Provedores cujas chamadas têm efeito colateral (não são cacheadas)
+    UNCACHED_PROVIDERS = ('manus',)
+    
+    # Corrida entre provedores (hedging)
+    DEFAULT_HEDGE_DELAY = 3.0     # segundos, enquanto não há amostras para o p95
+    MIN_HEDGE_DELAY = 0.25
+    LATENCY_SAMPLES = 50
+    MIN_LATENCY_SAMPLES = 5
     
     def __init__(self):
         self.providers = {
@@ -93,8 +116,16 @@ class AIIntegration:
         }
         self.active_provider = None
         self.fallback_providers = []  # Lista de provedores para fallback
+        self.hedging = False          # Corrida entre provedor ativo e fallbacks
+        self.hedge_delay = None       # Segundos antes do próximo provedor (None = p95 da latência)
+        self.latencies = {}           # provedor -> latências recentes (s) das respostas com sucesso
+        self._latency_lock = threading.Lock()
+        self.cache_settings = {'enabled': True, 'ttl': DEFAULT_TTL, 'max_entries': DEFAULT_MAX_ENTRIES,
+                               'max_bytes': DEFAULT_MAX_BYTES}
+        self.cache = None
         self.config_path = os.path.join(os.path.dirname(__file__), 'ai_config.json')
         self.load_config()
+        self._open_cache()
     
     def load_config(self):
         """Carrega configuração salva"""
@@ -107,6 +138,9 @@ class AIIntegration:
                             self.providers[provider].update(settings)
                     self.active_provider = config.get('active_provider')
                     self.fallback_providers = config.get('fallback_providers', [])
+                    self.hedging = config.get('hedging', False)
+                    self.hedge_delay = config.get('hedge_delay')
+                    self.cache_settings.update(config.get('cache', {}))
         except Exception as e:
             print(f"Erro ao carregar config: {e}")
     
@@ -117,7 +151,10 @@ class AIIntegration:
                 'version': self.VERSION,
                 'providers': self.providers,
                 'active_provider': self.active_provider,
-                'fallback_providers': self.fallback_providers
+                'fallback_providers': self.fallback_providers,
+                'hedging': self.hedging,
+                'hedge_delay': self.hedge_delay,
+                'cache': self.cache_settings
             }
             with open(self.config_path, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
@@ -159,12 +196,69 @@ class AIIntegration:
         self.save_config()
         return {'success': True, 'fallback_providers': valid_providers}
     
+    def set_hedging(self, enabled: bool, delay: Optional[float] = None):
+        """Liga/desliga a corrida entre provedores; delay em segundos (None = p95 da latência)"""
+        if delay is not None:
+            delay = float(delay)
+            if delay < 0:
+                return {'success': False, 'error': 'delay deve ser maior ou igual a zero'}
+        self.hedging = bool(enabled)
+        self.hedge_delay = delay
+        self.save_config()
+        return {'success': True, 'hedging': self.hedging, 'hedge_delay': self.hedge_delay}
+    
+    # ==================== CACHE DE RESPOSTAS ====================
+    
+    def _open_cache(self):
+        try:
+            self.cache = LLMCache(CACHE_PATH, self.cache_settings['ttl'], self.cache_settings['max_entries'],
+                                  self.cache_settings['max_bytes'])
+        except Exception as e:
+            print(f"Erro ao abrir cache de respostas: {e}")
+            self.cache = None
+    
+    def configure_cache(self, enabled: Optional[bool] = None, ttl: Optional[int] = None,
+                        max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """Configura o cache de respostas (ttl em segundos, 0 = sem expiração)"""
+        values = {name: int(value) for name, value in
+                  (('ttl', ttl), ('max_entries', max_entries), ('max_bytes', max_bytes)) if value is not None}
+        for name, value in values.items():
+            if value < 0 or (name != 'ttl' and value == 0):
+                return {'success': False, 'error': f'{name} inválido: {value}'}
+        self.cache_settings.update(values)
+        if enabled is not None:
+            self.cache_settings['enabled'] = bool(enabled)
+        if self.cache is not None:
+            self.cache.configure(self.cache_settings['ttl'], self.cache_settings['max_entries'],
+                                 self.cache_settings['max_bytes'])
+        self.save_config()
+        return {'success': True, 'cache': self.cache_stats()}
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Acertos, taxa de acerto e latência economizada do cache de respostas"""
+        stats = self.cache.stats() if self.cache is not None else {}
+        stats['enabled'] = self.cache_settings['enabled'] and self.cache is not None
+        return stats
+    
+    def clear_cache(self):
+        if self.cache is not None:
+            self.cache.clear()
+        return {'success': True}
+    
+    def _cache_key(self, provider_name: str, message: str, system: str) -> Optional[str]:
+        """Chave da resposta no cache (None se o cache não se aplica)"""
+        if not self.cache_settings['enabled'] or self.cache is None or provider_name in self.UNCACHED_PROVIDERS:
+            return None
+        return cache_key(provider_name, self.providers[provider_name].get('model'), system, message, self.TEMPERATURE)
+    
     def get_status(self):
         """Retorna status de todos os provedores"""
         status = {
             'version': self.VERSION,
             'active_provider': self.active_provider,
             'fallback_providers': self.fallback_providers,
+            'hedging': self.hedging,
+            'hedge_delay': self.hedge_delay,
             'providers': {}
         }
         for name, config in self.providers.items():
@@ -173,8 +267,10 @@ class AIIntegration:
                 'enabled': config['enabled'],
                 'model': config.get('model'),
                 'models_available': config.get('models_available', []),
-                'has_api_key': bool(config.get('api_key'))
+                'has_api_key': bool(config.get('api_key')),
+                'latency_p95': self.latency_p95(name)
             }
+        status['cache'] = self.cache_stats()
         return status
     
     def list_providers(self):
@@ -185,8 +281,12 @@ class AIIntegration:
             'active': self.active_provider
         }
     
-    def chat(self, message: str, context: Optional[str] = None, system_prompt: Optional[str] = None, provider: Optional[str] = None) -> Dict[str, Any]:
-        """Envia mensagem para o provedor de IA (com fallback automático)"""
+    def chat(self, message: str, context: Optional[str] = None, system_prompt: Optional[str] = None, provider: Optional[str] = None,
+             hedge: Optional[bool] = None, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Envia mensagem para o provedor de IA (com fallback automático ou corrida, se hedge/hedging).
+        Com use_cache=False o cache de respostas não é lido nem gravado.
+        """
         
         # Determina qual provedor usar
         target_provider = provider or self.active_provider
@@ -194,9 +294,36 @@ class AIIntegration:
         if not target_provider:
             return {'success': False, 'error': 'Nenhum provedor de IA configurado'}
         
-        # Lista de provedores para tentar (principal + fallbacks)
-        providers_to_try = [target_provider] + [p for p in self.fallback_providers if p != target_provider]
+        providers_to_try = self._providers_to_try(target_provider)
+        final_system = self._system_prompt(system_prompt, context)
+        
+        if (self.hedging if hedge is None else hedge) and len(providers_to_try) > 1:
+            return self._chat_hedged(providers_to_try, message, final_system, use_cache)
+        
+        last_error = None
+        
+        for prov in providers_to_try:
+            try:
+                result = self._timed_chat(prov, message, final_system, use_cache)
+                if result.get('success'):
+                    return result
+                last_error = result.get('error')
+            except Exception as e:
+                last_error = str(e)
+                continue
         
+        return {'success': False, 'error': f'Todos os provedores falharam. Último erro: {last_error}'}
+    
+    def _providers_to_try(self, target_provider: str) -> List[str]:
+        """Provedor principal + fallbacks, apenas os configurados"""
+        providers_to_try = [target_provider] + [p for p in self.fallback_providers if p != target_provider]
+        return [
+            prov for prov in providers_to_try
+            if prov in self.providers and self.providers[prov]['enabled'] and self.providers[prov].get('api_key')
+        ]
+    
+    def _system_prompt(self, system_prompt: Optional[str], context: Optional[str]) -> str:
+        """System prompt informado (ou o padrão) com o contexto anexado"""
         # System prompt padrão para o Obsidian Agente v5.0
         default_system = """Você é o Obsidian Agente Inteligente v5.0, um assistente avançado especializado em:
 - Gerenciamento inteligente de notas e conhecimento no Obsidian
@@ -211,28 +338,291 @@ Se o contexto incluir informações sobre notas ou arquivos do usuário, use-as
         final_system = system_prompt or default_system
         if context:
             final_system += f"\n\nContexto atual:\n{context}"
+        return final_system
+    
+    # ==================== CORRIDA ENTRE PROVEDORES ====================
+    
+    def _timed_chat(self, provider_name: str, message: str, system: str, use_cache: bool = True,
+                    cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Chama o provedor (ou usa o cache) e registra a latência das respostas com sucesso.
+        Com cancel (corrida), a resposta vem em streaming e é abandonada quando o evento é
+        marcado; uma chamada cancelada não grava no cache nem entra nas latências.
+        """
+        key = self._cache_key(provider_name, message, system) if use_cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                cached['cached'] = True
+                return cached
+        start = time.perf_counter()
+        if cancel is None:
+            result = self._chat_with_provider(provider_name, message, system, self.providers[provider_name])
+        else:
+            result = self._cancellable_chat(provider_name, message, system, cancel)
+        if result.get('success') and not (cancel is not None and cancel.is_set()):
+            elapsed = time.perf_counter() - start
+            self._record_latency(provider_name, elapsed)
+            if key:
+                self.cache.put(key, result, elapsed * 1000)
+        return result
+    
+    def _cancellable_chat(self, provider_name: str, message: str, system: str,
+                          cancel: threading.Event) -> Dict[str, Any]:
+        """
+        Chamada em streaming que pode ser abandonada: o evento é verificado a cada trecho
+        recebido e, quando marcado, o stream é fechado (o que fecha a resposta HTTP em
+        andamento). Enquanto o provedor não envia nada a thread continua bloqueada na
+        leitura, então o cancelamento só tem efeito no trecho seguinte (ou no timeout).
+        """
+        if cancel.is_set():
+            return {'success': False, 'error': f'{provider_name}: cancelado', 'cancelled': True}
+        provider = self.providers[provider_name]
+        stream = self._stream_with_provider(provider_name, message, system, provider)
+        parts = []
+        try:
+            for text in stream:
+                if cancel.is_set():
+                    return {'success': False, 'error': f'{provider_name}: cancelado', 'cancelled': True}
+                if text:
+                    parts.append(text)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+        finally:
+            stream.close()
+        if not parts:
+            return {'success': False, 'error': f'{provider_name}: resposta vazia'}
+        return {'success': True, 'response': ''.join(parts), 'provider': provider_name, 'model': provider.get('model')}
+    
+    def _record_latency(self, provider_name: str, seconds: float):
+        with self._latency_lock:
+            samples = self.latencies.setdefault(provider_name, deque(maxlen=self.LATENCY_SAMPLES))
+            samples.append(seconds)
+    
+    def latency_p95(self, provider_name: str) -> Optional[float]:
+        """p95 das latências recentes do provedor em segundos (None sem amostras suficientes)"""
+        with self._latency_lock:
+            samples = sorted(self.latencies.get(provider_name, ()))
+        if len(samples) < self.MIN_LATENCY_SAMPLES:
+            return None
+        return round(samples[math.ceil(len(samples) * 0.95) - 1], 3)
+    
+    def _hedge_delay(self, provider_name: str) -> float:
+        """Tempo de espera pela resposta do provedor antes de disparar o próximo"""
+        if self.hedge_delay is not None:
+            return float(self.hedge_delay)
+        p95 = self.latency_p95(provider_name)
+        return self.DEFAULT_HEDGE_DELAY if p95 is None else max(p95, self.MIN_HEDGE_DELAY)
+    
+    def _chat_hedged(self, providers: List[str], message: str, system: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Dispara o primeiro provedor e, se não houver resposta dentro do atraso de hedge
+        (ou se ele falhar), dispara o próximo em paralelo. A primeira resposta com sucesso
+        vence; chamadas ainda na fila são canceladas e as em andamento recebem o sinal de
+        cancelamento: fecham a conexão ao receber o próximo trecho do stream e não gravam
+        no cache nem nas latências.
+        """
+        waiting = list(providers)
+        launched = []
+        pending = {}
+        last_error = None
+        cancel = threading.Event()
+        
+        def launch() -> float:
+            prov = waiting.pop(0)
+            launched.append(prov)
+            pending[_hedge_executor.submit(self._timed_chat, prov, message, system, use_cache, cancel)] = prov
+            return time.monotonic() + self._hedge_delay(prov)
+        
+        deadline = launch()
+        try:
+            while pending:
+                timeout = max(deadline - time.monotonic(), 0) if waiting else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    prov = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'success': False, 'error': str(e)}
+                    if result.get('success'):
+                        result['hedge'] = {'launched': launched, 'winner': prov}
+                        return result
+                    last_error = result.get('error')
+                # Falha ou atraso esgotado: próximo provedor entra na corrida
+                if waiting and (done or time.monotonic() >= deadline):
+                    deadline = launch()
+        finally:
+            cancel.set()
+            for future in pending:
+                future.cancel()
+        
+        return {'success': False, 'error': f'Todos os provedores falharam. Último erro: {last_error}'}
+    
+    # ==================== STREAMING ====================
+    
+    def chat_stream(self, message: str, context: Optional[str] = None, system_prompt: Optional[str] = None,
+                    provider: Optional[str] = None, use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Chat em streaming: gera eventos {'type': 'start' | 'token' | 'done' | 'error', ...}.
+        O fallback troca de provedor só antes do primeiro token; uma falha depois
+        disso encerra o stream com um evento de erro (com o texto parcial).
+        """
+        target_provider = provider or self.active_provider
+        
+        if not target_provider:
+            yield {'type': 'error', 'error': 'Nenhum provedor de IA configurado'}
+            return
         
+        final_system = self._system_prompt(system_prompt, context)
         last_error = None
         
-        for prov in providers_to_try:
-            if prov not in self.providers:
-                continue
-                
+        for prov in self._providers_to_try(target_provider):
             provider_config = self.providers[prov]
+            key = self._cache_key(prov, message, final_system) if use_cache else None
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                yield {'type': 'start', 'provider': prov, 'model': cached.get('model'), 'first_token_ms': 0, 'cached': True}
+                yield {'type': 'token', 'text': cached['response']}
+                yield {'type': 'done', 'success': True, 'response': cached['response'], 'provider': prov,
+                       'model': cached.get('model'), 'cached': True}
+                return
             
-            if not provider_config['enabled'] or not provider_config.get('api_key'):
-                continue
-            
+            start = time.perf_counter()
+            parts = []
             try:
-                result = self._chat_with_provider(prov, message, final_system, provider_config)
-                if result.get('success'):
-                    return result
-                last_error = result.get('error')
+                for text in self._stream_with_provider(prov, message, final_system, provider_config):
+                    if not text:
+                        continue
+                    if not parts:
+                        yield {'type': 'start', 'provider': prov, 'model': provider_config.get('model'),
+                               'first_token_ms': int((time.perf_counter() - start) * 1000)}
+                    parts.append(text)
+                    yield {'type': 'token', 'text': text}
             except Exception as e:
+                if parts:
+                    yield {'type': 'error', 'error': f'{prov}: {e}', 'provider': prov, 'response': ''.join(parts)}
+                    return
                 last_error = str(e)
                 continue
+            
+            if not parts:
+                last_error = f'{prov}: resposta vazia'
+                continue
+            
+            elapsed = time.perf_counter() - start
+            result = {'success': True, 'response': ''.join(parts), 'provider': prov, 'model': provider_config.get('model')}
+            self._record_latency(prov, elapsed)
+            if key:
+                self.cache.put(key, result, elapsed * 1000)
+            yield dict(result, type='done')
+            return
+        
+        yield {'type': 'error', 'error': f'Todos os provedores falharam. Último erro: {last_error}'}
+    
+    def _stream_with_provider(self, provider_name: str, message: str, system: str, provider: dict) -> Iterator[str]:
+        """Roteador dos streams: gera os trechos de texto da resposta"""
+        if provider_name == 'claude':
+            return self._stream_claude(message, system, provider)
+        if provider_name == 'gemini':
+            return self._stream_gemini(message, system, provider)
+        if provider_name == 'manus':
+            # O Manus Bridge não transmite a resposta: um único trecho
+            return self._stream_whole(provider_name, message, system, provider)
+        return self._stream_openai_compatible(message, system, provider, provider_name)
+    
+    def _stream_whole(self, provider_name: str, message: str, system: str, provider: dict) -> Iterator[str]:
+        result = self._chat_with_provider(provider_name, message, system, provider)
+        if not result.get('success'):
+            raise RuntimeError(result.get('error'))
+        yield result['response']
+    
+    def _stream_openai_compatible(self, message: str, system: str, provider: dict, provider_name: str) -> Iterator[str]:
+        """Stream SSE das APIs compatíveis com OpenAI (OpenAI, Grok, DeepSeek, Groq...)"""
+        headers = {
+            'Authorization': f'Bearer {provider["api_key"]}',
+            'Content-Type': 'application/json'
+        }
         
-        return {'success': False, 'error': f'Todos os provedores falharam. Último erro: {last_error}'}
+        data = {
+            'model': provider['model'],
+            'messages': [
+                {'role': 'system', 'content': system},
+                {'role': 'user', 'content': message}
+            ],
+            'temperature': self.TEMPERATURE,
+            'max_tokens': 4000,
+            'stream': True
+        }
+        
+        with http_pool.post(f'{provider["base_url"]}/chat/completions', headers=headers, json=data,
+                            timeout=60, stream=True) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f'{provider_name} error: {response.text}')
+            for _, payload in http_pool.iter_sse(response):
+                if payload == '[DONE]':
+                    break
+                chunk = json.loads(payload)
+                if chunk.get('error'):
+                    raise RuntimeError(f'{provider_name} error: {chunk["error"]}')
+                for choice in chunk.get('choices', []):
+                    yield (choice.get('delta') or {}).get('content') or ''
+    
+    def _stream_claude(self, message: str, system: str, provider: dict) -> Iterator[str]:
+        """Stream SSE do Claude (eventos content_block_delta)"""
+        headers = {
+            'x-api-key': provider['api_key'],
+            'Content-Type': 'application/json',
+            'anthropic-version': '2023-06-01'
+        }
+        
+        data = {
+            'model': provider['model'],
+            'system': system,
+            'messages': [
+                {'role': 'user', 'content': message}
+            ],
+            'max_tokens': 4000,
+            'stream': True
+        }
+        
+        with http_pool.post(f'{provider["base_url"]}/messages', headers=headers, json=data,
+                            timeout=60, stream=True) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f'Claude error: {response.text}')
+            for event, payload in http_pool.iter_sse(response):
+                if event == 'content_block_delta':
+                    yield json.loads(payload).get('delta', {}).get('text', '')
+                elif event == 'error':
+                    raise RuntimeError(f'Claude error: {payload}')
+                elif event == 'message_stop':
+                    break
+    
+    def _stream_gemini(self, message: str, system: str, provider: dict) -> Iterator[str]:
+        """Stream SSE do Gemini (streamGenerateContent com alt=sse)"""
+        url = f'{provider["base_url"]}/models/{provider["model"]}:streamGenerateContent?alt=sse&key={provider["api_key"]}'
+        
+        data = {
+            'contents': [
+                {
+                    'parts': [
+                        {'text': f'{system}\n\nUsuário: {message}'}
+                    ]
+                }
+            ],
+            'generationConfig': {
+                'temperature': self.TEMPERATURE,
+                'maxOutputTokens': 4000
+            }
+        }
+        
+        with http_pool.post(url, json=data, timeout=60, stream=True) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f'Gemini error: {response.text}')
+            for _, payload in http_pool.iter_sse(response):
+                for candidate in json.loads(payload).get('candidates', []):
+                    for part in candidate.get('content', {}).get('parts', []):
+                        yield part.get('text', '')
     
     def _chat_with_provider(self, provider_name: str, message: str, system: str, provider: dict) -> Dict[str, Any]:
         """Roteador para o método correto de cada provedor"""
@@ -267,11 +657,11 @@ Se o contexto incluir informações sobre notas ou arquivos do usuário, use-as
                 {'role': 'system', 'content': system},
                 {'role': 'user', 'content': message}
             ],
-            'temperature': 0.7,
+            'temperature': self.TEMPERATURE,
             'max_tokens': 4000
         }
         
-        response = requests.post(
+        response = http_pool.post(
             f'{provider["base_url"]}/chat/completions',
             headers=headers,
             json=data,
@@ -307,7 +697,7 @@ Se o contexto incluir informações sobre notas ou arquivos do usuário, use-as
             'max_tokens': 4000
         }
         
-        response = requests.post(
+        response = http_pool.post(
             f'{provider["base_url"]}/messages',
             headers=headers,
             json=data,
@@ -339,12 +729,12 @@ Se o contexto incluir informações sobre notas ou arquivos do usuário, use-as
                 }
             ],
             'generationConfig': {
-                'temperature': 0.7,
+                'temperature': self.TEMPERATURE,
                 'maxOutputTokens': 4000
             }
         }
         
-        response = requests.post(url, json=data, timeout=60)
+        response = http_pool.post(url, json=data, timeout=60)
         
         if response.status_code == 200:
             result = response.json()
@@ -370,11 +760,11 @@ Se o contexto incluir informações sobre notas ou arquivos do usuário, use-as
                 {'role': 'system', 'content': system},
                 {'role': 'user', 'content': message}
             ],
-            'temperature': 0.7,
+            'temperature': self.TEMPERATURE,
             'max_tokens': 4000
         }
         
-        response = requests.post(
+        response = http_pool.post(
             f'{provider["base_url"]}/chat/completions',
             headers=headers,
             json=data,
@@ -408,7 +798,7 @@ Se o contexto incluir informações sobre notas ou arquivos do usuário, use-as
             'command': f'echo "MANUS_REQUEST: {message}"'
         }
         
-        response = requests.post(
+        response = http_pool.post(
             f'{provider["base_url"]}/exec',
             headers=headers,
             json=data,
@@ -458,11 +848,11 @@ Se o contexto incluir informações sobre notas ou arquivos do usuário, use-as
                 {'role': 'system', 'content': system},
                 {'role': 'user', 'content': message}
             ],
-            'temperature': 0.7,
+            'temperature': self.TEMPERATURE,
             'max_tokens': 4000
         }
         
-        response = requests.post(
+        response = http_pool.post(
             f'{provider["base_url"]}/chat/completions',
             headers=headers,
             json=data,
@@ -507,7 +897,26 @@ def list_ai_providers():
     """Lista provedores disponíveis"""
     return ai_integration.list_providers()
 
-def chat_with_ai(message: str, context: str = None, provider: str = None):
+def chat_with_ai(message: str, context: str = None, provider: str = None, hedge: bool = None, use_cache: bool = True):
     """Envia mensagem para a IA"""
-    return ai_integration.chat(message, context, provider=provider)
+    return ai_integration.chat(message, context, provider=provider, hedge=hedge, use_cache=use_cache)
+
+def chat_with_ai_stream(message: str, context: str = None, provider: str = None, use_cache: bool = True):
+    """Envia mensagem para a IA recebendo a resposta em trechos (eventos)"""
+    return ai_integration.chat_stream(message, context, provider=provider, use_cache=use_cache)
+
+def set_ai_hedging(enabled: bool, delay: float = None):
+    """Liga/desliga a corrida entre provedores"""
+    return ai_integration.set_hedging(enabled, delay)
+
+def get_ai_cache_stats():
+    """Estatísticas do cache de respostas"""
+    return ai_integration.cache_stats()
+
+def configure_ai_cache(**kwargs):
+    """Configura o cache de respostas"""
+    return ai_integration.configure_cache(**kwargs)
 
+def clear_ai_cache():
+    """Limpa o cache de respostas"""
+    return ai_integration.clear_cache()
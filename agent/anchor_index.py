@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Anchor Index
+Títulos de seção e blocos (^id) de cada nota com deslocamentos em bytes, para
+resolver [[Nota#Seção]] e ![[Nota#^id]] lendo apenas o trecho do arquivo
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from link_index import link_key
+
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+
+def heading_key(text: str) -> str:
+    """Normaliza o texto de um título para comparação (minúsculo, espaços unificados)"""
+    return ' '.join(text.lower().split())
+
+
+def note_target(target: str) -> str:
+    """Alvo de um link sem .md, com barras normais e minúsculo"""
+    target = target.strip().replace('\\', '/').strip('/').lower()
+    return target[:-3] if target.endswith('.md') else target
+
+
+class AnchorIndex:
+    """Seções (início até o próximo título de mesmo nível ou superior) e blocos por nota"""
+
+    name = 'anchors'
+    VERSION = 1
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # caminho -> {'size': bytes, 'sections': [(nível, texto, início, fim, linha)],
+        #             'blocks': {id: (início, fim, linha)}}
+        self.anchors: Dict[str, Dict] = {}
+        self.names: Dict[str, List[str]] = {}  # nome da nota (link_key) -> caminhos
+
+    # ==================== ESTADO ====================
+
+    def get_state(self) -> Dict:
+        return {'anchors': self.anchors}
+
+    def set_state(self, state: Dict):
+        self.reset()
+        self.anchors = state['anchors']
+        for path in self.anchors:
+            self.names.setdefault(link_key(path), []).append(path)
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def add(self, doc_id: int, rel_path: str, note: Dict):
+        self.remove(doc_id, rel_path)
+        size = note['byte_length']
+
+        # Uma seção termina no próximo título de nível igual ou superior (pilha de seções abertas)
+        sections: List[List] = []
+        open_sections: List[List] = []
+        for heading in note['headings']:
+            while open_sections and open_sections[-1][0] >= heading['level']:
+                open_sections.pop()[3] = heading['offset']
+            section = [heading['level'], heading['text'], heading['offset'], size, heading['line']]
+            sections.append(section)
+            open_sections.append(section)
+
+        self.anchors[rel_path] = {
+            'size': size,
+            'sections': [tuple(section) for section in sections],
+            'blocks': {block['id']: (block['start'], block['end'], block['line']) for block in note['blocks']}
+        }
+        self.names.setdefault(link_key(rel_path), []).append(rel_path)
+
+    def remove(self, doc_id: int, rel_path: str):
+        if self.anchors.pop(rel_path, None) is None:
+            return
+        key = link_key(rel_path)
+        paths = self.names.get(key, [])
+        if rel_path in paths:
+            paths.remove(rel_path)
+        if not paths:
+            self.names.pop(key, None)
+
+    def rename(self, doc_id: int, old_path: str, new_path: str):
+        entry = self.anchors.get(old_path)
+        if entry is None:
+            return
+        self.remove(doc_id, old_path)
+        self.anchors[new_path] = entry
+        self.names.setdefault(link_key(new_path), []).append(new_path)
+
+    # ==================== CONSULTAS ====================
+
+    def resolve_path(self, target: str) -> Optional[str]:
+        """Nota apontada pelo alvo de um link (com pasta, quando informada; senão o caminho mais curto)"""
+        candidates = self.names.get(link_key(target), [])
+        wanted = note_target(target)
+        if '/' in wanted:
+            candidates = [
+                path for path in candidates
+                if note_target(path) == wanted or note_target(path).endswith('/' + wanted)
+            ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda path: (path.count('/'), len(path), path))
+
+    def find_section(self, rel_path: str, heading: str) -> Optional[Tuple]:
+        """Seção da nota pelo texto do título (em 'A#B' vale o último nível)"""
+        sections = self.anchors.get(rel_path, {}).get('sections', [])
+        key = heading_key(heading.split('#')[-1])
+        for section in sections:
+            if heading_key(section[1]) == key:
+                return section
+        # O Obsidian remove pontuação ao gerar links para títulos (ex: 'Fase 1: início')
+        loose = PUNCTUATION_PATTERN.sub('', key)
+        for section in sections:
+            if PUNCTUATION_PATTERN.sub('', heading_key(section[1])) == loose:
+                return section
+        return None
+
+    def resolve(self, target: str, heading: Optional[str] = None, block: Optional[str] = None) -> Optional[Dict]:
+        """Localização (caminho e intervalo de bytes) do alvo de [[Nota]], [[Nota#Seção]] ou [[Nota#^id]]"""
+        rel_path = self.resolve_path(target)
+        if rel_path is None:
+            return None
+        entry = self.anchors[rel_path]
+
+        if block:
+            found = entry['blocks'].get(block)
+            if found is None:
+                return None
+            start, end, line = found
+            return {'path': rel_path, 'kind': 'block', 'block': block, 'start': start, 'end': end, 'line': line}
+
+        if heading:
+            section = self.find_section(rel_path, heading)
+            if section is None:
+                return None
+            level, text, start, end, line = section
+            return {'path': rel_path, 'kind': 'heading', 'heading': text, 'level': level,
+                    'start': start, 'end': end, 'line': line}
+
+        return {'path': rel_path, 'kind': 'note', 'start': 0, 'end': entry['size'], 'line': 1}
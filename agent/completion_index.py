@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Completion Index
+Array ordenado de prefixos (títulos, aliases e tags) com busca binária para
+autocompletar nomes de notas e tags enquanto o usuário digita
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from tag_index import tag_ancestors
+from trigram_index import normalize_name, note_title
+
+TITLE = 'title'
+ALIAS = 'alias'
+TAG = 'tag'
+
+
+def note_aliases(frontmatter: Dict) -> List[str]:
+    """Aliases do frontmatter ('aliases' ou 'alias', lista ou texto separado por vírgulas)"""
+    value = frontmatter.get('aliases') or frontmatter.get('alias')
+    if not value:
+        return []
+    values = value if isinstance(value, list) else str(value).split(',')
+    return [v.strip().strip('"\'') for v in values if v.strip().strip('"\'')]
+
+
+def word_suffixes(key: str) -> List[str]:
+    """'ata reuniao semanal' -> ['ata reuniao semanal', 'reuniao semanal', 'semanal']"""
+    suffixes = [key]
+    pos = key.find(' ')
+    while pos != -1:
+        suffixes.append(key[pos + 1:])
+        pos = key.find(' ', pos + 1)
+    return suffixes
+
+
+class CompletionIndex:
+    """Entradas (chave normalizada, tipo, valor, caminho) ordenadas; prefixo = intervalo contíguo"""
+
+    name = 'completions'
+    VERSION = 1
+
+    # Quantidade de respostas mantidas em memória (o cache é limpo a cada alteração)
+    MAX_CACHE = 512
+
+    def __init__(self):
+        self.bulk = False
+        self.reset()
+
+    def reset(self):
+        self.entries: List[Tuple[str, str, str, str]] = []    # ordenado (fora de carga em lote)
+        self.doc_entries: Dict[str, List[Tuple]] = {}         # caminho -> entradas de título e aliases
+        self.doc_tags: Dict[str, List[str]] = {}              # caminho -> tags (com ancestrais)
+        self.tag_counts: Dict[str, int] = {}                  # tag -> quantidade de notas
+        self.cache: Dict[Tuple, Dict] = {}
+        # Em carga em lote: entradas acrescentadas fora de ordem e entradas a remover
+        self.unsorted = False
+        self.discarded: Set[Tuple] = set()
+
+    # ==================== ESTADO ====================
+
+    def get_state(self) -> Dict:
+        self._sort()
+        return {
+            'entries': self.entries,
+            'doc_entries': self.doc_entries,
+            'doc_tags': self.doc_tags,
+            'tag_counts': self.tag_counts
+        }
+
+    def set_state(self, state: Dict):
+        self.reset()
+        self.entries = state['entries']
+        self.doc_entries = state['doc_entries']
+        self.doc_tags = state['doc_tags']
+        self.tag_counts = state['tag_counts']
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def add(self, doc_id: int, rel_path: str, note: Dict):
+        self.remove(doc_id, rel_path)
+        self._add_names(rel_path, note_aliases(note['frontmatter']))
+
+        tags = sorted({ancestor for tag in note['tags'] for ancestor in tag_ancestors(tag)})
+        if tags:
+            self.doc_tags[rel_path] = tags
+            for tag in tags:
+                self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+                if self.tag_counts[tag] == 1:
+                    for key in word_suffixes(normalize_name(tag)):
+                        self._insert((key, TAG, tag, ''))
+        self.cache.clear()
+
+    def remove(self, doc_id: int, rel_path: str):
+        self._remove_names(rel_path)
+        for tag in self.doc_tags.pop(rel_path, []):
+            self.tag_counts[tag] -= 1
+            if not self.tag_counts[tag]:
+                del self.tag_counts[tag]
+                for key in word_suffixes(normalize_name(tag)):
+                    self._discard((key, TAG, tag, ''))
+        self.cache.clear()
+
+    def rename(self, doc_id: int, old_path: str, new_path: str):
+        aliases = [entry[2] for entry in self.doc_entries.get(old_path, []) if entry[1] == ALIAS]
+        self._remove_names(old_path)
+        self._add_names(new_path, aliases)
+        if old_path in self.doc_tags:
+            self.doc_tags[new_path] = self.doc_tags.pop(old_path)
+        self.cache.clear()
+
+    def _add_names(self, rel_path: str, aliases: Iterable[str]):
+        title = note_title(rel_path)
+        entries = {(key, TITLE, title, rel_path) for key in word_suffixes(normalize_name(title))}
+        for alias in aliases:
+            entries.update((key, ALIAS, alias, rel_path) for key in word_suffixes(normalize_name(alias)))
+        entries = sorted(entry for entry in entries if entry[0])
+        self.doc_entries[rel_path] = entries
+        for entry in entries:
+            self._insert(entry)
+
+    def _remove_names(self, rel_path: str):
+        for entry in self.doc_entries.pop(rel_path, []):
+            self._discard(entry)
+
+    def _insert(self, entry: Tuple):
+        if not self.bulk:
+            insort(self.entries, entry)
+        elif entry in self.discarded:
+            # A entrada removida neste lote continua na lista: basta não removê-la
+            self.discarded.discard(entry)
+        else:
+            self.entries.append(entry)
+            self.unsorted = True
+
+    def _discard(self, entry: Tuple):
+        if self.bulk:
+            self.discarded.add(entry)
+            self.unsorted = True
+            return
+        pos = bisect_left(self.entries, entry)
+        if pos < len(self.entries) and self.entries[pos] == entry:
+            del self.entries[pos]
+
+    # ==================== CARGA EM LOTE ====================
+
+    def begin_bulk(self):
+        """Reconstrução em lote: entradas são acrescentadas e ordenadas uma vez em end_bulk"""
+        self.bulk = True
+
+    def end_bulk(self):
+        self.bulk = False
+        self._sort()
+
+    def _sort(self):
+        """Aplica as remoções e ordena as entradas acumuladas na carga em lote"""
+        if not self.unsorted:
+            return
+        if self.discarded:
+            self.entries = [entry for entry in self.entries if entry not in self.discarded]
+            self.discarded.clear()
+        self.entries.sort()
+        self.unsorted = False
+
+    # ==================== CONSULTAS ====================
+
+    def complete(self, prefix: str, limit: int = 10, recency: Optional[Dict[str, Tuple[float, int]]] = None,
+                 kinds: Iterable[str] = ('notes', 'tags')) -> Dict[str, List[Dict]]:
+        """
+        Notas (por título ou alias) e tags que começam com o prefixo (em qualquer palavra).
+        Notas são ordenadas por correspondência exata e modificação mais recente
+        (recency: caminho -> (mtime, tamanho)); tags por quantidade de notas.
+        """
+        self._sort()
+        key = normalize_name(prefix)
+        kinds = tuple(sorted(set(kinds)))
+        cache_key = (key, limit, kinds)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        notes: Dict[str, Tuple[str, str]] = {}   # caminho -> (tipo, valor) da melhor correspondência
+        tags: Set[str] = set()
+        exact: Set[str] = set()
+        for pos in range(bisect_left(self.entries, (key,)), len(self.entries)):
+            entry_key, kind, value, path = self.entries[pos]
+            if not entry_key.startswith(key):
+                break
+            if kind == TAG:
+                tags.add(value)
+                continue
+            if entry_key == key and normalize_name(value) == key:
+                exact.add(path)
+            if path not in notes or kind == TITLE:
+                notes[path] = (kind, value)
+
+        recency = recency or {}
+        result: Dict[str, List[Dict]] = {}
+        if 'notes' in kinds:
+            top = heapq.nlargest(limit, notes, key=lambda p: (p in exact, recency.get(p, (0.0, 0))[0], p))
+            result['notes'] = [
+                {'title': note_title(path), 'path': path, 'match': notes[path][1], 'kind': notes[path][0]}
+                for path in top
+            ]
+        if 'tags' in kinds:
+            top = heapq.nsmallest(limit, tags, key=lambda t: (normalize_name(t) != key, -self.tag_counts[t], t))
+            result['tags'] = [{'tag': tag, 'count': self.tag_counts[tag]} for tag in top]
+
+        if len(self.cache) >= self.MAX_CACHE:
+            self.cache.clear()
+        self.cache[cache_key] = result
+        return result
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Date Index
+Índice ordenado data -> notas (datas do nome do arquivo e do campo 'date'
+do frontmatter) para a nota do dia e consultas por período
+"""
+
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Formatos aceitos: 2025-01-31, 31-01-2025 (ou 31/01/2025) e 20250131
+ISO_PATTERN = re.compile(r'(?<!\d)(\d{4})-(\d{2})-(\d{2})(?!\d)')
+BR_PATTERN = re.compile(r'(?<!\d)(\d{2})[-/](\d{2})[-/](\d{4})(?!\d)')
+COMPACT_PATTERN = re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)')
+
+NAME = 'name'
+FRONTMATTER = 'frontmatter'
+
+
+def parse_date(text: str) -> Optional[str]:
+    """Primeira data válida no texto, em formato ISO (AAAA-MM-DD)"""
+    candidates = []
+    for pattern, order in ((ISO_PATTERN, (0, 1, 2)), (BR_PATTERN, (2, 1, 0)), (COMPACT_PATTERN, (0, 1, 2))):
+        for match in pattern.finditer(text):
+            parts = match.groups()
+            candidates.append((match.start(), parts[order[0]], parts[order[1]], parts[order[2]]))
+
+    for _, year, month, day in sorted(candidates):
+        try:
+            return date(int(year), int(month), int(day)).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def note_stem(path: str) -> str:
+    name = path.replace('\\', '/').rsplit('/', 1)[-1]
+    return name[:-3] if name.lower().endswith('.md') else name
+
+
+def period_range(period: str, today: Optional[date] = None) -> Tuple[str, str]:
+    """Intervalo (início, fim) inclusivo de um período nomeado"""
+    today = today or date.today()
+    if period == 'today':
+        start = end = today
+    elif period == 'yesterday':
+        start = end = today - timedelta(days=1)
+    elif period == 'week':
+        start = today - timedelta(days=today.weekday())
+        end = start + timedelta(days=6)
+    elif period == 'last_week':
+        start = today - timedelta(days=today.weekday() + 7)
+        end = start + timedelta(days=6)
+    elif period == 'month':
+        start = today.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    elif period == 'last_month':
+        end = today.replace(day=1) - timedelta(days=1)
+        start = end.replace(day=1)
+    else:
+        raise ValueError(f"Período desconhecido: {period} (use today, yesterday, week, last_week, month, last_month)")
+    return start.isoformat(), end.isoformat()
+
+
+class DateIndex:
+    """Lista ordenada de (data, caminho, origem) com busca binária"""
+
+    name = 'dates'
+    VERSION = 1
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.entries: List[Tuple[str, str, str]] = []     # (data ISO, caminho, origem) ordenado
+        self.doc_dates: Dict[str, List[Tuple[str, str]]] = {}  # caminho -> [(data, origem)]
+        self.fm_dates: Dict[str, str] = {}                # caminho -> data do frontmatter
+
+    # ==================== ESTADO ====================
+
+    def get_state(self) -> Dict:
+        return {'entries': self.entries, 'doc_dates': self.doc_dates, 'fm_dates': self.fm_dates}
+
+    def set_state(self, state: Dict):
+        self.entries = state['entries']
+        self.doc_dates = state['doc_dates']
+        self.fm_dates = state['fm_dates']
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def add(self, doc_id: int, rel_path: str, note: Dict):
+        value = note['frontmatter'].get('date')
+        fm_date = parse_date(str(value)) if value else None
+        self.remove_path(rel_path)
+        self.add_path(rel_path, fm_date)
+
+    def remove(self, doc_id: int, rel_path: str):
+        self.remove_path(rel_path)
+
+    def rename(self, doc_id: int, old_path: str, new_path: str):
+        fm_date = self.fm_dates.get(old_path)
+        self.remove_path(old_path)
+        self.add_path(new_path, fm_date)
+
+    def add_path(self, path: str, fm_date: Optional[str] = None):
+        if path in self.doc_dates:
+            return
+        dates = []
+        name_date = parse_date(note_stem(path))
+        if name_date:
+            dates.append((name_date, NAME))
+        if fm_date:
+            self.fm_dates[path] = fm_date
+            if fm_date != name_date:
+                dates.append((fm_date, FRONTMATTER))
+        if not dates:
+            return
+        self.doc_dates[path] = dates
+        for day, source in dates:
+            insort(self.entries, (day, path, source))
+
+    def remove_path(self, path: str):
+        self.fm_dates.pop(path, None)
+        for day, source in self.doc_dates.pop(path, []):
+            pos = bisect_left(self.entries, (day, path, source))
+            if pos < len(self.entries) and self.entries[pos] == (day, path, source):
+                del self.entries[pos]
+
+    def sync(self, paths: Iterable[str]) -> Tuple[int, int]:
+        """Sincroniza com uma lista completa de caminhos (apenas datas do nome)"""
+        current = set(paths)
+        removed = [path for path in self.doc_dates if path not in current]
+        for path in removed:
+            self.remove_path(path)
+        added = 0
+        for path in current:
+            if path not in self.doc_dates:
+                self.add_path(path)
+                added += path in self.doc_dates
+        return added, len(removed)
+
+    # ==================== CONSULTAS ====================
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict]:
+        """Notas com data entre start e end (ISO, inclusivos; None = sem limite)"""
+        lo = bisect_left(self.entries, (start,)) if start else 0
+        hi = bisect_right(self.entries, (end, '\uffff')) if end else len(self.entries)
+        return [{'date': day, 'path': path, 'source': source} for day, path, source in self.entries[lo:hi]]
+
+    def on(self, day: str) -> List[Dict]:
+        """Notas de um dia"""
+        return self.between(day, day)
+
+    def latest(self, before: Optional[str] = None, prefix: str = '') -> Optional[Dict]:
+        """Nota mais recente (até a data informada), opcionalmente dentro de uma pasta"""
+        hi = bisect_right(self.entries, (before, '\uffff')) if before else len(self.entries)
+        for pos in range(hi - 1, -1, -1):
+            day, path, source = self.entries[pos]
+            if path.startswith(prefix):
+                return {'date': day, 'path': path, 'source': source}
+        return None
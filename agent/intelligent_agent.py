@@ -12,7 +12,10 @@ import re
 import json
 import os
 import requests
+import threading
+import time
 import urllib3
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Any
@@ -57,6 +60,12 @@ except ImportError:
     def analyze_query(q): return {'category': 'conversation', 'recommended_ia': 'openai', 'should_consult_external': True, 'confidence': 0.5}
 
 
+import http_pool
+from vault_index import get_vault_index
+from trigram_index import TrigramIndex, note_title
+from date_index import DateIndex, period_range
+
+
 def load_system_context():
     """Carrega o contexto do sistema"""
     if CONTEXT_FILE.exists():
@@ -104,12 +113,33 @@ def log_activity(action: str, details: Dict[str, Any]):
 class ObsidianAPI:
     """Classe para interagir com a API REST do Obsidian"""
     
+    # Validade (segundos) da arvore de notas obtida pela API REST
+    TREE_TTL = 60.0
+    
+    # Requisicoes simultaneas ao listar pastas
+    MAX_FOLDER_WORKERS = 8
+    
+    # Requisicoes que podem criar, mover ou apagar notas (invalidam a arvore em cache)
+    TREE_MUTATIONS = ("/vault/", "/commands/")
+    
     def __init__(self, context):
         self.context = context
         services = context.get("services", {}).get("obsidian_rest_api", {})
         self.base_url = services.get("url", "https://localhost:27124")
         self.api_key = services.get("api_key", "")
         self.vault_path = context.get("paths", {}).get("vault", "")
+        # Indices de nomes e datas usados quando o vault nao esta acessivel localmente
+        self.remote_names = TrigramIndex()
+        self.remote_dates = DateIndex()
+        self.remote_lock = threading.Lock()
+        self.remote_version = None
+        # Cache da arvore de notas da API REST (invalidado por TTL ou geracao)
+        self.tree_lock = threading.Lock()
+        self.tree_notes = None
+        self.tree_time = 0.0
+        self.tree_generation = 0
+        self.tree_cached_generation = -1
+        self.tree_version = 0
         logger.info(f"ObsidianAPI inicializado: {self.base_url}")
     
     def _request(self, method, endpoint, **kwargs):
@@ -128,6 +158,8 @@ class ObsidianAPI:
                 "endpoint": endpoint,
                 "status_code": response.status_code
             })
+            if method != "GET" and endpoint.startswith(self.TREE_MUTATIONS) and response.status_code < 400:
+                self.invalidate_tree()
             return response
         except Exception as e:
             log_activity("API_ERROR", {"endpoint": endpoint, "error": str(e)})
@@ -143,7 +175,8 @@ class ObsidianAPI:
         return {"success": False, "error": f"Erro ao executar comando"}
     
     def open_note(self, note_path):
-        """Abre uma nota no Obsidian"""
+        """Abre uma nota no Obsidian (o nome e resolvido pelo indice de nomes, sem diferenciar maiusculas)"""
+        note_path = self.resolve_note(note_path) or note_path
         if not note_path.endswith('.md'):
             note_path = f"{note_path}.md"
         
@@ -173,80 +206,156 @@ class ObsidianAPI:
         return {"success": False, "error": "Erro ao criar nota"}
     
     def list_notes(self, folder=""):
-        """Lista notas no vault"""
+        """Lista notas no vault (levanta ConnectionError se a API nao responder a listagem)"""
         endpoint = f"/vault/{folder}" if folder else "/vault/"
         response = self._request("GET", endpoint)
-        if response and response.status_code == 200:
-            return response.json()
-        return {"files": []}
-    
-    def search_notes(self, query):
-        """Busca notas por nome"""
-        all_notes = self._get_all_notes()
-        results = []
-        query_lower = query.lower()
-        for note in all_notes:
-            if query_lower in note.lower():
-                results.append(note)
-        return results
+        if response is None or response.status_code != 200:
+            status = response.status_code if response is not None else "sem resposta"
+            raise ConnectionError(f"Erro ao listar {endpoint}: {status}")
+        return response.json()
+    
+    def _note_indexes(self):
+        """(lock, nomes, datas): indices do vault local ou sincronizados com a API REST"""
+        if self.vault_path and Path(self.vault_path).exists():
+            index = get_vault_index(self.vault_path)
+            index.refresh()
+            return index.lock, index.indexers['names'], index.indexers['dates']
+        
+        version, notes = self._vault_tree()
+        with self.remote_lock:
+            if self.remote_version != version:
+                self.remote_names.sync(notes)
+                self.remote_dates.sync(notes)
+                self.remote_version = version
+        return self.remote_lock, self.remote_names, self.remote_dates
+    
+    def search_notes(self, query, limit=None):
+        """Busca notas cujo caminho contem o texto (sem diferenciar maiusculas e acentos)"""
+        lock, names, _ = self._note_indexes()
+        with lock:
+            matches = names.contains(query)
+        return matches[:limit] if limit else matches
+    
+    def suggest_notes(self, query, limit=5):
+        """Notas com nome parecido (tolerante a erros de digitacao), para confirmacao do usuario"""
+        lock, names, _ = self._note_indexes()
+        with lock:
+            return [r['path'] for r in names.search(query, limit=limit)]
+    
+    def resolve_note(self, name):
+        """
+        Caminho da nota pelo caminho exato ou pelo caminho/nome sem diferenciar maiusculas
+        (None se nenhuma ou mais de uma nota corresponder; nomes aproximados nao sao resolvidos)
+        """
+        lock, names, _ = self._note_indexes()
+        path = name if name.endswith('.md') else f"{name}.md"
+        folded = path.casefold()
+        with lock:
+            if path in names.entries:
+                return path
+            # Candidatas pelo texto contido no caminho; a comparacao exata e feita em seguida
+            matches = [
+                candidate for candidate in names.contains(name)
+                if candidate.casefold() == folded or f"{note_title(candidate)}.md".casefold() == folded
+            ]
+        return matches[0] if len(matches) == 1 else None
     
     def _get_all_notes(self, folder=""):
-        """Obtem todas as notas recursivamente"""
+        """Obtem todas as notas (do indice local ou da arvore em cache da API REST)"""
+        if self.vault_path and Path(self.vault_path).exists():
+            notes = sorted(rel_path for rel_path, _, _ in get_vault_index(self.vault_path).list_files())
+        else:
+            notes = self._vault_tree()[1]
+        
+        if folder:
+            prefix = folder.strip('/') + '/'
+            return [note for note in notes if note.startswith(prefix)]
+        return list(notes)
+    
+    def invalidate_tree(self):
+        """Marca a arvore em cache como desatualizada (apos criar, mover ou apagar notas)"""
+        with self.tree_lock:
+            self.tree_generation += 1
+    
+    def _vault_tree(self):
+        """
+        Arvore de notas da API REST: (versao, notas), refeita apos TTL ou invalidacao.
+        Se alguma pasta falhar, a arvore parcial e devolvida mas nao fica em cache.
+        """
+        with self.tree_lock:
+            expired = time.time() - self.tree_time > self.TREE_TTL
+            if self.tree_notes is None or expired or self.tree_cached_generation != self.tree_generation:
+                generation = self.tree_generation
+                notes, complete = self._fetch_tree()
+                self.tree_version += 1
+                if not complete:
+                    self.tree_notes = None
+                    return self.tree_version, notes
+                self.tree_notes = notes
+                self.tree_time = time.time()
+                self.tree_cached_generation = generation
+            return self.tree_version, self.tree_notes
+    
+    def _fetch_tree(self):
+        """
+        Lista todas as pastas em paralelo (pool limitado), enfileirando subpastas ao descobri-las.
+        Retorna (notas, completa); completa e False se a listagem de alguma pasta falhou.
+        """
         notes = []
-        data = self.list_notes(folder)
-        for item in data.get("files", []):
-            if item.endswith('/'):
-                subfolder = folder + item if folder else item
-                notes.extend(self._get_all_notes(subfolder.rstrip('/')))
-            elif item.endswith('.md'):
-                full_path = f"{folder}/{item}" if folder else item
-                notes.append(full_path)
-        return notes
+        complete = True
+        with ThreadPoolExecutor(max_workers=self.MAX_FOLDER_WORKERS, thread_name_prefix="obsidian-tree") as executor:
+            pending = {executor.submit(self.list_notes, ""): ""}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    folder = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        complete = False
+                        log_activity("API_ERROR", {"endpoint": f"/vault/{folder}", "error": str(e)})
+                        continue
+                    for item in data.get("files", []):
+                        if item.endswith('/'):
+                            subfolder = folder + item
+                            pending[executor.submit(self.list_notes, subfolder.rstrip('/'))] = subfolder
+                        elif item.endswith('.md'):
+                            notes.append(folder + item)
+        
+        notes.sort()
+        return notes, complete
     
     def find_today_note(self):
-        """Encontra a nota de hoje - busca no sistema de arquivos"""
-        today = datetime.now()
-        date_patterns = [
-            today.strftime("%Y-%m-%d"),
-            today.strftime("%d-%m-%Y"),
-            today.strftime("%Y%m%d")
-        ]
+        """Encontra a nota de hoje pelo indice de datas (nome do arquivo ou campo date)"""
+        today = datetime.now().strftime("%Y-%m-%d")
         
-        # Primeiro tentar via API
-        all_notes = self._get_all_notes()
-        for note in all_notes:
-            note_lower = note.lower()
-            for pattern in date_patterns:
-                if pattern.lower() in note_lower:
-                    return note
-        
-        # Se nao encontrou via API, buscar no sistema de arquivos
-        vault_path = Path(self.vault_path)
-        if vault_path.exists():
-            for pattern in date_patterns:
-                # Buscar em PROJETOS primeiro
-                projetos_path = vault_path / "PROJETOS"
-                if projetos_path.exists():
-                    for file in projetos_path.glob(f"*{pattern}*.md"):
-                        return f"PROJETOS/{file.name}"
-                
-                # Buscar na raiz
-                for file in vault_path.glob(f"*{pattern}*.md"):
-                    return file.name
-                
-                # Buscar recursivamente
-                for file in vault_path.rglob(f"*{pattern}*.md"):
-                    relative = file.relative_to(vault_path)
-                    return str(relative).replace("\\", "/")
-        
-        # Buscar nota mais recente em PROJETOS
-        project_notes = [n for n in all_notes if "PROJETOS" in n]
-        dated_notes = [n for n in project_notes if re.search(r'\d{4}-\d{2}-\d{2}', n)]
-        if dated_notes:
-            dated_notes.sort(reverse=True)
-            return dated_notes[0]
+        lock, _, dates = self._note_indexes()
+        with lock:
+            matches = [entry['path'] for entry in dates.on(today)]
+            if matches:
+                # Preferencia: PROJETOS, raiz, demais pastas
+                matches.sort(key=lambda n: (not n.startswith("PROJETOS/"), "/" in n, n))
+                return matches[0]
+            
+            # Nota datada mais recente em PROJETOS
+            latest = dates.latest(prefix="PROJETOS/")
         
-        return None
+        return latest['path'] if latest else None
+    
+    def list_tasks(self, status="open", limit=20):
+        """Tarefas do vault local pelo indice de tarefas (None sem acesso ao vault)"""
+        if not (self.vault_path and Path(self.vault_path).exists()):
+            return None
+        index = get_vault_index(self.vault_path)
+        index.refresh()
+        with index.lock:
+            return index.indexers['tasks'].query(status=status, limit=limit)
+    
+    def notes_by_date(self, start=None, end=None):
+        """Notas com data (nome ou frontmatter) no intervalo ISO [start, end]"""
+        lock, _, dates = self._note_indexes()
+        with lock:
+            return dates.between(start, end)
     
     def open_daily_note(self):
         """Abre a nota diaria (via comando nativo)"""
@@ -254,7 +363,9 @@ class ObsidianAPI:
     
     def get_vault_stats(self):
         """Retorna estatisticas do vault"""
-        all_notes = self._get_all_notes()
+        lock, names, _ = self._note_indexes()
+        with lock:
+            all_notes = names.paths()
         folders = set()
         for note in all_notes:
             if "/" in note:
@@ -444,7 +555,7 @@ class AIProvider:
             return None, "Chave OpenAI nao configurada"
         
         try:
-            r = requests.post(
+            r = http_pool.post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={"Authorization": f"Bearer {api_key}"},
                 json={
@@ -472,7 +583,7 @@ class AIProvider:
             return None, "Chave Claude nao configurada"
         
         try:
-            r = requests.post(
+            r = http_pool.post(
                 "https://api.anthropic.com/v1/messages",
                 headers={
                     "x-api-key": api_key,
@@ -503,7 +614,7 @@ class AIProvider:
             return None, "Chave Perplexity nao configurada"
         
         try:
-            r = requests.post(
+            r = http_pool.post(
                 "https://api.perplexity.ai/chat/completions",
                 headers={
                     "Authorization": f"Bearer {api_key}",
@@ -547,6 +658,116 @@ class AIProvider:
         log_activity("AI_ERROR", {"errors": errors})
         return f"Erro: Nenhum provedor de IA disponivel."
     
+    def _stream_chat_completions(self, name, url, api_key, model, prompt):
+        """Stream SSE de uma API no formato OpenAI (chat/completions)"""
+        with http_pool.post(
+            url,
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            json={
+                "model": model,
+                "messages": [{"role": "user", "content": prompt}],
+                "max_tokens": 1000,
+                "stream": True
+            },
+            timeout=30,
+            stream=True
+        ) as r:
+            if r.status_code != 200:
+                raise RuntimeError(f"{name} erro {r.status_code}")
+            for _, payload in http_pool.iter_sse(r):
+                if payload == "[DONE]":
+                    break
+                for choice in json.loads(payload).get("choices", []):
+                    yield (choice.get("delta") or {}).get("content") or ""
+    
+    def stream_openai(self, prompt):
+        """Stream da API da OpenAI"""
+        api_key = self.apis.get("openai", {}).get("key")
+        if not api_key:
+            raise RuntimeError("Chave OpenAI nao configurada")
+        return self._stream_chat_completions(
+            "OpenAI", "https://api.openai.com/v1/chat/completions", api_key, "gpt-3.5-turbo", prompt
+        )
+    
+    def stream_claude(self, prompt):
+        """Stream da API do Claude (eventos content_block_delta)"""
+        api_key = self.apis.get("claude", {}).get("key")
+        if not api_key:
+            raise RuntimeError("Chave Claude nao configurada")
+        
+        with http_pool.post(
+            "https://api.anthropic.com/v1/messages",
+            headers={
+                "x-api-key": api_key,
+                "Content-Type": "application/json",
+                "anthropic-version": "2023-06-01"
+            },
+            json={
+                "model": "claude-3-haiku-20240307",
+                "max_tokens": 1000,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": True
+            },
+            timeout=30,
+            stream=True
+        ) as r:
+            if r.status_code != 200:
+                raise RuntimeError(f"Claude erro {r.status_code}")
+            for event, payload in http_pool.iter_sse(r):
+                if event == "content_block_delta":
+                    yield json.loads(payload).get("delta", {}).get("text", "")
+                elif event == "error":
+                    raise RuntimeError(f"Claude erro: {payload}")
+                elif event == "message_stop":
+                    break
+    
+    def stream_perplexity(self, prompt):
+        """Stream da API do Perplexity"""
+        api_key = self.apis.get("perplexity", {}).get("key")
+        if not api_key:
+            raise RuntimeError("Chave Perplexity nao configurada")
+        return self._stream_chat_completions(
+            "Perplexity", "https://api.perplexity.ai/chat/completions", api_key,
+            "llama-3.1-sonar-small-128k-online", prompt
+        )
+    
+    def stream_response(self, prompt):
+        """Versao em streaming de get_response: gera trechos do texto (fallback so antes do primeiro trecho)"""
+        errors = []
+        
+        providers = [
+            ("openai", "OpenAI", self.stream_openai),
+            ("claude", "Claude", self.stream_claude),
+            ("perplexity", "Perplexity", self.stream_perplexity)
+        ]
+        
+        for name, label, func in providers:
+            started = False
+            try:
+                for text in func(prompt):
+                    if not text:
+                        continue
+                    if not started:
+                        started = True
+                        self.last_provider = label
+                        self.request_count += 1
+                    yield text
+            except Exception as e:
+                if started:
+                    log_activity("AI_ERROR", {"provider": name, "error": str(e)})
+                    yield f"\n\n[Resposta interrompida: {e}]"
+                    return
+                errors.append(f"{name}: {e}")
+                continue
+            if started:
+                log_activity("AI_REQUEST", {"provider": name, "success": True, "stream": True})
+                return
+            errors.append(f"{name}: resposta vazia")
+        
+        self.last_error = "; ".join(errors)
+        log_activity("AI_ERROR", {"errors": errors})
+        yield "Erro: Nenhum provedor de IA disponivel."
+    
     def get_status(self):
         """Retorna status dos provedores"""
         return {
@@ -586,9 +807,11 @@ class IntelligentAgent:
         return {
             "open_today": [r"nota.*hoje", r"abr.*hoje", r"daily.*note", r"nota.*diaria"],
             "open_note": [r"abr.*nota", r"open.*note"],
-            "list_notes": [r"list.*nota", r"mostrar.*nota", r"listar.*nota"],
             "create_note": [r"cri.*nota", r"nova.*nota"],
             "search_notes": [r"busc.*nota", r"procur.*nota", r"pesquis"],
+            # Depois de criar/buscar: "criar nota da semana" continua criando uma nota
+            "notes_period": [r"\bnotas?\b.*\b(semana|m[eê]s|ontem)\b", r"\b(semana|m[eê]s) passad"],
+            "list_notes": [r"list.*nota", r"mostrar.*nota", r"listar.*nota"],
             "create_task": [r"cri.*tarefa", r"nova.*tarefa", r"add.*task"],
             "list_tasks": [r"list.*tarefa", r"mostrar.*tarefa", r"tarefas.*pend"],
             "use_template": [r"usar.*template", r"inserir.*template", r"templater"],
@@ -659,6 +882,7 @@ NOTAS:
   - buscar [termo] - Busca nas notas
   - abrir nota [nome] - Abre nota especifica
   - abrir nota de hoje - Abre nota diaria
+  - notas da semana passada - Lista notas datadas do periodo (semana, mes, ontem)
 
 TAREFAS:
   - criar tarefa - Cria nova tarefa
@@ -744,6 +968,23 @@ IA:
         
         return result
     
+    def _ask_ai_prompt(self, query):
+        """Prompt enviado a IA nas perguntas (ask_ai)"""
+        system_prompt = "Voce e um assistente inteligente integrado ao Obsidian. Responda em portugues brasileiro de forma clara e util. Seja conciso mas informativo."
+        return f"{system_prompt}\n\nPergunta: {query}"
+    
+    def generate_response_stream(self, command_result, api_result):
+        """Versao em streaming de generate_response: ask_ai em trechos, os demais comandos em um trecho so"""
+        if command_result["command"] != "ask_ai":
+            yield self.generate_response(command_result, api_result)
+            return
+        
+        query = command_result.get("parameters", {}).get("query", "")
+        yield from self.ai_provider.stream_response(self._ask_ai_prompt(query))
+        
+        if self.ai_provider.last_provider:
+            yield f"\n\n[Via {self.ai_provider.last_provider}]"
+    
     def generate_response(self, command_result, api_result):
         """Gera resposta baseada no comando"""
         cmd = command_result["command"]
@@ -802,15 +1043,58 @@ IA:
         if cmd == "open_note":
             note_name = params.get("note_name", "")
             if note_name:
-                matches = self.obsidian_api.search_notes(note_name)
-                if matches:
+                path = self.obsidian_api.resolve_note(note_name)
+                matches = [path] if path else self.obsidian_api.search_notes(note_name)
+                if len(matches) == 1:
                     result = self.obsidian_api.open_note(matches[0])
                     if result.get("success"):
                         return f"Nota aberta: {matches[0]}"
                     return f"Erro ao abrir nota: {result.get('error')}"
+                if matches:
+                    options = "\n".join(f"  - {match}" for match in matches[:10])
+                    return f"Varias notas correspondem a '{note_name}'. Qual delas?\n{options}"
+                suggestions = self.obsidian_api.suggest_notes(note_name)
+                if suggestions:
+                    options = "\n".join(f"  - {match}" for match in suggestions)
+                    return f"Nota '{note_name}' nao encontrada. Voce quis dizer:\n{options}"
                 return f"Nota '{note_name}' nao encontrada."
             return "Por favor, especifique o nome da nota."
         
+        if cmd == "notes_period":
+            text = params.get("query", "").lower()
+            if "ontem" in text:
+                period = "yesterday"
+            elif re.search(r"\bm[eê]s\b", text):
+                period = "last_month" if "passad" in text else "month"
+            else:
+                period = "last_week" if "passad" in text else "week"
+            start, end = period_range(period)
+            notes = self.obsidian_api.notes_by_date(start, end)
+            if notes:
+                result = f"=== NOTAS DE {start} A {end} ({len(notes)}) ===\n\n"
+                for note in notes[:20]:
+                    result += f"  - {note['date']}: {note['path']}\n"
+                if len(notes) > 20:
+                    result += f"\n... e mais {len(notes) - 20} notas"
+                return result
+            return f"Nenhuma nota datada entre {start} e {end}."
+        
+        if cmd == "list_tasks":
+            status = "done" if re.search(r"conclu|feita", params.get("query", "").lower()) else "open"
+            tasks = self.obsidian_api.list_tasks(status=status)
+            if tasks is None:
+                return "Listagem de tarefas requer acesso local ao vault."
+            if tasks["tasks"]:
+                title = "CONCLUIDAS" if status == "done" else "PENDENTES"
+                result = f"=== TAREFAS {title} ({tasks['total']} total) ===\n\n"
+                for task in tasks["tasks"]:
+                    due = f" (vence {task['due']})" if task["due"] else ""
+                    result += f"  - {task['text']}{due} [{task['path']}:{task['line']}]\n"
+                if tasks["total"] > len(tasks["tasks"]):
+                    result += f"\n... e mais {tasks['total'] - len(tasks['tasks'])} tarefas"
+                return result
+            return "Nenhuma tarefa encontrada."
+        
         if cmd == "list_notes":
             notes = self.obsidian_api._get_all_notes()
             if notes:
@@ -860,11 +1144,7 @@ IA:
             return "Erro ao abrir Omnisearch."
         
         if cmd == "ask_ai":
-            query = params.get("query", "")
-            system_prompt = "Voce e um assistente inteligente integrado ao Obsidian. Responda em portugues brasileiro de forma clara e util. Seja conciso mas informativo."
-            full_prompt = f"{system_prompt}\n\nPergunta: {query}"
-            
-            response = self.ai_provider.get_response(full_prompt)
+            response = self.ai_provider.get_response(self._ask_ai_prompt(params.get("query", "")))
             
             if self.ai_provider.last_provider:
                 response += f"\n\n[Via {self.ai_provider.last_provider}]"
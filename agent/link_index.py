@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Link Index
+Índice de adjacência (links de saída e backlinks) entre as notas do vault
+"""
+
+import heapq
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# Alvos com estas extensões são anexos (não notas) e não contam como links quebrados
+ATTACHMENT_EXTENSIONS = {
+    'png', 'jpg', 'jpeg', 'gif', 'bmp', 'svg', 'webp', 'pdf', 'mp3', 'wav', 'm4a', 'ogg',
+    'flac', 'mp4', 'webm', 'mov', 'mkv', 'canvas', 'excalidraw'
+}
+
+
+def link_key(name: str) -> str:
+    """Normaliza o alvo de um link para o nome da nota (sem pasta, sem .md, minúsculo)"""
+    name = name.strip().replace('\\', '/')
+    if name.lower().endswith('.md'):
+        name = name[:-3]
+    return name.rsplit('/', 1)[-1].lower()
+
+
+def is_attachment(key: str) -> bool:
+    return key.rsplit('.', 1)[-1] in ATTACHMENT_EXTENSIONS if '.' in key else False
+
+
+class LinkIndex:
+    """
+    Arestas diretas e reversas com log de versões para deltas do grafo, mais os
+    conjuntos de links não resolvidos e de notas órfãs (sem backlinks), mantidos a
+    cada alteração apenas para os nomes afetados
+    """
+
+    name = 'links'
+    VERSION = 1
+
+    # Quantidade de mudanças mantidas para responder deltas
+    MAX_LOG = 5000
+
+    # Versões disponíveis em cada época (as épocas são contadas em segundos)
+    EPOCH_SIZE = 10 ** 6
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.forward: Dict[int, List[Dict]] = {}       # doc_id -> links da nota
+        self.reverse: Dict[str, Dict[int, int]] = {}   # nome da nota -> {doc_id: ocorrências}
+        self.nodes: Dict[int, str] = {}                # doc_id -> caminho relativo
+        # Cada reconstrução começa numa época nova (acima de qualquer versão anterior):
+        # clientes com uma versão de antes do reset recebem o grafo completo
+        self.version = max(int(time.time()) * self.EPOCH_SIZE, getattr(self, 'version', 0) + 1)
+        self.log: List[Dict] = []
+        self._init_report()
+
+    def _init_report(self):
+        self.names: Dict[str, Set[int]] = {}   # nome da nota -> doc_ids com esse nome
+        self.unresolved: Set[str] = set()      # alvos de links sem nota correspondente
+        self.orphans: Set[int] = set()         # notas sem links de outras notas
+
+    # ==================== ESTADO ====================
+
+    def get_state(self) -> Dict:
+        return {
+            'forward': self.forward,
+            'reverse': self.reverse,
+            'nodes': self.nodes,
+            'version': self.version,
+            'log': self.log
+        }
+
+    def set_state(self, state: Dict):
+        self.forward = state['forward']
+        self.reverse = state['reverse']
+        self.nodes = state['nodes']
+        self.version = state['version']
+        self.log = state['log']
+
+        # Os conjuntos do relatório são derivados das arestas
+        self._init_report()
+        for doc_id, rel_path in self.nodes.items():
+            self.names.setdefault(link_key(rel_path), set()).add(doc_id)
+        self._update_report(set(self.names) | set(self.reverse))
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def add(self, doc_id: int, rel_path: str, note: Dict):
+        """(Re)indexa os links de uma nota (a partir da análise do note_analyzer)"""
+        is_new = doc_id not in self.nodes
+        old_edges = self._edges(doc_id)
+        affected = self._targets(doc_id)
+        self._unlink(doc_id)
+        if not is_new:
+            self._unname(doc_id)
+
+        links = note['links']
+        self.forward[doc_id] = links
+        self.nodes[doc_id] = rel_path
+        self.names.setdefault(link_key(rel_path), set()).add(doc_id)
+        for link in links:
+            sources = self.reverse.setdefault(link_key(link['target']), {})
+            sources[doc_id] = sources.get(doc_id, 0) + 1
+
+        affected |= self._targets(doc_id)
+        affected.add(link_key(rel_path))
+        self._update_report(affected)
+
+        new_edges = self._edges(doc_id)
+        old_targets = {e['to'] for e in old_edges}
+        new_targets = {e['to'] for e in new_edges}
+        self._record(
+            nodes_added=[self._node(rel_path)] if is_new else [],
+            edges_added=[e for e in new_edges if e['to'] not in old_targets],
+            edges_removed=[e for e in old_edges if e['to'] not in new_targets]
+        )
+
+    def remove(self, doc_id: int, rel_path: str):
+        """Remove a nota e suas arestas de saída"""
+        if doc_id not in self.nodes:
+            return
+        old_edges = self._edges(doc_id)
+        affected = self._targets(doc_id)
+        affected.add(link_key(rel_path))
+        self._unlink(doc_id)
+        self._unname(doc_id)
+        self.forward.pop(doc_id, None)
+        self.nodes.pop(doc_id, None)
+        self.orphans.discard(doc_id)
+        self._update_report(affected)
+        self._record(nodes_removed=[self._node(rel_path)['id']], edges_removed=old_edges)
+
+    def rename(self, doc_id: int, old_path: str, new_path: str):
+        """Atualiza o nó de uma nota renomeada (as arestas mudam de origem)"""
+        if doc_id not in self.nodes:
+            return
+        old_edges = self._edges(doc_id)
+        self._unname(doc_id)
+        self.nodes[doc_id] = new_path
+        self.names.setdefault(link_key(new_path), set()).add(doc_id)
+        # Links para si mesma não contam: os alvos da nota também são afetados
+        self._update_report(self._targets(doc_id) | {link_key(old_path), link_key(new_path)})
+        self._record(
+            nodes_added=[self._node(new_path)],
+            nodes_removed=[self._node(old_path)['id']],
+            edges_added=self._edges(doc_id),
+            edges_removed=old_edges
+        )
+
+    def _unlink(self, doc_id: int):
+        for link in self.forward.get(doc_id, []):
+            key = link_key(link['target'])
+            sources = self.reverse.get(key)
+            if sources is None:
+                continue
+            sources.pop(doc_id, None)
+            if not sources:
+                del self.reverse[key]
+
+    def _unname(self, doc_id: int):
+        key = link_key(self.nodes[doc_id])
+        doc_ids = self.names.get(key)
+        if doc_ids is None:
+            return
+        doc_ids.discard(doc_id)
+        if not doc_ids:
+            del self.names[key]
+
+    def _targets(self, doc_id: int) -> Set[str]:
+        return {link_key(link['target']) for link in self.forward.get(doc_id, [])}
+
+    def _update_report(self, keys: Iterable[str]):
+        """Recalcula links não resolvidos e órfãs apenas para os nomes informados (O(grau))"""
+        for key in keys:
+            doc_ids = self.names.get(key)
+            sources = self.reverse.get(key)
+            if sources and not doc_ids and not is_attachment(key):
+                self.unresolved.add(key)
+            else:
+                self.unresolved.discard(key)
+            if not doc_ids:
+                continue
+            linked = sources is not None and any(link_key(self.nodes[s]) != key for s in sources)
+            for doc_id in doc_ids:
+                if linked:
+                    self.orphans.discard(doc_id)
+                else:
+                    self.orphans.add(doc_id)
+
+    def _edges(self, doc_id: int) -> List[Dict]:
+        """Arestas do grafo (uma por alvo distinto), como em generate_graph_data"""
+        rel_path = self.nodes.get(doc_id)
+        if rel_path is None:
+            return []
+        source = Path(rel_path).stem
+        targets = dict.fromkeys(link['target'] for link in self.forward.get(doc_id, []))
+        return [{'from': source, 'to': target} for target in targets]
+
+    def _node(self, rel_path: str) -> Dict:
+        stem = Path(rel_path).stem
+        return {'id': stem, 'label': stem, 'path': rel_path}
+
+    def _record(self, nodes_added=None, nodes_removed=None, edges_added=None, edges_removed=None):
+        if not (nodes_added or nodes_removed or edges_added or edges_removed):
+            return
+        self.version += 1
+        self.log.append({
+            'version': self.version,
+            'nodes_added': nodes_added or [],
+            'nodes_removed': nodes_removed or [],
+            'edges_added': edges_added or [],
+            'edges_removed': edges_removed or []
+        })
+        if len(self.log) > self.MAX_LOG:
+            self.log = self.log[-self.MAX_LOG:]
+
+    # ==================== CONSULTAS ====================
+
+    def backlinks(self, note_name: str) -> List[Dict]:
+        """Notas que linkam para note_name (O(grau))"""
+        key = link_key(note_name)
+        results = []
+        for doc_id, count in self.reverse.get(key, {}).items():
+            rel_path = self.nodes[doc_id]
+            if link_key(rel_path) == key:
+                continue
+            links = [l for l in self.forward[doc_id] if link_key(l['target']) == key]
+            results.append({
+                'name': Path(rel_path).stem,
+                'path': rel_path,
+                'count': count,
+                'aliases': sorted({l['alias'] for l in links if l['alias']}),
+                'headings': sorted({l['heading'] for l in links if l['heading']})
+            })
+        results.sort(key=lambda r: r['path'])
+        return results
+
+    def outlinks(self, doc_id: int) -> List[Dict]:
+        """Links de saída de uma nota"""
+        return list(self.forward.get(doc_id, []))
+
+    def unresolved_links(self, limit: Optional[int] = 100, offset: int = 0) -> Dict:
+        """Alvos de links sem nota correspondente, dos mais referenciados para os menos"""
+        def order(key):
+            return -sum(self.reverse[key].values()), key
+
+        keys = (sorted(self.unresolved, key=order)[offset:] if limit is None
+                else heapq.nsmallest(offset + limit, self.unresolved, key=order)[offset:])
+        items = []
+        for key in keys:
+            sources = self.reverse[key]
+            paths = sorted(self.nodes[doc_id] for doc_id in sources)
+            target = next(l['target'] for l in self.forward[min(sources)] if link_key(l['target']) == key)
+            items.append({'target': target, 'count': sum(sources.values()), 'sources': paths})
+        return {'total': len(self.unresolved), 'items': items}
+
+    def orphan_notes(self, limit: Optional[int] = 100, offset: int = 0) -> Dict:
+        """Notas que nenhuma outra nota linka, em ordem de caminho"""
+        paths = (self.nodes[doc_id] for doc_id in self.orphans)
+        page = sorted(paths)[offset:] if limit is None else heapq.nsmallest(offset + limit, paths)[offset:]
+        return {'total': len(self.orphans), 'items': [{'name': Path(p).stem, 'path': p} for p in page]}
+
+    def report_counts(self) -> Dict[str, int]:
+        return {
+            'notes': len(self.nodes),
+            'unresolved': len(self.unresolved),
+            'unresolved_links': sum(sum(self.reverse[key].values()) for key in self.unresolved),
+            'orphans': len(self.orphans)
+        }
+
+    def graph(self) -> Dict:
+        """Grafo completo no formato de generate_graph_data"""
+        nodes = [self._node(rel_path) for rel_path in self.nodes.values()]
+        edges = []
+        for doc_id in self.nodes:
+            edges.extend(self._edges(doc_id))
+        return {'nodes': nodes, 'edges': edges, 'version': self.version}
+
+    def delta(self, since: int) -> Dict:
+        """
+        Mudanças do grafo desde uma versão (ou o grafo completo se o log não cobre ou se
+        a versão não é deste índice, por exemplo depois de uma reconstrução).
+        Em cada mudança, aplique as remoções antes das adições.
+        """
+        if since == self.version:
+            return {'full': False, 'version': self.version, 'changes': []}
+
+        oldest = self.log[0]['version'] if self.log else self.version + 1
+        if since > self.version or since < oldest - 1:
+            graph = self.graph()
+            graph['full'] = True
+            return graph
+
+        return {
+            'full': False,
+            'version': self.version,
+            'changes': [entry for entry in self.log if entry['version'] > since]
+        }
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+LLM Cache
+Cache em disco (SQLite) das respostas dos provedores de IA, por provedor, modelo,
+system prompt, mensagem e temperatura, com TTL e despejo LRU por entradas e bytes
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_TTL = 24 * 3600              # segundos (0 = sem expiração)
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_key(provider: str, model: Optional[str], system: Optional[str], message: str,
+              temperature: Optional[float]) -> str:
+    """Chave da requisição: hash dos parâmetros que determinam a resposta"""
+    raw = json.dumps([provider, model, system or '', message, temperature], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    Respostas (dicionários JSON) por chave. Cada entrada guarda a latência da chamada
+    original, somada em saved_ms a cada acerto. Expiradas são removidas ao serem lidas
+    ou quando o cache passa dos limites; depois delas saem as usadas há mais tempo.
+    """
+
+    def __init__(self, path: str, ttl: int = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_ms = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                latency_ms INTEGER NOT NULL
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)')
+        self.db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self.lock:
+            row = self.db.execute('SELECT value, created, latency_ms FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self.db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.db.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+            self.db.commit()
+            self.hits += 1
+            self.saved_ms += row[2]
+        return json.loads(row[0])
+
+    def contains(self, key: str) -> bool:
+        """Se há resposta válida para a chave (sem contar acerto nem atualizar o uso)"""
+        with self.lock:
+            row = self.db.execute('SELECT created FROM responses WHERE key = ?', (key,)).fetchone()
+        return row is not None and not (self.ttl and time.time() - row[0] > self.ttl)
+
+    def put(self, key: str, value: Dict[str, Any], latency_ms: int):
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        # Uma resposta grande demais expulsaria o cache inteiro
+        if size > self.max_bytes // 4:
+            return
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses (key, value, size, created, last_used, latency_ms) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, data, size, now, now, int(latency_ms))
+            )
+            self._evict(now)
+            self.db.commit()
+
+    def _evict(self, now: float):
+        count, total = self.db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        if self.ttl:
+            expired = self.db.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl,)).rowcount
+            if expired:
+                self.evictions += expired
+                count, total = self.db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        excess_entries = count - self.max_entries
+        excess_bytes = total - self.max_bytes
+        victims = []
+        for key, size in self.db.execute('SELECT key, size FROM responses ORDER BY last_used').fetchall():
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            victims.append((key,))
+            excess_entries -= 1
+            excess_bytes -= size
+        self.db.executemany('DELETE FROM responses WHERE key = ?', victims)
+        self.evictions += len(victims)
+
+    def configure(self, ttl: Optional[int] = None, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        with self.lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict(time.time())
+            self.db.commit()
+
+    def clear(self):
+        with self.lock:
+            self.db.execute('DELETE FROM responses')
+            self.db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            count, total = self.db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'path': self.path,
+                'entries': count,
+                'bytes': total,
+                'ttl': self.ttl,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+                'saved_ms': self.saved_ms,
+                'evictions': self.evictions
+            }
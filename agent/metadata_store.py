@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Metadata Store
+Frontmatter das notas em SQLite (colunas tipadas e indexadas) e compilador
+de consultas estilo Dataview (LIST/TABLE/FROM/WHERE/SORT/LIMIT) para SQL
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS notes (
+    doc_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    folder TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    doc_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value_text TEXT,
+    value_num REAL
+);
+CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes (folder);
+CREATE INDEX IF NOT EXISTS idx_fields_doc ON fields (doc_id);
+CREATE INDEX IF NOT EXISTS idx_fields_text ON fields (key, value_text COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_fields_num ON fields (key, value_num);
+"""
+
+# Campos implícitos da nota (colunas da tabela notes)
+FILE_FIELDS = {'file.name': 'n.name', 'file.path': 'n.path', 'file.folder': 'n.folder'}
+
+QUERY_TOKEN_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|\'[^\']*\'|>=|<=|!=|=|>|<|\(|\)|,|[^\s,()=<>!]+')
+KEYWORDS = {'FROM', 'WHERE', 'SORT', 'LIMIT'}
+OPERATORS = {'=', '!=', '>', '>=', '<', '<='}
+
+
+def typed_value(value: Any) -> Tuple[str, Optional[float]]:
+    """Valor textual (sem aspas) e numérico (quando aplicável) de um campo"""
+    text = str(value).strip().strip('"\'')
+    try:
+        number = float(text)
+    except ValueError:
+        number = None
+    return text, number
+
+
+class MetadataStore:
+    """Indexador do VaultIndex que mantém o frontmatter em SQLite"""
+
+    name = 'metadata'
+    VERSION = 1
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # O acesso é serializado pelo lock do VaultIndex
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    # ==================== ESTADO ====================
+
+    def _checkpoint(self) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'checkpoint'").fetchone()
+        return int(row[0]) if row else 0
+
+    def get_state(self) -> Dict:
+        """Confirma a transação e devolve o checkpoint gravado junto com o índice"""
+        checkpoint = self._checkpoint() + 1
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('checkpoint', ?)", (str(checkpoint),))
+        self.conn.commit()
+        return {'checkpoint': checkpoint}
+
+    def set_state(self, state: Dict):
+        if state.get('checkpoint') != self._checkpoint():
+            raise ValueError(f"Banco de metadados fora de sincronia: {self.db_path}")
+
+    def reset(self):
+        self.conn.execute("DELETE FROM notes")
+        self.conn.execute("DELETE FROM fields")
+        self.conn.execute("DELETE FROM meta")
+        self.conn.commit()
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def add(self, doc_id: int, rel_path: str, note: Dict):
+        self.remove(doc_id, rel_path)
+        path = Path(rel_path)
+        folder = '' if str(path.parent) == '.' else path.parent.as_posix()
+        self.conn.execute(
+            "INSERT INTO notes (doc_id, path, name, folder) VALUES (?, ?, ?, ?)",
+            (doc_id, rel_path, path.stem, folder)
+        )
+
+        rows = []
+        for key, value in note['frontmatter'].items():
+            for item in value if isinstance(value, list) else [value]:
+                text, number = typed_value(item)
+                rows.append((doc_id, key, text, number))
+        self.conn.executemany(
+            "INSERT INTO fields (doc_id, key, value_text, value_num) VALUES (?, ?, ?, ?)", rows
+        )
+
+    def remove(self, doc_id: int, rel_path: str):
+        self.conn.execute("DELETE FROM notes WHERE doc_id = ?", (doc_id,))
+        self.conn.execute("DELETE FROM fields WHERE doc_id = ?", (doc_id,))
+
+    def rename(self, doc_id: int, old_path: str, new_path: str):
+        path = Path(new_path)
+        folder = '' if str(path.parent) == '.' else path.parent.as_posix()
+        self.conn.execute(
+            "UPDATE notes SET path = ?, name = ?, folder = ? WHERE doc_id = ?",
+            (new_path, path.stem, folder, doc_id)
+        )
+
+    # ==================== CONSULTAS ====================
+
+    def fields_of(self, doc_ids: List[int], keys: List[str]) -> Dict[int, Dict[str, Any]]:
+        """Valores dos campos pedidos para as notas (listas quando há vários valores)"""
+        values: Dict[int, Dict[str, Any]] = {doc_id: {} for doc_id in doc_ids}
+        if not doc_ids or not keys:
+            return values
+
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            sql = (
+                f"SELECT doc_id, key, value_text FROM fields "
+                f"WHERE doc_id IN ({','.join('?' * len(chunk))}) AND key IN ({','.join('?' * len(keys))})"
+            )
+            for doc_id, key, text in self.conn.execute(sql, chunk + keys):
+                current = values[doc_id].get(key)
+                if current is None:
+                    values[doc_id][key] = text
+                elif isinstance(current, list):
+                    current.append(text)
+                else:
+                    values[doc_id][key] = [current, text]
+        return values
+
+    def execute(self, sql: str, params: List[Any]) -> Iterator[Tuple[int, str]]:
+        """Linhas (doc_id, caminho) da consulta, lidas sob demanda"""
+        return self.conn.execute(sql, params)
+
+
+class DataviewQuery:
+    """Consulta compilada: SQL + filtros que não são resolvidos pelo SQLite"""
+
+    def __init__(self, query_type: str, columns: List[str], sql: str, params: List[Any],
+                 tag_expression: Optional[str], limit: Optional[int]):
+        self.query_type = query_type
+        self.columns = columns
+        self.sql = sql
+        self.params = params
+        self.tag_expression = tag_expression
+        self.limit = limit
+
+
+def compile_query(query: str) -> DataviewQuery:
+    """
+    Compila uma consulta estilo Dataview para SQL.
+
+    LIST | TABLE campo1, campo2
+    [FROM #tag (expressões AND/OR/NOT) | "pasta"]
+    [WHERE campo = "valor" AND (numero > 2 OR NOT status != "done")]
+    [SORT campo [ASC|DESC], ...]
+    [LIMIT n]
+
+    Operadores: = != > >= < <=; um campo sozinho testa se existe.
+    Campos implícitos: file.name, file.path, file.folder.
+    """
+    tokens = QUERY_TOKEN_PATTERN.findall(query.strip())
+    pos = 0
+
+    def peek(offset: int = 0) -> Optional[str]:
+        i = pos + offset
+        return tokens[i] if i < len(tokens) else None
+
+    def upper() -> Optional[str]:
+        token = peek()
+        return token.upper() if token is not None else None
+
+    def take() -> str:
+        nonlocal pos
+        token = peek()
+        if token is None:
+            raise ValueError(f"Consulta incompleta: {query}")
+        pos += 1
+        return token
+
+    def literal(token: str) -> str:
+        if len(token) >= 2 and token[0] == token[-1] and token[0] in '"\'':
+            return token[1:-1].replace('\\"', '"')
+        return token
+
+    # Tipo da consulta e colunas
+    query_type = take().upper()
+    columns = []
+    if query_type == 'TABLE':
+        while upper() not in KEYWORDS and peek() is not None:
+            token = take()
+            if token != ',':
+                columns.append(token)
+    elif query_type != 'LIST':
+        raise ValueError(f"Tipo de consulta não suportado: {query_type} (use LIST ou TABLE)")
+
+    where_sql = []
+    params: List[Any] = []
+    tag_expression = None
+    order_sql = []
+    order_params: List[Any] = []
+    limit = None
+
+    def comparison() -> str:
+        field = take()
+        op = peek() if peek() in OPERATORS else None
+        if op is None:
+            if field in FILE_FIELDS:
+                return f"{FILE_FIELDS[field]} IS NOT NULL"
+            params.append(field)
+            return "EXISTS (SELECT 1 FROM fields f WHERE f.doc_id = n.doc_id AND f.key = ?)"
+
+        take()
+        value = literal(take())
+        if field in FILE_FIELDS:
+            params.append(value)
+            return f"{FILE_FIELDS[field]} {op} ? COLLATE NOCASE"
+
+        text, number = typed_value(value)
+        column, operand = ('f.value_num', number) if number is not None else ('f.value_text', text)
+        collate = " COLLATE NOCASE" if number is None else ""
+        if op == '!=':
+            params.extend([field, operand])
+            return (f"NOT EXISTS (SELECT 1 FROM fields f WHERE f.doc_id = n.doc_id "
+                    f"AND f.key = ? AND {column} = ?{collate})")
+        params.extend([field, operand])
+        return (f"EXISTS (SELECT 1 FROM fields f WHERE f.doc_id = n.doc_id "
+                f"AND f.key = ? AND {column} {op} ?{collate})")
+
+    def parse_or() -> str:
+        parts = [parse_and()]
+        while upper() == 'OR':
+            take()
+            parts.append(parse_and())
+        return parts[0] if len(parts) == 1 else '(' + ' OR '.join(parts) + ')'
+
+    def parse_and() -> str:
+        parts = [parse_not()]
+        while upper() == 'AND':
+            take()
+            parts.append(parse_not())
+        return parts[0] if len(parts) == 1 else '(' + ' AND '.join(parts) + ')'
+
+    def parse_not() -> str:
+        if upper() == 'NOT':
+            take()
+            return f"NOT {parse_not()}"
+        if peek() == '(':
+            take()
+            inner = parse_or()
+            if take() != ')':
+                raise ValueError(f"Parêntese não fechado em: {query}")
+            return f"({inner})"
+        return comparison()
+
+    while peek() is not None:
+        keyword = take().upper()
+        if keyword == 'FROM':
+            source = []
+            while peek() is not None and upper() not in KEYWORDS:
+                source.append(take())
+            if len(source) == 1 and source[0][:1] in '"\'':
+                folder = literal(source[0]).strip('/')
+                escaped = folder.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                where_sql.append("(n.folder = ? OR n.folder LIKE ? ESCAPE '\\')")
+                params.extend([folder, escaped + '/%'])
+            elif source:
+                tag_expression = ' '.join(source)
+        elif keyword == 'WHERE':
+            where_sql.append(parse_or())
+        elif keyword == 'SORT':
+            while True:
+                field = take()
+                direction = 'ASC'
+                if upper() in ('ASC', 'DESC'):
+                    direction = take().upper()
+                if field in FILE_FIELDS:
+                    order_sql.append(f"{FILE_FIELDS[field]} {direction}")
+                else:
+                    order_sql.append(
+                        f"(SELECT MIN(f.value_num) FROM fields f WHERE f.doc_id = n.doc_id AND f.key = ?) {direction}, "
+                        f"(SELECT MIN(f.value_text) FROM fields f WHERE f.doc_id = n.doc_id AND f.key = ?) {direction}"
+                    )
+                    order_params.extend([field, field])
+                if peek() != ',':
+                    break
+                take()
+        elif keyword == 'LIMIT':
+            token = take()
+            if not token.isdigit():
+                raise ValueError(f"LIMIT inválido '{token}' em: {query}")
+            limit = int(token)
+        else:
+            raise ValueError(f"Cláusula inesperada '{keyword}' em: {query}")
+
+    sql = "SELECT n.doc_id, n.path FROM notes n"
+    if where_sql:
+        sql += " WHERE " + " AND ".join(where_sql)
+    order_sql.append("n.path ASC")
+    sql += " ORDER BY " + ", ".join(order_sql)
+    params += order_params
+
+    # Sem filtro por tag (feito fora do SQLite) o LIMIT vai para o SQL
+    if limit is not None and not tag_expression:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    return DataviewQuery(query_type, columns, sql, params, tag_expression, limit)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Note Analyzer
+Análise de uma nota em uma única passada (frontmatter, links, tags, tarefas,
+títulos, blocos e contagem de palavras) com cache por (caminho, mtime, tamanho)
+"""
+
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WIKILINK_PATTERN = re.compile(r'(!?)\[\[([^\]]+)\]\]')
+# Tag inline: '#' no início ou depois de um caractere que não é de palavra, com ao menos
+# uma letra (Unicode) no nome (#2024 não é tag)
+INLINE_TAG_PATTERN = re.compile(r'(?<![\w#])#([\w/-]*[^\W\d_][\w/-]*)')
+# Trechos em que '#' não inicia tag: código inline e destinos de links markdown
+INLINE_CODE_PATTERN = re.compile(r'`[^`\n]*`')
+MARKDOWN_LINK_TARGET_PATTERN = re.compile(r'\]\([^)]*\)')
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+TASK_PATTERN = re.compile(r'^(\s*)[-*+] \[([ xX])\]\s?(.*)$')
+BLOCK_ID_PATTERN = re.compile(r'(?:^|\s)\^([A-Za-z0-9-]+)\s*$')
+LIST_PATTERN = re.compile(r'(?:[-*+]|\d+[.)])\s')
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Quebra o texto em termos minúsculos"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def find_inline_tags(text: str) -> List[str]:
+    """Tags #inline de um texto, ignorando código inline e links (em [[Nota#Seção]] o '#' indica seção)"""
+    if '#' not in text:
+        return []
+    if '`' in text:
+        text = INLINE_CODE_PATTERN.sub(' ', text)
+    if '[' in text:
+        text = MARKDOWN_LINK_TARGET_PATTERN.sub('] ', WIKILINK_PATTERN.sub(' ', text))
+    return INLINE_TAG_PATTERN.findall(text)
+
+
+def parse_wikilink(embed: str, inner: str) -> Optional[Dict]:
+    """Converte o conteúdo de [[...]] em alvo, alias, seção (#Heading) e bloco (#^id)"""
+    target, _, alias = inner.partition('|')
+    target, _, fragment = target.partition('#')
+    target = target.strip()
+    if not target:
+        return None
+
+    fragment = fragment.strip()
+    is_block = fragment.startswith('^')
+    return {
+        'target': target,
+        'alias': alias.strip() or None,
+        'heading': fragment if fragment and not is_block else None,
+        'block': fragment[1:] if is_block else None,
+        'embed': bool(embed)
+    }
+
+
+def parse_frontmatter_line(line: str, frontmatter: Dict[str, Any]):
+    """Interpreta uma linha 'chave: valor' (ou 'chave: [a, b]') do frontmatter"""
+    if ':' not in line:
+        return
+    key, value = line.split(':', 1)
+    key = key.strip()
+    value = value.strip()
+
+    if value.startswith('[') and value.endswith(']'):
+        value = [v.strip() for v in value[1:-1].split(',')]
+
+    frontmatter[key] = value
+
+
+def analyze_content(content: str, with_terms: bool = False) -> Dict[str, Any]:
+    """
+    Analisa o conteúdo de uma nota percorrendo as linhas uma única vez.
+    Com with_terms=True inclui também, para o índice de busca, 'terms' (termo -> posições
+    dos tokens na nota) e 'line_starts' (posição do primeiro token de cada linha).
+    Títulos e blocos trazem o deslocamento em bytes (UTF-8) no arquivo; para que ele
+    seja exato em arquivos com CRLF o conteúdo deve ser lido com newline=''.
+    """
+    lines = content.split('\n')
+
+    frontmatter: Dict[str, Any] = {}
+    body_start = 0
+    if lines and lines[0].strip() == '---':
+        for i in range(1, len(lines)):
+            if lines[i].strip() == '---':
+                for fm_line in lines[1:i]:
+                    parse_frontmatter_line(fm_line, frontmatter)
+                body_start = i + 1
+                break
+
+    links: List[Dict] = []
+    inline_tags = set()
+    tasks: List[Dict] = []
+    headings: List[Dict] = []
+    blocks: List[Dict] = []
+    terms: Dict[str, List[int]] = {}
+    line_starts: List[int] = []
+    position = 0
+    word_count = 0
+
+    # Deslocamento em bytes do início da linha e do bloco (parágrafo ou item de lista) atual
+    offset = 0
+    block_start = None
+    previous_block = (0, 0)
+
+    for line_no, line in enumerate(lines, 1):
+        line_start = offset
+        offset += (len(line) if line.isascii() else len(line.encode('utf-8'))) + 1
+        line_end = offset - 1
+        if line.endswith('\r'):
+            line = line[:-1]
+            line_end -= 1
+
+        if with_terms:
+            line_starts.append(position)
+            for term in tokenize(line):
+                terms.setdefault(term, []).append(position)
+                position += 1
+
+        if '[[' in line:
+            for embed, inner in WIKILINK_PATTERN.findall(line):
+                link = parse_wikilink(embed, inner)
+                if link:
+                    link['line'] = line_no
+                    links.append(link)
+
+        if '#' in line:
+            inline_tags.update(find_inline_tags(line))
+
+        if line_no <= body_start:
+            continue
+
+        word_count += len(line.split())
+
+        stripped = line.lstrip()
+        if not stripped:
+            if block_start is not None:
+                previous_block = (block_start, previous_end)
+            block_start = None
+            continue
+
+        # Cada item de lista é um bloco; linhas seguidas formam um parágrafo
+        if block_start is None or LIST_PATTERN.match(stripped):
+            block_start = line_start
+        previous_end = line_end
+
+        if stripped.startswith('#'):
+            match = HEADING_PATTERN.match(line)
+            if match:
+                headings.append({
+                    'line': line_no,
+                    'level': len(match.group(1)),
+                    'text': match.group(2),
+                    'offset': line_start
+                })
+                # Um título é um bloco por si só
+                previous_block = (line_start, line_end)
+                block_start = None
+        elif stripped[:1] in '-*+' and '[' in stripped:
+            match = TASK_PATTERN.match(line)
+            if match:
+                tasks.append({
+                    'line': line_no,
+                    'text': match.group(3).strip(),
+                    'done': match.group(2) != ' ',
+                    'indent': len(match.group(1))
+                })
+
+        if '^' in line:
+            match = BLOCK_ID_PATTERN.search(line)
+            if match:
+                # '^id' sozinho em uma linha identifica o bloco anterior (ex: tabelas e citações)
+                if stripped.startswith('^') and block_start == line_start:
+                    start, end = previous_block
+                else:
+                    start, end = block_start if block_start is not None else line_start, line_end
+                blocks.append({'line': line_no, 'id': match.group(1), 'start': start, 'end': end})
+
+    tags = set(inline_tags)
+    fm_tags = frontmatter.get('tags')
+    if isinstance(fm_tags, list):
+        tags.update(fm_tags)
+    elif fm_tags:
+        tags.add(fm_tags)
+
+    note = {
+        'frontmatter': frontmatter,
+        'body_start': body_start,
+        'links': links,
+        'tags': sorted(tag.lstrip('#') for tag in tags if tag.lstrip('#')),
+        'tasks': tasks,
+        'headings': headings,
+        'blocks': blocks,
+        'word_count': word_count,
+        'line_count': len(lines),
+        'byte_length': offset - 1
+    }
+    if with_terms:
+        note['terms'] = terms
+        note['line_starts'] = line_starts
+    return note
+
+
+def split_frontmatter(content: str) -> Tuple[Dict[str, Any], str]:
+    """Separa frontmatter e corpo de uma nota"""
+    note = analyze_content(content)
+    if not note['body_start']:
+        return {}, content
+    body = '\n'.join(content.split('\n')[note['body_start']:])
+    return note['frontmatter'], body.strip()
+
+
+class NoteCache:
+    """Cache LRU das análises, válido enquanto (mtime, tamanho) do arquivo não mudam"""
+
+    # Quantidade máxima de notas mantidas em memória
+    MAX_ENTRIES = 20000
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self.entries: 'OrderedDict[str, Tuple[Tuple[float, int], Dict]]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, signature: Tuple[float, int]) -> Optional[Dict]:
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, path: str, signature: Tuple[float, int], note: Dict):
+        with self.lock:
+            self.entries[path] = (signature, note)
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard(self, path: str):
+        with self.lock:
+            self.entries.pop(path, None)
+
+    def analyze_file(self, path: str) -> Optional[Dict]:
+        """Análise de um arquivo (do cache ou lendo o arquivo uma única vez)"""
+        path = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.discard(path)
+            return None
+
+        signature = (st.st_mtime, st.st_size)
+        note = self.get(path, signature)
+        if note is not None:
+            return note
+
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                content = f.read()
+        except Exception as e:
+            logger.warning(f'[ANALYZER] Erro ao ler arquivo {path}: {str(e)}')
+            return None
+
+        note = analyze_content(content)
+        self.put(path, signature, note)
+        return note
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# ==================== INSTÂNCIAS ====================
+
+note_cache = NoteCache()
+
+
+def analyze_file(path: str) -> Optional[Dict]:
+    """Análise (em cache) de um arquivo de nota"""
+    return note_cache.analyze_file(path)
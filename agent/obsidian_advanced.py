@@ -4,47 +4,49 @@ Obsidian Advanced Features
 Funcionalidades avançadas para manipulação profunda do Obsidian
 """
 
-import re
 import json
+import re
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from vault_index import VaultIndex, get_vault_index
+from tag_index import iter_bits
+from date_index import period_range
+from metadata_store import compile_query
+from query_cache import normalize_query
+from query_planner import QueryPlanner
+from note_analyzer import BLOCK_ID_PATTERN, analyze_content, analyze_file, parse_wikilink, split_frontmatter
+
+EMBED_PATTERN = re.compile(r'!\[\[([^\]]+)\]\]')
+
+
 class ObsidianAdvanced:
     """Classe para funcionalidades avançadas do Obsidian"""
     
-    def __init__(self, vault_path: str = None):
+    def __init__(self, vault_path: str = None, index: Optional[VaultIndex] = None):
         self.vault_path = Path(vault_path) if vault_path else None
         self.obsidian_folder = self.vault_path / '.obsidian' if self.vault_path else None
+        self._index = index
+    
+    @property
+    def index(self) -> VaultIndex:
+        """Índice persistente do vault (compartilhado entre instâncias)"""
+        if self._index is None:
+            self._index = get_vault_index(str(self.vault_path))
+        self._index.refresh()
+        return self._index
     
     # ==================== FRONTMATTER ====================
     
+    def analyze_note(self, note_path: str) -> Optional[Dict]:
+        """Análise da nota (frontmatter, links, tags, tarefas, títulos, blocos, palavras) em cache"""
+        return analyze_file(str(self.vault_path / note_path))
+    
     def parse_frontmatter(self, content: str) -> tuple:
         """Extrai frontmatter e conteúdo de uma nota"""
-        if not content.startswith('---'):
-            return {}, content
-        
-        parts = content.split('---', 2)
-        if len(parts) < 3:
-            return {}, content
-        
-        try:
-            frontmatter = {}
-            for line in parts[1].strip().split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    # Parse arrays
-                    if value.startswith('[') and value.endswith(']'):
-                        value = [v.strip() for v in value[1:-1].split(',')]
-                    
-                    frontmatter[key] = value
-            
-            return frontmatter, parts[2].strip()
-        except:
-            return {}, content
+        return split_frontmatter(content)
     
     def create_frontmatter(self, metadata: Dict) -> str:
         """Cria frontmatter YAML a partir de metadados"""
@@ -61,47 +63,13 @@ class ObsidianAdvanced:
     
     def extract_wikilinks(self, content: str) -> List[str]:
         """Extrai todos os wikilinks de uma nota"""
-        pattern = r'\[\[([^\]]+)\]\]'
-        matches = re.findall(pattern, content)
-        
-        links = []
-        for match in matches:
-            # Separar alias se existir
-            if '|' in match:
-                link = match.split('|')[0]
-            else:
-                link = match
-            
-            # Remover seção/bloco se existir
-            if '#' in link:
-                link = link.split('#')[0]
-            
-            links.append(link.strip())
-        
-        return list(set(links))
+        return list({link['target'] for link in analyze_content(content)['links']})
     
     def get_backlinks(self, note_name: str) -> List[Dict]:
         """Encontra todas as notas que linkam para a nota especificada"""
-        backlinks = []
-        
-        for md_file in self.vault_path.rglob('*.md'):
-            if md_file.stem == note_name:
-                continue
-            
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    links = self.extract_wikilinks(content)
-                    
-                    if note_name in links:
-                        backlinks.append({
-                            'name': md_file.stem,
-                            'path': str(md_file.relative_to(self.vault_path))
-                        })
-            except:
-                continue
-        
-        return backlinks
+        index = self.index
+        with index.lock:
+            return index.indexers['links'].backlinks(note_name)
     
     def create_wikilink(self, target: str, alias: Optional[str] = None, 
                        section: Optional[str] = None) -> str:
@@ -117,13 +85,83 @@ class ObsidianAdvanced:
         link += ']]'
         return link
     
+    # ==================== ÂNCORAS ====================
+    
+    def resolve_link(self, link: str) -> Optional[Dict]:
+        """Localiza o alvo de um link ([[Nota#Seção]], ![[Nota#^id]] ou 'Nota#Seção') no vault"""
+        inner = link.strip().lstrip('!')
+        if inner.startswith('[[') and inner.endswith(']]'):
+            inner = inner[2:-2]
+        parsed = parse_wikilink('', inner)
+        if parsed is None:
+            raise ValueError(f"Link inválido: {link}")
+        
+        index = self.index
+        with index.lock:
+            location = index.indexers['anchors'].resolve(parsed['target'], parsed['heading'], parsed['block'])
+            if location:
+                location['signature'] = index.files.get(location['path'])
+        return location
+    
+    def read_fragment(self, link: str) -> Optional[Dict]:
+        """Trecho apontado por um link, lido a partir do deslocamento indexado (sem ler a nota inteira)"""
+        location = self.resolve_link(link)
+        if location is None:
+            return None
+        
+        full_path = self.vault_path / location['path']
+        st = full_path.stat()
+        if (st.st_mtime, st.st_size) != location['signature']:
+            # A nota mudou depois da última indexação: reindexa antes de usar os deslocamentos
+            self.index.update_file(location['path'])
+            location = self.resolve_link(link)
+            if location is None:
+                return None
+        
+        with open(full_path, 'rb') as f:
+            f.seek(location['start'])
+            data = f.read(location['end'] - location['start'])
+        
+        content = data.decode('utf-8', errors='replace').replace('\r\n', '\n').strip()
+        if location['kind'] == 'note':
+            content = split_frontmatter(content)[1]
+        elif location['kind'] == 'block':
+            content = BLOCK_ID_PATTERN.sub('', content).rstrip()
+        
+        del location['signature']
+        location['content'] = content
+        return location
+    
+    def render_embeds(self, content: str, max_depth: int = 3) -> str:
+        """Substitui ![[Nota]], ![[Nota#Seção]] e ![[Nota#^id]] pelo trecho correspondente"""
+        def replace(match, depth):
+            fragment = self.read_fragment(match.group(0))
+            if fragment is None:
+                # Anexos (imagens, PDFs) e alvos inexistentes ficam como estão
+                return match.group(0)
+            text = fragment['content']
+            if depth < max_depth:
+                text = EMBED_PATTERN.sub(lambda m: replace(m, depth + 1), text)
+            return text
+        
+        return EMBED_PATTERN.sub(lambda m: replace(m, 1), content)
+    
+    # ==================== AUTOCOMPLETAR ====================
+    
+    def autocomplete(self, prefix: str, limit: int = 10, kinds: Optional[List[str]] = None) -> Dict:
+        """Notas (título ou alias, mais recentes primeiro) e tags (mais usadas primeiro) que começam com o prefixo"""
+        index = self.index
+        with index.lock:
+            result = index.indexers['completions'].complete(prefix, limit, index.files, kinds or ('notes', 'tags'))
+        return dict(result)
+    
     # ==================== TAGS ====================
     
     def extract_tags(self, content: str, frontmatter: Dict = None) -> List[str]:
         """Extrai todas as tags de uma nota (inline e frontmatter)"""
-        tags = set()
+        tags = set(analyze_content(content)['tags'])
         
-        # Tags do frontmatter
+        # Tags de um frontmatter informado separadamente
         if frontmatter and 'tags' in frontmatter:
             fm_tags = frontmatter['tags']
             if isinstance(fm_tags, list):
@@ -131,33 +169,30 @@ class ObsidianAdvanced:
             else:
                 tags.add(fm_tags)
         
-        # Tags inline
-        pattern = r'#([a-zA-Z0-9_/-]+)'
-        inline_tags = re.findall(pattern, content)
-        tags.update(inline_tags)
-        
         return sorted(list(tags))
     
     def find_notes_by_tag(self, tag: str) -> List[Dict]:
-        """Encontra todas as notas com uma tag específica"""
-        notes = []
-        
-        for md_file in self.vault_path.rglob('*.md'):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    frontmatter, _ = self.parse_frontmatter(content)
-                    tags = self.extract_tags(content, frontmatter)
-                    
-                    if tag in tags:
-                        notes.append({
-                            'name': md_file.stem,
-                            'path': str(md_file.relative_to(self.vault_path)),
-                            'tags': tags
-                        })
-            except:
-                continue
+        """Encontra todas as notas com uma tag específica (inclui subtags: #projeto casa #projeto/trabalho)"""
+        return self.query_tags(f'#{tag.lstrip("#")}')
+    
+    def query_tags(self, expression: str) -> List[Dict]:
+        """Consulta tags com AND/OR/NOT (ex: '#projeto AND NOT #arquivado')"""
+        index = self.index
+        return index.cached_query(('tags', normalize_query(expression)), lambda: self._query_tags(index, expression))
+    
+    def _query_tags(self, index: VaultIndex, expression: str) -> List[Dict]:
+        with index.lock:
+            tags = index.indexers['tags']
+            notes = []
+            for doc_id in iter_bits(tags.query(expression)):
+                rel_path = index.paths[doc_id]
+                notes.append({
+                    'name': Path(rel_path).stem,
+                    'path': rel_path,
+                    'tags': tags.tags_of(doc_id)
+                })
         
+        notes.sort(key=lambda n: n['path'])
         return notes
     
     # ==================== TEMPLATES ====================
@@ -186,87 +221,112 @@ class ObsidianAdvanced:
     
     # ==================== DATAVIEW ====================
     
-    def simple_dataview_query(self, query_type: str, source: str, 
-                             where: Optional[str] = None) -> List[Dict]:
-        """Executa uma query Dataview simples"""
+    def dataview_query(self, query: str) -> Dict:
+        """
+        Executa uma query estilo Dataview sobre o frontmatter indexado em SQLite.
+        Ex: TABLE status, prioridade FROM #projeto WHERE prioridade >= 2 SORT prioridade DESC LIMIT 10
+        """
+        index = self.index
+        return index.cached_query(('dataview', normalize_query(query)), lambda: self._dataview_query(index, query))
+    
+    def _dataview_query(self, index: VaultIndex, query: str) -> Dict:
+        compiled = compile_query(query)
+        with index.lock:
+            metadata = index.indexers['metadata']
+            rows = metadata.execute(compiled.sql, compiled.params)
+            
+            # Fonte por tag: filtra pelos bitmaps do índice de tags, lendo do cursor
+            # só até completar o LIMIT (sem tag o LIMIT já foi aplicado no SQL)
+            if compiled.tag_expression:
+                bits = index.indexers['tags'].query(compiled.tag_expression)
+                rows = ((doc_id, path) for doc_id, path in rows if bits >> doc_id & 1)
+            rows = list(islice(rows, compiled.limit))
+            
+            values = metadata.fields_of([doc_id for doc_id, _ in rows], compiled.columns)
+        
         results = []
+        for doc_id, path in rows:
+            note = {'name': Path(path).stem, 'path': path}
+            if compiled.query_type == 'TABLE':
+                note['fields'] = {column: values[doc_id].get(column) for column in compiled.columns}
+            results.append(note)
         
-        # Determinar fonte (tag ou pasta)
+        return {'type': compiled.query_type, 'columns': compiled.columns, 'results': results}
+    
+    def simple_dataview_query(self, query_type: str, source: str, 
+                             where: Optional[str] = None) -> List[Dict]:
+        """Executa uma query Dataview simples (fonte #tag ou pasta, filtro WHERE opcional)"""
         if source.startswith('#'):
-            # Query por tag
-            tag = source[1:]
-            results = self.find_notes_by_tag(tag)
+            query = f'LIST FROM {source}'
         else:
-            # Query por pasta
-            folder = self.vault_path / source.strip('"')
-            if folder.exists():
-                for md_file in folder.rglob('*.md'):
-                    results.append({
-                        'name': md_file.stem,
-                        'path': str(md_file.relative_to(self.vault_path))
-                    })
-        
-        # Aplicar filtro WHERE
-        if where and results:
-            # Implementação simples de filtro
-            filtered = []
-            for note in results:
-                # Carregar conteúdo para verificar condição
-                note_path = self.vault_path / note['path']
-                try:
-                    with open(note_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        frontmatter, _ = self.parse_frontmatter(content)
-                        
-                        # Verificar condição simples (ex: status = "done")
-                        if '=' in where:
-                            field, value = where.split('=')
-                            field = field.strip()
-                            value = value.strip().strip('"')
-                            
-                            if frontmatter.get(field) == value:
-                                filtered.append(note)
-                except:
-                    continue
-            
-            results = filtered
+            query = f'LIST FROM "{source.strip(chr(34))}"'
+        if where:
+            query += f' WHERE {where}'
         
-        return results
+        return self.dataview_query(query)['results']
+    
+    # ==================== CONSULTA COMBINADA ====================
+    
+    def find_notes(self, folder: Optional[str] = None, tag: Optional[str] = None, text: Optional[str] = None,
+                   modified_since=None, limit: Optional[int] = 100, explain: bool = False) -> Dict:
+        """
+        Notas que satisfazem pasta, expressão de tags, texto e data de modificação ao mesmo tempo,
+        começando pelo filtro mais seletivo (explain=True inclui o plano e os tempos)
+        """
+        index = self.index
+        planner = QueryPlanner(index)
+        if explain:
+            return planner.run(folder, tag, text, modified_since, limit, explain=True)
+        key = ('find', folder, tag and normalize_query(tag), text and normalize_query(text), modified_since, limit)
+        return index.cached_query(key, lambda: planner.run(folder, tag, text, modified_since, limit))
+    
+    # ==================== DATAS ====================
+    
+    def notes_by_date(self, start: Optional[str] = None, end: Optional[str] = None,
+                      period: Optional[str] = None) -> List[Dict]:
+        """Notas por data (nome do arquivo ou campo date) em um intervalo ISO ou período nomeado"""
+        if period:
+            start, end = period_range(period)
+        index = self.index
+        with index.lock:
+            return index.indexers['dates'].between(start, end)
+    
+    # ==================== TAREFAS ====================
+    
+    def query_tasks(self, status: str = 'open', due_before: Optional[str] = None, tag: Optional[str] = None,
+                    folder: Optional[str] = None, limit: Optional[int] = 100, offset: int = 0) -> Dict:
+        """Tarefas do vault (- [ ] / - [x]) filtradas por estado, vencimento, tag e pasta"""
+        index = self.index
+        with index.lock:
+            tasks = index.indexers['tasks']
+            result = tasks.query(status, due_before, tag, folder, limit, offset)
+            result['counts'] = tasks.counts()
+        return result
     
     # ==================== GRAPH ====================
     
-    def generate_graph_data(self) -> Dict:
-        """Gera dados para visualização de grafo"""
-        nodes = []
-        edges = []
-        
-        for md_file in self.vault_path.rglob('*.md'):
-            try:
-                # Adicionar nó
-                node_id = md_file.stem
-                nodes.append({
-                    'id': node_id,
-                    'label': node_id,
-                    'path': str(md_file.relative_to(self.vault_path))
-                })
-                
-                # Adicionar arestas (links)
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    links = self.extract_wikilinks(content)
-                    
-                    for link in links:
-                        edges.append({
-                            'from': node_id,
-                            'to': link
-                        })
-            except:
-                continue
-        
-        return {
-            'nodes': nodes,
-            'edges': edges
-        }
+    def generate_graph_data(self, since: Optional[int] = None) -> Dict:
+        """Gera dados para visualização de grafo (ou o delta desde uma versão)"""
+        index = self.index
+        with index.lock:
+            links = index.indexers['links']
+            if since is not None:
+                return links.delta(since)
+            return links.graph()
+    
+    def link_report(self, kind: str = 'all', limit: Optional[int] = 100, offset: int = 0) -> Dict:
+        """Links não resolvidos e notas órfãs (mantidos pelo índice de links a cada alteração)"""
+        if kind not in ('all', 'unresolved', 'orphans'):
+            raise ValueError(f"Tipo de relatório inválido: {kind} (use all, unresolved ou orphans)")
+        index = self.index
+        with index.lock:
+            links = index.indexers['links']
+            report = {'counts': links.report_counts()}
+            if kind in ('all', 'unresolved'):
+                report['unresolved'] = links.unresolved_links(limit, offset)
+            if kind in ('all', 'orphans'):
+                report['orphans'] = links.orphan_notes(limit, offset)
+        return report
     
     # ==================== CONFIGURAÇÃO ====================
     
@@ -303,33 +363,16 @@ class ObsidianAdvanced:
     # ==================== ESTATÍSTICAS ====================
     
     def get_vault_stats(self) -> Dict:
-        """Retorna estatísticas do vault"""
-        total_notes = 0
-        total_words = 0
-        total_links = 0
-        all_tags = set()
-        
-        for md_file in self.vault_path.rglob('*.md'):
-            try:
-                total_notes += 1
-                
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    frontmatter, body = self.parse_frontmatter(content)
-                    
-                    # Contar palavras
-                    words = len(body.split())
-                    total_words += words
-                    
-                    # Contar links
-                    links = self.extract_wikilinks(content)
-                    total_links += len(links)
-                    
-                    # Coletar tags
-                    tags = self.extract_tags(content, frontmatter)
-                    all_tags.update(tags)
-            except:
-                continue
+        """Retorna estatísticas do vault (a partir do índice, sem reanalisar as notas)"""
+        index = self.index
+        with index.lock:
+            links = index.indexers['links']
+            tags = index.indexers['tags']
+            total_notes = len(index.word_counts)
+            total_words = sum(index.word_counts.values())
+            total_links = sum(len({link['target'] for link in note_links})
+                              for note_links in links.forward.values())
+            all_tags = {tag for note_tags in tags.doc_tags.values() for tag in note_tags}
         
         return {
             'total_notes': total_notes,
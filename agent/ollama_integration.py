@@ -9,6 +9,8 @@ import requests
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+import http_pool
+
 class OllamaIntegration:
     VERSION = "2.0.0"
     def __init__(self, base_url: str = "http://localhost:11434"):
@@ -37,7 +39,7 @@ class OllamaIntegration:
                 return {"success": False, "error": "Ollama nao disponivel"}
         model = model or self.default_model
         try:
-            response = requests.post(f"{self.base_url}/api/generate", json={"model": model, "prompt": prompt, "stream": False}, timeout=120)
+            response = http_pool.post(f"{self.base_url}/api/generate", json={"model": model, "prompt": prompt, "stream": False}, timeout=120)
             if response.status_code == 200:
                 data = response.json()
                 return {"success": True, "response": data.get("response", ""), "model": model, "provider": "ollama"}
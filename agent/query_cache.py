@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Query Cache
+Cache LRU dos resultados de consultas (busca, tags, Dataview) por consulta
+normalizada e geração do vault, com limite de entradas e de memória
+"""
+
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+QUOTED_PATTERN = re.compile(r'("[^"]*"|\'[^\']*\')')
+SPACES_PATTERN = re.compile(r'\s+')
+
+
+def normalize_query(query: str) -> str:
+    """Remove espaços repetidos fora de aspas ('a   AND  b' e ' a AND b' viram a mesma chave)"""
+    parts = QUOTED_PATTERN.split(query.strip())
+    return ''.join(part if i % 2 else SPACES_PATTERN.sub(' ', part) for i, part in enumerate(parts))
+
+
+def estimate_size(value: Any) -> int:
+    """Tamanho aproximado de um resultado em bytes (serializado)"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class QueryCache:
+    """
+    Resultados indexados por (chave, geração). A geração do vault só cresce, então ao
+    ver uma geração nova todas as entradas anteriores são descartadas de uma vez.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()   # chave -> (valor, bytes)
+        self.generation = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _advance(self, generation: int):
+        if generation > self.generation:
+            self.entries.clear()
+            self.bytes = 0
+            self.generation = generation
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        with self.lock:
+            self._advance(generation)
+            entry = self.entries.get(key) if generation == self.generation else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, generation: int, value: Any):
+        size = estimate_size(value)
+        # Um resultado grande demais expulsaria o cache inteiro
+        if not size or size > self.max_bytes // 4:
+            return
+        with self.lock:
+            self._advance(generation)
+            if generation != self.generation:
+                return
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'generation': self.generation,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Query Planner
+Consultas que combinam pasta, tag, texto e data de modificação: estima a
+seletividade de cada filtro pelas estatísticas dos índices, começa pelo mais
+seletivo e intersecta os IDs das notas antes de ler qualquer arquivo
+"""
+
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from search_query import intersect_sorted, parse_query
+from tag_index import iter_bits
+
+
+def parse_since(value) -> float:
+    """Data de corte (AAAA-MM-DD, data/hora ISO ou timestamp) em segundos desde a época"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"Data inválida: {value} (use AAAA-MM-DD ou AAAA-MM-DDTHH:MM)")
+
+
+# ==================== FILTROS ====================
+
+class FolderFilter:
+    """Notas dentro da pasta (intervalo contíguo da lista de caminhos ordenada)"""
+
+    name = 'folder'
+
+    def __init__(self, index, folder: str):
+        self.value = folder.replace('\\', '/').strip('/')
+        prefix = self.value + '/'
+        view = index.sorted_view('path')
+        lo = bisect_left(view, (prefix,))
+        # '0' é o caractere seguinte a '/': fim do intervalo da pasta
+        hi = bisect_left(view, (self.value + '0',), lo)
+        self.docs = view[lo:hi]
+
+    def estimate(self) -> int:
+        return len(self.docs)
+
+    def run(self, candidates: Optional[List[int]]) -> List[int]:
+        docs = sorted(doc_id for _, doc_id in self.docs)
+        return docs if candidates is None else intersect_sorted(candidates, docs)
+
+
+class TagFilter:
+    """Notas que satisfazem uma expressão de tags (bitmaps do índice de tags)"""
+
+    name = 'tag'
+
+    def __init__(self, index, expression: str):
+        self.value = expression
+        self.bits = index.indexers['tags'].query(expression)
+
+    def estimate(self) -> int:
+        return bin(self.bits).count('1')
+
+    def run(self, candidates: Optional[List[int]]) -> List[int]:
+        if candidates is None:
+            return list(iter_bits(self.bits))
+        bits = self.bits
+        return [doc_id for doc_id in candidates if bits >> doc_id & 1]
+
+
+class ModifiedFilter:
+    """Notas modificadas a partir da data (sufixo da lista ordenada por mtime)"""
+
+    name = 'modified_since'
+
+    def __init__(self, index, since):
+        self.value = since
+        self.since = parse_since(since)
+        self.index = index
+        view = index.sorted_view('mtime')
+        self.docs = view[bisect_left(view, (self.since,)):]
+
+    def estimate(self) -> int:
+        return len(self.docs)
+
+    def run(self, candidates: Optional[List[int]]) -> List[int]:
+        if candidates is None or len(candidates) > len(self.docs):
+            docs = sorted(doc_id for _, doc_id in self.docs)
+            return docs if candidates is None else intersect_sorted(candidates, docs)
+        files, paths, since = self.index.files, self.index.paths, self.since
+        return [doc_id for doc_id in candidates if files[paths[doc_id]][0] >= since]
+
+
+class TextFilter:
+    """Notas que satisfazem a consulta de texto (termos, frases, NEAR e operadores)"""
+
+    name = 'text'
+
+    def __init__(self, index, query: str):
+        self.index = index
+        self.value = query
+        self.tree = parse_query(query)
+        self.lookups: Dict = {}
+        self.matched: Dict[int, List] = {}
+
+    def estimate(self) -> int:
+        if self.tree is None:
+            return 0
+        return self.index._estimate(self.tree, self.lookups)
+
+    def run(self, candidates: Optional[List[int]]) -> List[int]:
+        if self.tree is None:
+            return []
+        self.matched = self.index._evaluate(self.tree, candidates, self.lookups)
+        return sorted(self.matched)
+
+
+# ==================== PLANEJADOR ====================
+
+class QueryPlanner:
+    """Monta e executa o plano de uma consulta combinada sobre um VaultIndex"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def run(self, folder: Optional[str] = None, tag: Optional[str] = None, text: Optional[str] = None,
+            modified_since=None, limit: Optional[int] = 100, max_matches: int = 3, explain: bool = False) -> Dict:
+        """
+        Notas que satisfazem todos os filtros informados, ordenadas pelo caminho. Os filtros
+        são aplicados do mais seletivo (menor estimativa) para o menos seletivo, cada um só
+        sobre as notas que restaram; apenas as notas da página retornada são lidas
+        (para os trechos do texto). Com explain, inclui o plano e os tempos de cada etapa.
+        """
+        index = self.index
+        started = time.perf_counter()
+        plan = []
+
+        with index.lock:
+            filters = []
+            if folder and folder.strip('/\\'):
+                filters.append(FolderFilter(index, folder))
+            if tag:
+                filters.append(TagFilter(index, tag))
+            if modified_since not in (None, ''):
+                filters.append(ModifiedFilter(index, modified_since))
+            text_filter = TextFilter(index, text) if text and text.strip() else None
+            if text_filter is not None:
+                filters.append(text_filter)
+            if not filters:
+                raise ValueError("Informe ao menos um filtro: folder, tag, text ou modified_since")
+
+            estimated = []
+            for step in filters:
+                step_start = time.perf_counter()
+                estimated.append((step.estimate(), (time.perf_counter() - step_start) * 1000, step))
+            estimated.sort(key=lambda item: item[0])
+
+            candidates = None
+            for estimate, estimate_ms, step in estimated:
+                step_start = time.perf_counter()
+                if candidates is not None and not candidates:
+                    plan.append({'filter': step.name, 'value': step.value, 'estimate': estimate,
+                                 'input': 0, 'rows': 0, 'skipped': True, 'ms': 0.0})
+                    continue
+                rows = step.run(candidates)
+                plan.append({
+                    'filter': step.name,
+                    'value': step.value,
+                    'estimate': estimate,
+                    'input': len(index.paths) if candidates is None else len(candidates),
+                    'rows': len(rows),
+                    'ms': round(estimate_ms + (time.perf_counter() - step_start) * 1000, 3)
+                })
+                candidates = rows
+
+            found = sorted((index.paths[doc_id], doc_id) for doc_id in candidates)
+            total = len(found)
+            if limit is not None:
+                found = found[:limit]
+
+            hits = []
+            for rel_path, doc_id in found:
+                lines = []
+                if text_filter is not None and max_matches and text_filter.matched.get(doc_id):
+                    line_sets = [index._lines_of(doc_id, position_lists)
+                                 for position_lists in text_filter.matched[doc_id]]
+                    lines = sorted(set.intersection(*line_sets) or set.union(*line_sets))[:max_matches]
+                hits.append((rel_path, lines))
+
+        read_start = time.perf_counter()
+        results = [index._build_result(rel_path, lines) for rel_path, lines in hits]
+        result = {'total': total, 'results': results}
+        if explain:
+            result['plan'] = plan
+            result['read_ms'] = round((time.perf_counter() - read_start) * 1000, 3)
+            result['total_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return result
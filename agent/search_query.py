@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Search Query
+Parser das consultas de busca de conteúdo: termos (por prefixo), "frases exatas",
+proximidade (a NEAR/5 b) e operadores AND/OR/NOT com parênteses
+"""
+
+import re
+from bisect import bisect_left
+from typing import List, Optional, Sequence, Tuple
+
+from note_analyzer import tokenize
+
+QUERY_TOKEN_PATTERN = re.compile(r'"[^"]*"?|\(|\)|[^\s()"]+')
+NEAR_PATTERN = re.compile(r'NEAR(?:/(\d+))?$')
+
+# Distância máxima (em palavras) de NEAR sem /k
+DEFAULT_NEAR = 5
+
+# Nós da consulta (tuplas):
+#   ('term', termo, prefixo?)  ('phrase', [termos])  ('near', esquerda, direita, k)
+#   ('and', [filhos])  ('or', [filhos])  ('not', filho)
+Node = Tuple
+
+
+def parse_query(query: str) -> Optional[Node]:
+    """
+    Converte a consulta em árvore. Precedência: OR < AND (implícito entre termos) < NOT (ou -termo) < NEAR.
+    Operadores só em maiúsculas; palavras sem aspas casam por prefixo, frases casam termos exatos.
+    """
+    tokens = QUERY_TOKEN_PATTERN.findall(query)
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take() -> str:
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or() -> Optional[Node]:
+        children = [parse_and()]
+        while peek() == 'OR':
+            take()
+            children.append(parse_and())
+        children = [c for c in children if c is not None]
+        if len(children) <= 1:
+            return children[0] if children else None
+        return ('or', children)
+
+    def parse_and() -> Optional[Node]:
+        children = []
+        while peek() is not None and peek() not in ('OR', ')'):
+            if peek() == 'AND':
+                take()
+                continue
+            node = parse_not()
+            if node is not None:
+                children.append(node)
+        if len(children) <= 1:
+            return children[0] if children else None
+        return ('and', children)
+
+    def parse_not() -> Optional[Node]:
+        token = peek()
+        if token is None:
+            return None
+        if token == 'NOT':
+            take()
+            child = parse_not()
+            return ('not', child) if child is not None else None
+        if token.startswith('-') and len(token) > 1:
+            tokens[pos] = token[1:]
+            child = parse_not()
+            return ('not', child) if child is not None else None
+        return parse_near()
+
+    def parse_near() -> Optional[Node]:
+        left = parse_atom()
+        while peek() is not None and NEAR_PATTERN.match(peek()):
+            match = NEAR_PATTERN.match(take())
+            distance = int(match.group(1)) if match.group(1) else DEFAULT_NEAR
+            right = parse_atom() if peek() not in (None, ')', 'OR', 'AND', 'NOT') else None
+            if left is None or right is None:
+                left = left or right
+                continue
+            left = ('near', left, right, distance)
+        return left
+
+    def parse_atom() -> Optional[Node]:
+        token = take()
+        if token == '(':
+            node = parse_or()
+            if peek() == ')':
+                take()
+            return node
+        if token == ')':
+            return None
+        if token.startswith('"'):
+            terms = tokenize(token.strip('"'))
+            if not terms:
+                return None
+            return ('phrase', terms) if len(terms) > 1 else ('term', terms[0], False)
+        terms = tokenize(token)
+        if not terms:
+            return None
+        # 'e-mail' e similares viram uma frase
+        return ('phrase', terms) if len(terms) > 1 else ('term', terms[0], True)
+
+    node = parse_or()
+    # Parênteses fechados a mais são ignorados
+    while peek() is not None:
+        take()
+        rest = parse_or()
+        if rest is not None:
+            node = ('and', [node, rest]) if node is not None else rest
+    return node
+
+
+def positive_leaves(node: Optional[Node], negated: bool = False) -> List[Node]:
+    """Termos e frases que devem aparecer no resultado (fora de NOT), para trechos e ranking"""
+    if node is None:
+        return []
+    kind = node[0]
+    if kind in ('term', 'phrase'):
+        return [] if negated else [node]
+    if kind == 'not':
+        return positive_leaves(node[1], not negated)
+    if kind == 'near':
+        return positive_leaves(node[1], negated) + positive_leaves(node[2], negated)
+    return [leaf for child in node[1] for leaf in positive_leaves(child, negated)]
+
+
+def is_simple(node: Optional[Node]) -> bool:
+    """Consulta só com termos por prefixo (sem frases, proximidade ou operadores)"""
+    if node is None:
+        return True
+    if node[0] == 'term':
+        return node[2]
+    if node[0] == 'and':
+        return all(child[0] == 'term' and child[2] for child in node[1])
+    return False
+
+
+# ==================== LISTAS ORDENADAS ====================
+
+def gallop(values: Sequence[int], target: int, lo: int = 0) -> int:
+    """Primeira posição >= lo com values[i] >= target (busca exponencial seguida de binária)"""
+    size = len(values)
+    if lo >= size or values[lo] >= target:
+        return lo
+    step = 1
+    hi = lo + 1
+    while hi < size and values[hi] < target:
+        lo = hi
+        step *= 2
+        hi = lo + step
+    return bisect_left(values, target, lo + 1, min(hi, size))
+
+
+def intersect_sorted(small: Sequence[int], large: Sequence[int]) -> List[int]:
+    """Interseção de listas ordenadas percorrendo a menor e galopando na maior"""
+    if len(small) > len(large):
+        small, large = large, small
+    result = []
+    pos = 0
+    for value in small:
+        pos = gallop(large, value, pos)
+        if pos == len(large):
+            break
+        if large[pos] == value:
+            result.append(value)
+    return result
+
+
+def phrase_starts(position_lists: List[Sequence[int]]) -> List[int]:
+    """Posições em que os termos aparecem em sequência (a lista mais curta guia a busca)"""
+    anchor = min(range(len(position_lists)), key=lambda i: len(position_lists[i]))
+    starts = [p - anchor for p in position_lists[anchor]]
+    for offset, positions in enumerate(position_lists):
+        if offset == anchor or not starts:
+            continue
+        shifted = [start + offset for start in starts]
+        starts = [p - offset for p in intersect_sorted(shifted, positions)]
+    return starts
+
+
+def near_matches(left: Sequence[int], right: Sequence[int], distance: int) -> List[int]:
+    """Posições de left e right que têm uma ocorrência do outro lado a no máximo distance palavras"""
+    matches = set()
+    j = 0
+    for a in left:
+        j = gallop(right, a - distance, j)
+        k = j
+        while k < len(right) and right[k] <= a + distance:
+            matches.add(a)
+            matches.add(right[k])
+            k += 1
+    return sorted(matches)
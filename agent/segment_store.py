@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Segment Store
+Segmentos imutáveis do índice de texto em disco: postings com delta + varint,
+dicionário de termos com front coding, checksums e leitura via mmap
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b'OASG'
+FORMAT_VERSION = 1
+
+# Termos por bloco do dicionário (o primeiro termo de cada bloco é gravado inteiro)
+BLOCK_SIZE = 16
+
+# magic, versão, termos por bloco, termos, blocos, início do dicionário, início do
+# índice de blocos, crc das postings, crc do dicionário + índice, crc do cabeçalho
+HEADER = struct.Struct('<4sHHIIQQIII')
+
+
+class SegmentError(Exception):
+    """Segmento inválido ou corrompido"""
+
+
+# ==================== VARINT ====================
+
+def write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos: int) -> Tuple[int, int]:
+    byte = data[pos]
+    pos += 1
+    if byte < 0x80:
+        return byte, pos
+    value = byte & 0x7F
+    shift = 7
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def decode_varints(data: bytes) -> List[int]:
+    """Decodifica uma sequência de varints (direto dos bytes quando todos têm um byte só)"""
+    if data.isascii():
+        return list(data)
+    values = []
+    value = 0
+    shift = 0
+    for byte in data:
+        if byte < 0x80:
+            values.append(value | (byte << shift))
+            value = 0
+            shift = 0
+        else:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+    return values
+
+
+def encode_postings(postings: Dict[int, List[int]]) -> bytearray:
+    """
+    {doc_id: [posições]} -> nº de notas seguido de três sequências de varints: deltas
+    dos doc_ids, nº de posições por nota e deltas das posições (reiniciados a cada nota)
+    """
+    docs = bytearray()
+    sizes = bytearray()
+    positions = bytearray()
+    previous_doc = 0
+    for doc_id in sorted(postings):
+        write_varint(docs, doc_id - previous_doc)
+        write_varint(sizes, len(postings[doc_id]))
+        previous = 0
+        for position in postings[doc_id]:
+            write_varint(positions, position - previous)
+            previous = position
+        previous_doc = doc_id
+
+    out = bytearray()
+    write_varint(out, len(postings))
+    write_varint(out, len(docs))
+    out += docs
+    write_varint(out, len(sizes))
+    out += sizes
+    out += positions
+    return out
+
+
+def decode_postings(data: bytes, owners: Optional[Dict[int, int]] = None, segment_id: int = 0,
+                    docs: Optional[List[int]] = None) -> Dict[int, List[int]]:
+    """
+    Inverso de encode_postings. Com owners (doc_id -> segmento da versão atual da nota)
+    mantém apenas as notas cuja versão atual é a deste segmento. Para consultar só algumas
+    notas, owners deve conter apenas elas e docs a lista ordenada delas: quando a lista é
+    bem menor que as postings, as notas são localizadas por busca binária.
+    """
+    _, pos = read_varint(data, 0)
+    length, pos = read_varint(data, pos)
+    doc_ids = accumulate(decode_varints(data[pos:pos + length]))
+    pos += length
+    length, pos = read_varint(data, pos)
+    sizes = decode_varints(data[pos:pos + length])
+    pos += length
+    deltas = decode_varints(data[pos:])
+
+    postings: Dict[int, List[int]] = {}
+    if docs is not None:
+        doc_ids = list(doc_ids)
+        if len(docs) * 4 < len(doc_ids):
+            starts = list(accumulate(sizes, initial=0))
+            lo = 0
+            for doc_id in docs:
+                i = bisect_left(doc_ids, doc_id, lo)
+                if i == len(doc_ids):
+                    break
+                lo = i
+                if doc_ids[i] == doc_id and (owners is None or owners.get(doc_id) == segment_id):
+                    postings[doc_id] = list(accumulate(deltas[starts[i]:starts[i + 1]]))
+            return postings
+
+    start = 0
+    for doc_id, size in zip(doc_ids, sizes):
+        if owners is None or owners.get(doc_id) == segment_id:
+            # A maioria dos termos aparece uma vez por nota
+            postings[doc_id] = [deltas[start]] if size == 1 else list(accumulate(deltas[start:start + size]))
+        start += size
+    return postings
+
+
+# ==================== ESCRITA ====================
+
+class SegmentWriter:
+    """Grava um segmento recebendo os termos em ordem crescente (sem manter as postings em memória)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_suffix('.tmp')
+        self.file = open(self.tmp_path, 'wb')
+        self.file.write(b'\0' * HEADER.size)
+        self.offset = 0
+        self.postings_crc = 0
+        self.terms: List[Tuple[bytes, int, int]] = []   # (termo, início, tamanho) nas postings
+
+    def add(self, term: str, postings: Dict[int, List[int]]):
+        if not postings:
+            return
+        data = encode_postings(postings)
+        self.file.write(data)
+        self.postings_crc = zlib.crc32(data, self.postings_crc)
+        self.terms.append((term.encode('utf-8'), self.offset, len(data)))
+        self.offset += len(data)
+
+    def finish(self, segment_id: int = 0) -> 'Segment':
+        """Grava dicionário, índice de blocos e cabeçalho e publica o arquivo (escrita atômica)"""
+        dictionary = bytearray()
+        block_offsets: List[int] = []
+        previous = b''
+        previous_end = 0
+        for i, (term, offset, size) in enumerate(self.terms):
+            if i % BLOCK_SIZE == 0:
+                block_offsets.append(len(dictionary))
+                write_varint(dictionary, len(term))
+                dictionary += term
+                write_varint(dictionary, offset)
+            else:
+                shared = 0
+                limit = min(len(term), len(previous))
+                while shared < limit and term[shared] == previous[shared]:
+                    shared += 1
+                write_varint(dictionary, shared)
+                write_varint(dictionary, len(term) - shared)
+                dictionary += term[shared:]
+                write_varint(dictionary, offset - previous_end)
+            write_varint(dictionary, size)
+            previous = term
+            previous_end = offset + size
+
+        index_bytes = struct.pack(f'<{len(block_offsets)}I', *block_offsets)
+        dict_crc = zlib.crc32(index_bytes, zlib.crc32(dictionary))
+        dict_offset = HEADER.size + self.offset
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, BLOCK_SIZE, len(self.terms), len(block_offsets),
+                             dict_offset, dict_offset + len(dictionary), self.postings_crc, dict_crc, 0)
+        header = header[:-4] + struct.pack('<I', zlib.crc32(header[:-4]))
+
+        self.file.write(dictionary)
+        self.file.write(index_bytes)
+        self.file.seek(0)
+        self.file.write(header)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        return Segment(self.path, segment_id)
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+def write_segment(path: Path, postings: Dict[str, Dict[int, List[int]]], segment_id: int = 0) -> 'Segment':
+    """Grava as postings de um índice em memória como um novo segmento"""
+    writer = SegmentWriter(path)
+    try:
+        for term in sorted(postings):
+            writer.add(term, postings[term])
+        return writer.finish(segment_id)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+# ==================== LEITURA ====================
+
+class Segment:
+    """Segmento aberto via mmap; as postings só são decodificadas para os termos consultados"""
+
+    def __init__(self, path: Path, segment_id: int = 0):
+        self.path = Path(path)
+        self.id = segment_id
+        self.size = self.path.stat().st_size
+        if self.size < HEADER.size:
+            raise SegmentError(f"Segmento truncado: {self.path}")
+
+        with open(self.path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._validate()
+        except BaseException:
+            self.mm.close()
+            raise
+
+    def _validate(self):
+        (magic, version, self.block_size, self.term_count, block_count, self.dict_offset,
+         index_offset, postings_crc, dict_crc, header_crc) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise SegmentError(f"Formato de segmento desconhecido: {self.path}")
+        if zlib.crc32(self.mm[:HEADER.size - 4]) != header_crc:
+            raise SegmentError(f"Cabeçalho corrompido: {self.path}")
+        if index_offset + block_count * 4 != self.size:
+            raise SegmentError(f"Tamanho inconsistente: {self.path}")
+
+        view = memoryview(self.mm)
+        try:
+            if zlib.crc32(view[HEADER.size:self.dict_offset]) != postings_crc:
+                raise SegmentError(f"Checksum das postings não confere: {self.path}")
+            if zlib.crc32(view[self.dict_offset:]) != dict_crc:
+                raise SegmentError(f"Checksum do dicionário não confere: {self.path}")
+        finally:
+            view.release()
+
+        self.blocks = struct.unpack_from(f'<{block_count}I', self.mm, index_offset)
+        # Primeiro termo de cada bloco, para a busca binária
+        self.first_terms = []
+        for block_offset in self.blocks:
+            pos = self.dict_offset + block_offset
+            length, pos = read_varint(self.mm, pos)
+            self.first_terms.append(self.mm[pos:pos + length])
+
+    def close(self):
+        if not self.mm.closed:
+            self.mm.close()
+
+    # ==================== DICIONÁRIO ====================
+
+    def _iter_block(self, block: int) -> Iterator[Tuple[bytes, int, int]]:
+        """Termos de um bloco: (termo, início, tamanho) das postings"""
+        mm = self.mm
+        pos = self.dict_offset + self.blocks[block]
+        count = min(self.block_size, self.term_count - block * self.block_size)
+        length, pos = read_varint(mm, pos)
+        term = mm[pos:pos + length]
+        pos += length
+        offset, pos = read_varint(mm, pos)
+        size, pos = read_varint(mm, pos)
+        yield term, offset, size
+        for _ in range(count - 1):
+            shared, pos = read_varint(mm, pos)
+            length, pos = read_varint(mm, pos)
+            term = term[:shared] + mm[pos:pos + length]
+            pos += length
+            delta, pos = read_varint(mm, pos)
+            offset += size + delta
+            size, pos = read_varint(mm, pos)
+            yield term, offset, size
+
+    def iter_terms(self, prefix: str = '') -> Iterator[Tuple[str, int, int]]:
+        """Termos (em ordem) que começam com o prefixo"""
+        key = prefix.encode('utf-8')
+        block = max(bisect_right(self.first_terms, key) - 1, 0)
+        for block in range(block, len(self.blocks)):
+            for term, offset, size in self._iter_block(block):
+                if term.startswith(key):
+                    yield term.decode('utf-8'), offset, size
+                elif term > key:
+                    return
+
+    def postings(self, offset: int, size: int, owners: Optional[Dict[int, int]] = None,
+                 docs: Optional[List[int]] = None) -> Dict[int, List[int]]:
+        """Postings de um termo (apenas das notas cuja versão atual está aqui, com owners)"""
+        start = HEADER.size + offset
+        return decode_postings(self.mm[start:start + size], owners, self.id, docs)
+
+    def doc_count(self, offset: int) -> int:
+        """Quantidade de notas nas postings de um termo (sem decodificá-las)"""
+        return read_varint(self.mm, HEADER.size + offset)[0]
+
+
+def merge_segments(path: Path, segments: Iterable[Segment], owners: Dict[int, int], segment_id: int = 0) -> Segment:
+    """
+    Funde segmentos (intercalando os dicionários ordenados) mantendo apenas as notas
+    cuja versão atual está em um deles (owners: doc_id -> segmento)
+    """
+    segments = list(segments)
+    iterators = [iter(segment.iter_terms()) for segment in segments]
+    heads = []
+    for i, iterator in enumerate(iterators):
+        head = next(iterator, None)
+        if head is not None:
+            heads.append((head[0], i, head[1], head[2]))
+
+    writer = SegmentWriter(path)
+    try:
+        heapq.heapify(heads)
+        while heads:
+            term = heads[0][0]
+            merged: Dict[int, List[int]] = {}
+            while heads and heads[0][0] == term:
+                _, i, offset, size = heapq.heappop(heads)
+                merged.update(segments[i].postings(offset, size, owners))
+                head = next(iterators[i], None)
+                if head is not None:
+                    heapq.heappush(heads, (head[0], i, head[1], head[2]))
+            writer.add(term, merged)
+        return writer.finish(segment_id)
+    except BaseException:
+        writer.abort()
+        raise
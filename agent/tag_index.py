@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tag Index
+Índice tag -> notas com tags hierárquicas (#projeto/trabalho/cliente) e
+consultas AND/OR/NOT sobre bitmaps de IDs inteiros
+"""
+
+import re
+from typing import Dict, Iterator, List
+
+QUERY_TOKEN_PATTERN = re.compile(r'\(|\)|-|[^\s()]+')
+
+
+def tag_ancestors(tag: str) -> List[str]:
+    """'projeto/trabalho/cliente' -> ['projeto', 'projeto/trabalho', 'projeto/trabalho/cliente']"""
+    parts = [p for p in tag.lower().lstrip('#').split('/') if p]
+    return ['/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Posições dos bits ligados (IDs das notas) em ordem crescente"""
+    binary = bin(bits)[:1:-1]
+    pos = binary.find('1')
+    while pos != -1:
+        yield pos
+        pos = binary.find('1', pos + 1)
+
+
+class TagIndex:
+    """Bitmaps por tag (incluindo tags ancestrais) para consultas rápidas"""
+
+    name = 'tags'
+    VERSION = 1
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.doc_tags: Dict[int, List[str]] = {}  # doc_id -> tags como escritas na nota
+        self.bitmaps: Dict[str, int] = {}         # tag (minúscula, com ancestrais) -> bitmap
+        self.all_docs = 0                         # bitmap de todas as notas (para NOT)
+
+    # ==================== ESTADO ====================
+
+    def get_state(self) -> Dict:
+        return {'doc_tags': self.doc_tags, 'bitmaps': self.bitmaps, 'all_docs': self.all_docs}
+
+    def set_state(self, state: Dict):
+        self.doc_tags = state['doc_tags']
+        self.bitmaps = state['bitmaps']
+        self.all_docs = state['all_docs']
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def add(self, doc_id: int, rel_path: str, note: Dict):
+        self.remove(doc_id, rel_path)
+        tags = note['tags']
+        bit = 1 << doc_id
+
+        self.doc_tags[doc_id] = tags
+        self.all_docs |= bit
+        for key in {key for tag in tags for key in tag_ancestors(tag)}:
+            self.bitmaps[key] = self.bitmaps.get(key, 0) | bit
+
+    def remove(self, doc_id: int, rel_path: str):
+        tags = self.doc_tags.pop(doc_id, None)
+        if tags is None:
+            return
+        mask = ~(1 << doc_id)
+        self.all_docs &= mask
+        for key in {key for tag in tags for key in tag_ancestors(tag)}:
+            bits = self.bitmaps.get(key, 0) & mask
+            if bits:
+                self.bitmaps[key] = bits
+            else:
+                self.bitmaps.pop(key, None)
+
+    def rename(self, doc_id: int, old_path: str, new_path: str):
+        """Tags não dependem do caminho da nota"""
+        pass
+
+    # ==================== CONSULTAS ====================
+
+    def lookup(self, tag: str) -> int:
+        """Bitmap das notas com a tag ou qualquer subtag dela"""
+        ancestors = tag_ancestors(tag)
+        return self.bitmaps.get(ancestors[-1], 0) if ancestors else 0
+
+    def query(self, expression: str) -> int:
+        """
+        Avalia uma expressão de tags e retorna o bitmap de notas.
+        Sintaxe: #a AND #b, #a OR #b, NOT #c (ou -#c), parênteses;
+        termos adjacentes sem operador são combinados com AND.
+        """
+        tokens = QUERY_TOKEN_PATTERN.findall(expression)
+        pos = 0
+
+        def peek():
+            return tokens[pos].upper() if pos < len(tokens) else None
+
+        def parse_or():
+            nonlocal pos
+            bits = parse_and()
+            while peek() == 'OR':
+                pos += 1
+                bits |= parse_and()
+            return bits
+
+        def parse_and():
+            nonlocal pos
+            bits = parse_not()
+            while peek() not in (None, 'OR', ')'):
+                if peek() == 'AND':
+                    pos += 1
+                bits &= parse_not()
+            return bits
+
+        def parse_not():
+            nonlocal pos
+            if peek() in ('NOT', '-'):
+                pos += 1
+                return self.all_docs & ~parse_not()
+            if peek() == '(':
+                pos += 1
+                bits = parse_or()
+                if peek() != ')':
+                    raise ValueError(f"Parêntese não fechado em: {expression}")
+                pos += 1
+                return bits
+            if peek() is None:
+                raise ValueError(f"Expressão de tags incompleta: {expression}")
+            token = tokens[pos]
+            pos += 1
+            return self.lookup(token)
+
+        if not tokens:
+            return 0
+        bits = parse_or()
+        if pos != len(tokens):
+            raise ValueError(f"Token inesperado '{tokens[pos]}' em: {expression}")
+        return bits
+
+    def tags_of(self, doc_id: int) -> List[str]:
+        return self.doc_tags.get(doc_id, [])
+
+    def counts(self) -> Dict[str, int]:
+        """Quantidade de notas por tag (incluindo tags ancestrais)"""
+        return {tag: bin(bits).count('1') for tag, bits in self.bitmaps.items()}
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Task Index
+Índice das tarefas (- [ ] / - [x]) do vault com nota, linha, datas e tags,
+atualizado por arquivo e consultável por estado, vencimento, tag e pasta
+"""
+
+import heapq
+import re
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+from note_analyzer import find_inline_tags
+from tag_index import tag_ancestors
+
+# Datas no formato do plugin Tasks (📅 ⏳ ✅) ou campos inline do Dataview (due:: ...)
+DUE_PATTERN = re.compile(r'(?:📅|\bdue::?)\s*(\d{4}-\d{2}-\d{2})')
+SCHEDULED_PATTERN = re.compile(r'(?:⏳|\bscheduled::?)\s*(\d{4}-\d{2}-\d{2})')
+COMPLETED_PATTERN = re.compile(r'(?:✅|\bcompletion::?)\s*(\d{4}-\d{2}-\d{2})')
+
+OPEN = 'open'
+DONE = 'done'
+ALL = 'all'
+
+
+def build_task(rel_path: str, task: Dict) -> Dict:
+    """Tarefa indexada a partir da tarefa extraída pelo note_analyzer"""
+    text = task['text']
+    due = DUE_PATTERN.search(text)
+    scheduled = SCHEDULED_PATTERN.search(text)
+    completed = COMPLETED_PATTERN.search(text)
+    return {
+        'path': rel_path,
+        'line': task['line'],
+        'text': text,
+        'done': task['done'],
+        'due': due.group(1) if due else None,
+        'scheduled': scheduled.group(1) if scheduled else None,
+        'completed': completed.group(1) if completed else None,
+        'tags': sorted(set(find_inline_tags(text)))
+    }
+
+
+class TaskIndex:
+    """Tarefas por nota, contadores e lista ordenada por vencimento"""
+
+    name = 'tasks'
+    VERSION = 1
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tasks: Dict[str, Dict[int, Dict]] = {}   # caminho -> {linha: tarefa}
+        self.due: List[Tuple[str, str, int]] = []     # (vencimento, caminho, linha) ordenado
+        self.open_count = 0
+        self.done_count = 0
+
+    # ==================== ESTADO ====================
+
+    def get_state(self) -> Dict:
+        return {'tasks': self.tasks}
+
+    def set_state(self, state: Dict):
+        self.reset()
+        self.tasks = state['tasks']
+        for tasks in self.tasks.values():
+            self._count(tasks.values(), 1)
+            for task in tasks.values():
+                if task['due']:
+                    self.due.append((task['due'], task['path'], task['line']))
+        self.due.sort()
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def add(self, doc_id: int, rel_path: str, note: Dict):
+        self.remove(doc_id, rel_path)
+        if not note['tasks']:
+            return
+        tasks = {task['line']: build_task(rel_path, task) for task in note['tasks']}
+        self.tasks[rel_path] = tasks
+        self._count(tasks.values(), 1)
+        for task in tasks.values():
+            if task['due']:
+                insort(self.due, (task['due'], rel_path, task['line']))
+
+    def remove(self, doc_id: int, rel_path: str):
+        tasks = self.tasks.pop(rel_path, None)
+        if not tasks:
+            return
+        self._count(tasks.values(), -1)
+        for task in tasks.values():
+            if task['due']:
+                entry = (task['due'], rel_path, task['line'])
+                pos = bisect_left(self.due, entry)
+                if pos < len(self.due) and self.due[pos] == entry:
+                    del self.due[pos]
+
+    def rename(self, doc_id: int, old_path: str, new_path: str):
+        tasks = self.tasks.get(old_path)
+        if not tasks:
+            return
+        self.remove(doc_id, old_path)
+        for task in tasks.values():
+            task['path'] = new_path
+        self.tasks[new_path] = tasks
+        self._count(tasks.values(), 1)
+        for task in tasks.values():
+            if task['due']:
+                insort(self.due, (task['due'], new_path, task['line']))
+
+    def _count(self, tasks, sign: int):
+        for task in tasks:
+            if task['done']:
+                self.done_count += sign
+            else:
+                self.open_count += sign
+
+    # ==================== CONSULTAS ====================
+
+    def query(self, status: str = OPEN, due_before: Optional[str] = None, tag: Optional[str] = None,
+              folder: Optional[str] = None, limit: Optional[int] = 100, offset: int = 0) -> Dict:
+        """
+        Tarefas filtradas por estado (open/done/all), vencimento até a data (inclusive),
+        tag (inclui subtags) e pasta, ordenadas por vencimento, nota e linha
+        """
+        if status not in (OPEN, DONE, ALL):
+            raise ValueError(f"Estado inválido: {status} (use open, done ou all)")
+
+        prefix = folder.strip('/') + '/' if folder else ''
+        ancestors = tag_ancestors(tag) if tag else []
+        tag_key = ancestors[-1] if ancestors else None
+
+        if due_before:
+            # Apenas as tarefas com vencimento até a data (busca binária)
+            hi = bisect_right(self.due, (due_before, '\uffff'))
+            candidates = (self.tasks[path][line] for _, path, line in self.due[:hi] if path.startswith(prefix))
+        else:
+            candidates = (
+                task for path, tasks in self.tasks.items() if path.startswith(prefix)
+                for task in tasks.values()
+            )
+
+        matches = []
+        for task in candidates:
+            if status == OPEN and task['done'] or status == DONE and not task['done']:
+                continue
+            if tag_key and not any(tag_key in tag_ancestors(t) for t in task['tags']):
+                continue
+            matches.append(task)
+
+        def order(task):
+            return task['due'] is None, task['due'] or '', task['path'], task['line']
+
+        # Só a página pedida precisa sair ordenada
+        if limit is None:
+            page = sorted(matches, key=order)[offset:]
+        else:
+            page = heapq.nsmallest(offset + limit, matches, key=order)[offset:]
+        return {'total': len(matches), 'tasks': page}
+
+    def counts(self) -> Dict[str, int]:
+        return {'open': self.open_count, 'done': self.done_count}
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Trigram Index
+Índice de trigramas dos nomes e caminhos das notas para busca aproximada
+(tolerante a erros de digitação) e por substring
+"""
+
+import re
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+SEPARATOR_PATTERN = re.compile(r'[\s_\-./\\]+')
+
+
+def normalize_name(text: str) -> str:
+    """Minúsculas, sem acentos, sem .md e com separadores unificados em espaço"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    if text.endswith('.md'):
+        text = text[:-3]
+    return SEPARATOR_PATTERN.sub(' ', text).strip()
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Trigramas do texto normalizado (com bordas, como no pg_trgm)"""
+    padded = f'  {text} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def note_title(path: str) -> str:
+    """Nome da nota a partir do caminho relativo"""
+    name = path.replace('\\', '/').rsplit('/', 1)[-1]
+    return name[:-3] if name.lower().endswith('.md') else name
+
+
+class TrigramIndex:
+    """Trigramas por nota (nome e caminho) com postings trigrama -> caminhos"""
+
+    name = 'names'
+    VERSION = 1
+
+    # Peso do caminho completo em relação ao nome da nota
+    PATH_WEIGHT = 0.9
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.entries: Dict[str, Tuple[str, FrozenSet[str], FrozenSet[str]]] = {}  # caminho -> (nome normalizado, trigramas do nome, do caminho)
+        self.postings: Dict[str, Set[str]] = {}  # trigrama -> caminhos
+
+    # ==================== ESTADO ====================
+
+    def get_state(self) -> Dict:
+        return {'paths': list(self.entries)}
+
+    def set_state(self, state: Dict):
+        self.reset()
+        for path in state['paths']:
+            self.add_path(path)
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def add(self, doc_id: int, rel_path: str, note: Dict):
+        self.add_path(rel_path)
+
+    def remove(self, doc_id: int, rel_path: str):
+        self.remove_path(rel_path)
+
+    def rename(self, doc_id: int, old_path: str, new_path: str):
+        self.remove_path(old_path)
+        self.add_path(new_path)
+
+    def add_path(self, path: str):
+        if path in self.entries:
+            return
+        title = normalize_name(note_title(path))
+        title_grams = trigrams(title)
+        path_grams = trigrams(normalize_name(path))
+        self.entries[path] = (title, title_grams, path_grams)
+        for gram in title_grams | path_grams:
+            self.postings.setdefault(gram, set()).add(path)
+
+    def remove_path(self, path: str):
+        entry = self.entries.pop(path, None)
+        if entry is None:
+            return
+        for gram in entry[1] | entry[2]:
+            paths = self.postings.get(gram)
+            if paths is None:
+                continue
+            paths.discard(path)
+            if not paths:
+                del self.postings[gram]
+
+    def sync(self, paths: Iterable[str]) -> Tuple[int, int]:
+        """Sincroniza com uma lista completa de caminhos: (adicionados, removidos)"""
+        current = set(paths)
+        removed = [path for path in self.entries if path not in current]
+        added = [path for path in current if path not in self.entries]
+        for path in removed:
+            self.remove_path(path)
+        for path in added:
+            self.add_path(path)
+        return len(added), len(removed)
+
+    # ==================== CONSULTAS ====================
+
+    def paths(self) -> List[str]:
+        return list(self.entries)
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> List[Dict]:
+        """Notas mais parecidas com a consulta (coeficiente de Dice dos trigramas)"""
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        query_grams = trigrams(normalized)
+
+        # Candidatas: notas que compartilham algum trigrama com a consulta
+        shared: Dict[str, int] = {}
+        for gram in query_grams:
+            for path in self.postings.get(gram, ()):
+                shared[path] = shared.get(path, 0) + 1
+
+        results = []
+        for path in shared:
+            title, title_grams, path_grams = self.entries[path]
+            if title == normalized:
+                score = 1.0
+            else:
+                title_score = 2 * len(query_grams & title_grams) / (len(query_grams) + len(title_grams))
+                path_score = 2 * len(query_grams & path_grams) / (len(query_grams) + len(path_grams))
+                score = max(title_score, path_score * self.PATH_WEIGHT)
+                # Consulta contida no nome (ex: 'reuniao' em 'Reunião semanal')
+                if normalized in title:
+                    score = max(score, 0.5 + 0.45 * len(normalized) / len(title))
+            if score >= min_score:
+                results.append({'path': path, 'title': note_title(path), 'score': round(score, 4)})
+
+        results.sort(key=lambda r: (-r['score'], len(r['path']), r['path']))
+        return results[:limit]
+
+    def contains(self, substring: str) -> List[str]:
+        """Caminhos que contêm o texto (insensível a maiúsculas e acentos)"""
+        normalized = normalize_name(substring)
+        if not normalized:
+            return []
+        # Trigramas internos do texto (sem bordas) precisam estar todos no caminho
+        grams = [normalized[i:i + 3] for i in range(len(normalized) - 2)]
+        if grams:
+            candidates = None
+            for gram in sorted(grams, key=lambda g: len(self.postings.get(g, ()))):
+                paths = self.postings.get(gram, set())
+                candidates = set(paths) if candidates is None else candidates & paths
+                if not candidates:
+                    return []
+        else:
+            candidates = self.entries
+
+        return sorted(path for path in candidates if normalized in normalize_name(path))
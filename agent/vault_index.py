@@ -0,0 +1,1101 @@
+#!/usr/bin/env python3
+"""
+Vault Index
+Índice invertido persistente para busca de conteúdo nas notas do vault: as
+alterações recentes ficam em memória e o restante em segmentos compactados
+em disco (lidos via mmap e fundidos em segundo plano)
+"""
+
+import copy
+import os
+import pickle
+import hashlib
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from anchor_index import AnchorIndex
+from completion_index import CompletionIndex
+from date_index import DateIndex
+from link_index import LinkIndex
+from metadata_store import MetadataStore
+from note_analyzer import analyze_content, note_cache, tokenize
+from query_cache import QueryCache, normalize_query
+from search_query import is_simple, near_matches, parse_query, phrase_starts, positive_leaves
+from segment_store import Segment, merge_segments, write_segment
+from tag_index import TagIndex
+from task_index import TaskIndex
+from trigram_index import TrigramIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = Path.home() / '.obsidian-agent' / 'index'
+INDEX_VERSION = 6
+
+
+def index_base_path(vault_path: str, index_dir: Optional[str] = None) -> Path:
+    """Caminho base (sem extensão) dos arquivos de índice de um vault"""
+    index_dir = Path(index_dir) if index_dir else INDEX_DIR
+    vault_key = hashlib.md5(str(Path(vault_path).resolve()).encode()).hexdigest()[:12]
+    return index_dir / f'vault_{vault_key}'
+
+
+def _analyze_file(vault_path: str, rel_path: str,
+                  signature: Optional[Tuple[float, int]] = None) -> Optional[Tuple[Tuple[float, int], Dict]]:
+    """Lê e analisa uma nota (com os termos para a busca): (assinatura, análise)"""
+    full_path = os.path.join(vault_path, rel_path)
+    try:
+        if signature is None:
+            st = os.stat(full_path)
+            signature = (st.st_mtime, st.st_size)
+        with open(full_path, 'r', encoding='utf-8', newline='') as f:
+            content = f.read()
+    except Exception as e:
+        logger.warning(f'[INDEX] Erro ao ler arquivo {full_path}: {str(e)}')
+        return None
+    return signature, analyze_content(content, with_terms=True)
+
+
+def available_cpus() -> int:
+    """CPUs que o processo pode usar (respeita a afinidade, quando o sistema informa)"""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _analyze_chunk(vault_path: str, items: List[Tuple[str, Tuple[float, int]]]) -> List[Tuple]:
+    """Executado nos processos do pool: analisa um lote de notas"""
+    results = []
+    for rel_path, signature in items:
+        result = _analyze_file(vault_path, rel_path, signature)
+        if result is not None:
+            results.append((rel_path, *result))
+    return results
+
+
+class VaultIndex:
+    """Índice invertido posicional (termo -> nota -> posições) com atualização incremental"""
+
+    # Intervalo mínimo entre varreduras de mtime/tamanho do vault
+    REFRESH_INTERVAL = 5.0
+
+    # A partir de quantas notas alteradas a indexação usa o pool de processos (só com mais
+    # de uma CPU: com uma, serializar as análises entre processos só deixa a indexação mais lenta)
+    PARALLEL_THRESHOLD = 256
+
+    # Notas por tarefa enviada a cada processo
+    CHUNK_SIZE = 64
+
+    # A partir de quantas notas alteradas a indexação é feita em lote: o vocabulário e os
+    # indexadores com carga em lote (begin_bulk/end_bulk) são ordenados uma vez no fim
+    BULK_THRESHOLD = 64
+
+    # Parâmetros do BM25 e pesos de ocorrências no título e em títulos de seção
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+    TITLE_WEIGHT = 3.0
+    HEADING_WEIGHT = 2.0
+
+    # Pares (termo, nota) em memória a partir dos quais a parte em memória vira um segmento:
+    # durante a indexação (limita o uso de memória) e ao salvar
+    FLUSH_THRESHOLD = 200000
+    SEGMENT_MIN = 20000
+
+    # Acima de MAX_SEGMENTS segmentos, os MERGE_FACTOR menores são fundidos em segundo plano
+    MAX_SEGMENTS = 8
+    MERGE_FACTOR = 4
+
+    def __init__(self, vault_path: str, index_dir: Optional[str] = None, indexers: Optional[List] = None,
+                 workers: Optional[int] = None):
+        self.vault_path = Path(vault_path)
+        self.workers = min(workers or available_cpus(), available_cpus())
+        self.segment_base = index_base_path(vault_path, index_dir)
+        self.index_file = self.segment_base.with_suffix('.pkl')
+        self.lock = threading.RLock()
+        # Uma sincronização com o vault por vez; ela só segura self.lock em trechos curtos
+        self.refresh_lock = threading.Lock()
+
+        # Índices adicionais alimentados com a análise da nota feita em update_file
+        # (interface: name, VERSION, add, remove, rename, reset, get_state, set_state)
+        self.indexers: Dict[str, object] = {indexer.name: indexer for indexer in indexers or []}
+
+        # Incrementado a cada reset: fusões iniciadas antes dele são descartadas
+        self.epoch = 0
+        self.merging = False
+
+        # Incrementada a cada alteração de nota; resultados em cache são de uma geração
+        self.generation = 0
+        self.results = QueryCache()
+        self.views: Dict[str, Tuple[int, List[Tuple]]] = {}
+
+        self._init_state()
+        self.dirty = False
+        self.last_refresh = 0.0
+
+        # Quando um VaultWatcher mantém o índice atualizado, refresh() não varre o vault
+        self.live = False
+
+        if not self.load():
+            self.reset()
+
+    def _init_state(self):
+        # Manifesto: caminho relativo -> (mtime, tamanho)
+        self.files: Dict[str, Tuple[float, int]] = {}
+
+        # Identificadores inteiros das notas
+        self.doc_ids: Dict[str, int] = {}
+        self.paths: Dict[int, str] = {}
+        self.next_id = 0
+
+        # Parte em memória (notas alteradas desde o último segmento gravado)
+        # postings: termo -> {doc_id: [posições dos tokens]}
+        self.postings: Dict[str, Dict[int, List[int]]] = {}
+        self.doc_terms: Dict[int, List[str]] = {}
+        self.vocabulary: List[str] = []
+        self.memory_postings = 0
+
+        # Segmentos em disco e onde está a versão atual de cada nota (0 = memória);
+        # postings de uma nota em outro segmento são de versões antigas e são ignoradas
+        self.segments: List[Segment] = []
+        self.doc_segment: Dict[int, int] = {}
+        self.next_segment = 1
+
+        # Por nota: posição do primeiro token de cada linha, total de tokens,
+        # palavras (como no note_analyzer) e intervalos de posições [início, fim)
+        # das linhas de título de seção
+        self.line_starts: Dict[int, array] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.word_counts: Dict[int, int] = {}
+        self.heading_spans: Dict[int, List[Tuple[int, int]]] = {}
+        self.total_length = 0
+
+        # Termos do nome das notas (reconstruído a partir de paths ao carregar)
+        self.title_postings: Dict[str, set] = {}
+        self.title_vocabulary: List[str] = []
+
+    def reset(self):
+        """Esvazia o índice e os indexadores (o próximo refresh reindexa tudo)"""
+        with self.lock:
+            self.epoch += 1
+            self.generation += 1
+            for segment in self.segments:
+                segment.close()
+            for path in self._segment_files():
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f'[INDEX] Erro ao remover segmento {path}: {str(e)}')
+            self._init_state()
+            for indexer in self.indexers.values():
+                indexer.reset()
+
+    # ==================== PERSISTÊNCIA ====================
+
+    def load(self) -> bool:
+        """Carrega o índice salvo em disco"""
+        if not self.index_file.exists():
+            return False
+
+        try:
+            with open(self.index_file, 'rb') as f:
+                state = pickle.load(f)
+
+            if (state.get('version') != INDEX_VERSION or state.get('vault') != str(self.vault_path)
+                    or state.get('indexer_versions') != self._indexer_versions()):
+                logger.info(f'[INDEX] Índice descartado (versão ou vault diferente): {self.index_file}')
+                return False
+
+            segments = []
+            try:
+                for segment_id in state['segments']:
+                    segments.append(Segment(self._segment_path(segment_id), segment_id))
+            except Exception:
+                for segment in segments:
+                    segment.close()
+                raise
+
+            with self.lock:
+                self.files = state['files']
+                self.doc_ids = state['doc_ids']
+                self.paths = {doc_id: path for path, doc_id in self.doc_ids.items()}
+                self.next_id = state['next_id']
+                self.postings = state['postings']
+                self.doc_terms = state['doc_terms']
+                self.vocabulary = sorted(self.postings)
+                self.memory_postings = sum(len(terms) for terms in self.doc_terms.values())
+                self.segments = segments
+                self.doc_segment = state['doc_segment']
+                self.next_segment = state['next_segment']
+                self.line_starts = state['line_starts']
+                self.doc_lengths = state['doc_lengths']
+                self.word_counts = state['word_counts']
+                self.heading_spans = state['heading_spans']
+                self.total_length = sum(self.doc_lengths.values())
+                self.generation += 1
+                for doc_id, rel_path in self.paths.items():
+                    self._add_title(doc_id, rel_path)
+                for name, indexer in self.indexers.items():
+                    indexer.set_state(state['indexers'][name])
+
+                # Segmentos de gravações ou fusões interrompidas
+                referenced = {segment.path for segment in segments}
+                for path in self._segment_files():
+                    if path not in referenced:
+                        os.remove(path)
+
+            logger.info(f'[INDEX] Índice carregado: {len(self.files)} notas, {len(segments)} segmentos, '
+                        f'{len(self.postings)} termos em memória')
+            return True
+        except Exception as e:
+            logger.warning(f'[INDEX] Erro ao carregar índice {self.index_file}: {str(e)}')
+            return False
+
+    def save(self):
+        """Salva o índice em disco (escrita atômica)"""
+        with self.lock:
+            if self.memory_postings >= self.SEGMENT_MIN:
+                self._flush()
+            state = {
+                'version': INDEX_VERSION,
+                'vault': str(self.vault_path),
+                'files': self.files,
+                'doc_ids': self.doc_ids,
+                'next_id': self.next_id,
+                'postings': self.postings,
+                'doc_terms': self.doc_terms,
+                'segments': [segment.id for segment in self.segments],
+                'doc_segment': self.doc_segment,
+                'next_segment': self.next_segment,
+                'line_starts': self.line_starts,
+                'doc_lengths': self.doc_lengths,
+                'word_counts': self.word_counts,
+                'heading_spans': self.heading_spans,
+                'indexer_versions': self._indexer_versions(),
+                'indexers': {name: indexer.get_state() for name, indexer in self.indexers.items()},
+            }
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.index_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.index_file)
+            self.dirty = False
+
+    def _indexer_versions(self) -> Dict[str, int]:
+        return {name: indexer.VERSION for name, indexer in self.indexers.items()}
+
+    # ==================== SEGMENTOS ====================
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.segment_base.parent / f'{self.segment_base.name}.{segment_id:06d}.seg'
+
+    def _segment_files(self) -> List[Path]:
+        """Arquivos de segmento (e temporários de gravação) deste vault"""
+        parent = self.segment_base.parent
+        if not parent.exists():
+            return []
+        return [*parent.glob(f'{self.segment_base.name}.*.seg'), *parent.glob(f'{self.segment_base.name}.*.tmp')]
+
+    def _flush(self):
+        """Grava a parte em memória como um novo segmento e esvazia a memória"""
+        if not self.doc_terms:
+            return
+        segment_id = self.next_segment
+        self.next_segment += 1
+        self.segment_base.parent.mkdir(parents=True, exist_ok=True)
+        segment = write_segment(self._segment_path(segment_id), self.postings, segment_id)
+
+        for doc_id in self.doc_terms:
+            self.doc_segment[doc_id] = segment_id
+        self.segments.append(segment)
+        self.postings = {}
+        self.doc_terms = {}
+        self.vocabulary = []
+        self.memory_postings = 0
+        self.dirty = True
+        logger.info(f'[INDEX] Segmento {segment_id} gravado ({segment.term_count} termos, {segment.size} bytes)')
+
+        self._maybe_merge()
+
+    def _maybe_merge(self):
+        """Inicia em segundo plano a fusão dos menores segmentos, se houver segmentos demais"""
+        if self.merging or len(self.segments) <= self.MAX_SEGMENTS:
+            return
+        chosen = sorted(self.segments, key=lambda segment: segment.size)[:self.MERGE_FACTOR]
+        ids = {segment.id for segment in chosen}
+        # Notas cuja versão atual está nos segmentos escolhidos
+        live = {doc_id: segment_id for doc_id, segment_id in self.doc_segment.items() if segment_id in ids}
+        segment_id = self.next_segment
+        self.next_segment += 1
+        self.merging = True
+        threading.Thread(
+            target=self._merge, args=(chosen, live, segment_id, self.epoch), name='index-merge', daemon=True
+        ).start()
+
+    def _merge(self, chosen: List[Segment], live: Dict[int, int], segment_id: int, epoch: int):
+        try:
+            merged = merge_segments(self._segment_path(segment_id), chosen, live, segment_id)
+        except Exception as e:
+            logger.warning(f'[INDEX] Erro ao fundir segmentos: {str(e)}')
+            with self.lock:
+                self.merging = False
+            return
+
+        with self.lock:
+            self.merging = False
+            if epoch != self.epoch or any(segment not in self.segments for segment in chosen):
+                merged.close()
+                os.remove(merged.path)
+                return
+
+            # Notas alteradas durante a fusão continuam apontando para a versão mais nova
+            for doc_id, old_segment in live.items():
+                if self.doc_segment.get(doc_id) == old_segment:
+                    self.doc_segment[doc_id] = segment_id
+            self.segments = [segment for segment in self.segments if segment not in chosen] + [merged]
+            self.dirty = True
+            self.save()
+
+            # Só depois de salvo o índice deixa de referenciar os segmentos antigos
+            for segment in chosen:
+                segment.close()
+                os.remove(segment.path)
+            logger.info(f'[INDEX] {len(chosen)} segmentos fundidos no segmento {segment_id} ({merged.size} bytes)')
+
+            self._maybe_merge()
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def walk(self) -> Iterator[Tuple[str, float, int]]:
+        """Percorre o vault gerando (caminho relativo, mtime, tamanho) à medida que lista as pastas"""
+        stack = [str(self.vault_path)]
+
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith('.md'):
+                            st = entry.stat()
+                            rel_path = os.path.relpath(entry.path, self.vault_path).replace(os.sep, '/')
+                            yield rel_path, st.st_mtime, st.st_size
+            except OSError as e:
+                logger.warning(f'[INDEX] Erro ao listar {current}: {str(e)}')
+
+    def scan(self) -> Dict[str, Tuple[float, int]]:
+        """Lista as notas do vault com mtime e tamanho (sem ler conteúdo)"""
+        return {rel_path: (mtime, size) for rel_path, mtime, size in self.walk()}
+
+    def diff(self) -> Tuple[List[str], Dict[str, Tuple[float, int]]]:
+        """Compara o vault com o manifesto: (removidas, novas ou alteradas)"""
+        current = self.scan()
+        with self.lock:
+            removed = [rel_path for rel_path in self.files if rel_path not in current]
+            changed = {
+                rel_path: signature for rel_path, signature in current.items()
+                if self.files.get(rel_path) != signature
+            }
+        return removed, changed
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """
+        Sincroniza o índice com o vault usando mtime e tamanho dos arquivos. As notas são
+        indexadas sem segurar o lock do índice: consultas feitas durante uma reconstrução
+        veem o índice parcial. Sem force, se outra sincronização já está em andamento,
+        retorna na hora em vez de esperar por ela.
+        """
+        with self.lock:
+            if not force and (self.live or time.time() - self.last_refresh < self.REFRESH_INTERVAL):
+                return {'updated': 0, 'removed': 0}
+
+        if not self.refresh_lock.acquire(blocking=force):
+            return {'updated': 0, 'removed': 0}
+        try:
+            removed, changed = self.diff()
+
+            for rel_path in removed:
+                self.remove_file(rel_path)
+
+            self.update_files(changed)
+
+            with self.lock:
+                self.last_refresh = time.time()
+
+                if self.dirty:
+                    self.save()
+                    logger.info(f'[INDEX] Atualizado: {len(changed)} notas indexadas, {len(removed)} removidas')
+
+            return {'updated': len(changed), 'removed': len(removed)}
+        finally:
+            self.refresh_lock.release()
+
+    def update_file(self, rel_path: str, signature: Optional[Tuple[float, int]] = None) -> bool:
+        """(Re)indexa uma nota"""
+        result = _analyze_file(str(self.vault_path), rel_path, signature)
+        if result is None:
+            return False
+        self._apply(rel_path, *result)
+        return True
+
+    def _apply(self, rel_path: str, signature: Tuple[float, int], note: Dict, bulk: bool = False):
+        """
+        Incorpora a análise de uma nota às postings, aos indexadores e ao cache.
+        Com bulk=True o vocabulário não é mantido ordenado (quem chama reordena no fim).
+        """
+        terms = note.pop('terms')
+        line_starts = note.pop('line_starts')
+        note_cache.put(str(self.vault_path / rel_path), signature, note)
+
+        with self.lock:
+            self._remove_postings(rel_path)
+
+            doc_id = self.doc_ids.get(rel_path)
+            if doc_id is None:
+                doc_id = self.next_id
+                self.next_id += 1
+                self.doc_ids[rel_path] = doc_id
+                self.paths[doc_id] = rel_path
+                self._add_title(doc_id, rel_path)
+
+            length = sum(len(positions) for positions in terms.values())
+            self.doc_segment[doc_id] = 0
+            self.line_starts[doc_id] = array('I', line_starts)
+            self.doc_lengths[doc_id] = length
+            self.word_counts[doc_id] = note['word_count']
+            self.total_length += length
+            self.heading_spans[doc_id] = [
+                (line_starts[h['line'] - 1], line_starts[h['line']] if h['line'] < len(line_starts) else length)
+                for h in note['headings']
+            ]
+
+            for term, positions in terms.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = {}
+                    if not bulk:
+                        insort(self.vocabulary, term)
+                postings[doc_id] = positions
+
+            self.doc_terms[doc_id] = list(terms)
+            self.memory_postings += len(terms)
+
+            for indexer in self.indexers.values():
+                indexer.add(doc_id, rel_path, note)
+
+            self.files[rel_path] = signature
+            self.dirty = True
+            self.generation += 1
+
+            if self.memory_postings >= self.FLUSH_THRESHOLD:
+                self._flush()
+
+    def update_files(self, changed: Dict[str, Tuple[float, int]]) -> int:
+        """
+        (Re)indexa várias notas. A partir de BULK_THRESHOLD notas a indexação é feita em lote
+        e, a partir de PARALLEL_THRESHOLD, a leitura e análise usam um pool de processos.
+        O lock do índice só é segurado para incorporar cada nota ou lote e, no fim, reordenar o
+        vocabulário e as entradas dos indexadores (até lá, termos novos não entram na expansão
+        por prefixo).
+        """
+        if len(changed) < self.BULK_THRESHOLD:
+            return sum(self.update_file(rel_path, signature) for rel_path, signature in changed.items())
+
+        bulk_indexers = [indexer for indexer in self.indexers.values() if hasattr(indexer, 'begin_bulk')]
+        with self.lock:
+            for indexer in bulk_indexers:
+                indexer.begin_bulk()
+        try:
+            return self._update_bulk(list(changed.items()))
+        finally:
+            with self.lock:
+                self.vocabulary = sorted(self.postings)
+                for indexer in bulk_indexers:
+                    indexer.end_bulk()
+
+    def _update_bulk(self, items: List[Tuple[str, Tuple[float, int]]]) -> int:
+        updated = 0
+        workers = min(self.workers, len(items) // self.CHUNK_SIZE + 1)
+        if workers > 1 and len(items) >= self.PARALLEL_THRESHOLD:
+            chunks = [items[i:i + self.CHUNK_SIZE] for i in range(0, len(items), self.CHUNK_SIZE)]
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for results in executor.map(_analyze_chunk, [str(self.vault_path)] * len(chunks), chunks):
+                        with self.lock:
+                            for rel_path, signature, note in results:
+                                self._apply(rel_path, signature, note, bulk=True)
+                                updated += 1
+                return updated
+            except Exception as e:
+                # Sem suporte a processos (ou pool quebrado): termina sequencialmente
+                logger.warning(f'[INDEX] Pool de processos indisponível, indexando sequencialmente: {str(e)}')
+
+        for rel_path, signature in items:
+            if self.files.get(rel_path) == signature:
+                continue
+            result = _analyze_file(str(self.vault_path), rel_path, signature)
+            if result is not None:
+                self._apply(rel_path, *result, bulk=True)
+                updated += 1
+        return updated
+
+    def remove_file(self, rel_path: str):
+        """Remove uma nota do índice"""
+        note_cache.discard(str(self.vault_path / rel_path))
+        with self.lock:
+            self._remove_postings(rel_path)
+            doc_id = self.doc_ids.pop(rel_path, None)
+            if doc_id is not None:
+                self.paths.pop(doc_id, None)
+                self._remove_title(doc_id, rel_path)
+                for indexer in self.indexers.values():
+                    indexer.remove(doc_id, rel_path)
+            self.files.pop(rel_path, None)
+            self.dirty = True
+            self.generation += 1
+
+    def rename_file(self, old_path: str, new_path: str):
+        """Renomeia uma nota mantendo o doc_id e as postings"""
+        with self.lock:
+            doc_id = self.doc_ids.pop(old_path, None)
+            signature = self.files.pop(old_path, None)
+            if doc_id is None:
+                self.update_file(new_path)
+                return
+
+            if new_path in self.doc_ids:
+                self.remove_file(new_path)
+
+            self.doc_ids[new_path] = doc_id
+            self.paths[doc_id] = new_path
+            self._remove_title(doc_id, old_path)
+            self._add_title(doc_id, new_path)
+            for indexer in self.indexers.values():
+                indexer.rename(doc_id, old_path, new_path)
+            if signature is not None:
+                self.files[new_path] = signature
+            self.dirty = True
+            self.generation += 1
+
+    def _remove_postings(self, rel_path: str):
+        """Remove as postings de uma nota (mantém o doc_id)"""
+        doc_id = self.doc_ids.get(rel_path)
+        if doc_id is None:
+            return
+
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+        self.word_counts.pop(doc_id, None)
+        self.line_starts.pop(doc_id, None)
+        self.heading_spans.pop(doc_id, None)
+        self.doc_segment.pop(doc_id, None)
+
+        terms = self.doc_terms.pop(doc_id, [])
+        self.memory_postings -= len(terms)
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+                pos = bisect_left(self.vocabulary, term)
+                if pos < len(self.vocabulary) and self.vocabulary[pos] == term:
+                    del self.vocabulary[pos]
+
+    def _add_title(self, doc_id: int, rel_path: str):
+        for term in set(tokenize(Path(rel_path).stem)):
+            docs = self.title_postings.get(term)
+            if docs is None:
+                docs = self.title_postings[term] = set()
+                insort(self.title_vocabulary, term)
+            docs.add(doc_id)
+
+    def _remove_title(self, doc_id: int, rel_path: str):
+        for term in set(tokenize(Path(rel_path).stem)):
+            docs = self.title_postings.get(term)
+            if docs is None:
+                continue
+            docs.discard(doc_id)
+            if not docs:
+                del self.title_postings[term]
+                pos = bisect_left(self.title_vocabulary, term)
+                if pos < len(self.title_vocabulary) and self.title_vocabulary[pos] == term:
+                    del self.title_vocabulary[pos]
+
+    # ==================== BUSCA ====================
+
+    def list_files(self) -> List[Tuple[str, float, int]]:
+        """Lista as notas do manifesto: (caminho relativo, mtime, tamanho)"""
+        self.refresh()
+        with self.lock:
+            return [(rel_path, mtime, size) for rel_path, (mtime, size) in self.files.items()]
+
+    def page_files(self, sort: str = 'path', after: Optional[Tuple] = None, limit: int = 100,
+                   descending: bool = False) -> List[Tuple[str, float, int]]:
+        """
+        Página de notas do manifesto ordenada por 'path' ou 'mtime' (desempate pelo caminho),
+        começando depois da chave 'after'. Usa um heap de tamanho limit em vez de ordenar tudo.
+        """
+        self.refresh()
+
+        if sort == 'mtime':
+            def key(item):
+                return (item[1], item[0])
+        else:
+            def key(item):
+                return (item[0],)
+
+        with self.lock:
+            items = ((rel_path, mtime, size) for rel_path, (mtime, size) in self.files.items())
+            if after is not None:
+                after = tuple(after)
+                if descending:
+                    items = (item for item in items if key(item) < after)
+                else:
+                    items = (item for item in items if key(item) > after)
+            select = heapq.nlargest if descending else heapq.nsmallest
+            return select(limit, items, key=key)
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Termos da parte em memória que começam com o prefixo"""
+        terms = []
+        pos = bisect_left(self.vocabulary, prefix)
+        while pos < len(self.vocabulary) and self.vocabulary[pos].startswith(prefix):
+            terms.append(self.vocabulary[pos])
+            pos += 1
+        return terms
+
+    def _expand_title(self, prefix: str) -> List[str]:
+        """Termos de nomes de notas que começam com o prefixo"""
+        terms = []
+        pos = bisect_left(self.title_vocabulary, prefix)
+        while pos < len(self.title_vocabulary) and self.title_vocabulary[pos].startswith(prefix):
+            terms.append(self.title_vocabulary[pos])
+            pos += 1
+        return terms
+
+    def _term_positions(self, token: str) -> Dict[int, List[List[int]]]:
+        """Postings de todos os termos que começam com o token, agrupadas por nota"""
+        merged: Dict[int, List[List[int]]] = {}
+        for term in self._expand(token):
+            for doc_id, positions in self.postings[term].items():
+                merged.setdefault(doc_id, []).append(positions)
+
+        for segment in self.segments:
+            for _, offset, size in segment.iter_terms(token):
+                for doc_id, positions in segment.postings(offset, size, self.doc_segment).items():
+                    merged.setdefault(doc_id, []).append(positions)
+        return merged
+
+    def _lines_of(self, doc_id: int, position_lists: List[List[int]]) -> set:
+        """Converte posições de tokens em números de linha (1-based)"""
+        line_starts = self.line_starts[doc_id]
+        return {bisect_right(line_starts, pos) for positions in position_lists for pos in positions}
+
+    # ==================== CONSULTAS COM OPERADORES ====================
+
+    def _lookup(self, term: str, prefix: bool, lookups: Dict) -> Tuple[List[str], List[Tuple[Segment, int, int]]]:
+        """Termos da parte em memória e entradas dos segmentos de um termo (ou prefixo), uma vez por consulta"""
+        key = (term, prefix)
+        found = lookups.get(key)
+        if found is None:
+            if prefix:
+                memory = self._expand(term)
+                entries = [(segment, offset, size) for segment in self.segments
+                           for _, offset, size in segment.iter_terms(term)]
+            else:
+                memory = [term] if term in self.postings else []
+                entries = []
+                for segment in self.segments:
+                    for found_term, offset, size in segment.iter_terms(term):
+                        if found_term == term:
+                            entries.append((segment, offset, size))
+                        break
+            found = lookups[key] = (memory, entries)
+        return found
+
+    def _fetch(self, term: str, prefix: bool, docs: Optional[List[int]], lookups: Dict) -> Dict[int, List[List[int]]]:
+        """Posições do termo (uma lista por expansão do prefixo) por nota, apenas nas notas de docs quando informado"""
+        memory, entries = self._lookup(term, prefix, lookups)
+        merged: Dict[int, List[List[int]]] = {}
+        for found_term in memory:
+            postings = self.postings[found_term]
+            if docs is None:
+                items = postings.items()
+            elif len(docs) < len(postings):
+                items = ((doc_id, postings[doc_id]) for doc_id in docs if doc_id in postings)
+            else:
+                wanted = set(docs)
+                items = ((doc_id, positions) for doc_id, positions in postings.items() if doc_id in wanted)
+            for doc_id, positions in items:
+                merged.setdefault(doc_id, []).append(positions)
+        owners = self.doc_segment
+        if docs is not None and entries:
+            owners = {doc_id: owners[doc_id] for doc_id in docs if doc_id in owners}
+        for segment, offset, size in entries:
+            for doc_id, positions in segment.postings(offset, size, owners, docs).items():
+                merged.setdefault(doc_id, []).append(positions)
+        return merged
+
+    def _estimate(self, node, lookups: Dict) -> int:
+        """Quantidade estimada de notas de um nó (para avaliar primeiro as listas menores)"""
+        kind = node[0]
+        if kind == 'term':
+            memory, entries = self._lookup(node[1], node[2], lookups)
+            return (sum(len(self.postings[term]) for term in memory)
+                    + sum(segment.doc_count(offset) for segment, offset, _ in entries))
+        if kind == 'phrase':
+            return min(self._estimate(('term', term, False), lookups) for term in node[1])
+        if kind == 'near':
+            return min(self._estimate(node[1], lookups), self._estimate(node[2], lookups))
+        if kind == 'and':
+            positives = [self._estimate(child, lookups) for child in node[1] if child[0] != 'not']
+            return min(positives) if positives else len(self.paths)
+        if kind == 'or':
+            return sum(self._estimate(child, lookups) for child in node[1])
+        return len(self.paths)
+
+    def _evaluate(self, node, docs: Optional[List[int]], lookups: Dict) -> Dict[int, List[List[List[int]]]]:
+        """
+        Notas que satisfazem o nó (restritas a docs, lista ordenada, quando informado) com as
+        posições de cada termo, frase ou NEAR encontrado (listas de posições por ocorrência). Em AND, frases e NEAR a parte mais rara é
+        avaliada primeiro e as seguintes só são buscadas nas notas que restaram.
+        """
+        kind = node[0]
+        if kind == 'term':
+            return {doc_id: [lists] for doc_id, lists in self._fetch(node[1], node[2], docs, lookups).items()}
+
+        if kind == 'phrase':
+            terms = node[1]
+            order = sorted(range(len(terms)), key=lambda i: self._estimate(('term', terms[i], False), lookups))
+            found: Dict[int, Dict[int, List[int]]] = {}
+            candidates = docs
+            for i in order:
+                postings = self._fetch(terms[i], False, candidates, lookups)
+                found[i] = postings
+                candidates = sorted(postings)
+                if not candidates:
+                    return {}
+            result = {}
+            for doc_id in candidates:
+                starts = phrase_starts([_merge_positions(found[i][doc_id]) for i in range(len(terms))])
+                if starts:
+                    result[doc_id] = [[[start + i for start in starts for i in range(len(terms))]]]
+            return result
+
+        if kind == 'near':
+            first, second = sorted(node[1:3], key=lambda child: self._estimate(child, lookups))
+            left = self._evaluate(first, docs, lookups)
+            right = self._evaluate(second, sorted(left), lookups) if left else {}
+            result = {}
+            for doc_id, groups in right.items():
+                matches = near_matches(
+                    _merge_positions([p for lists in left[doc_id] for p in lists]),
+                    _merge_positions([p for lists in groups for p in lists]), node[3]
+                )
+                if matches:
+                    result[doc_id] = [[matches]]
+            return result
+
+        if kind == 'and':
+            children = sorted(node[1], key=lambda child: (child[0] == 'not', self._estimate(child, lookups)))
+            result = None
+            for child in children:
+                candidates = docs if result is None else sorted(result)
+                found = self._evaluate(child, candidates, lookups)
+                result = found if result is None else {doc_id: result[doc_id] + groups for doc_id, groups in found.items()}
+                if not result:
+                    break
+            return result
+
+        if kind == 'or':
+            result: Dict[int, List[List[List[int]]]] = {}
+            for child in node[1]:
+                for doc_id, groups in self._evaluate(child, docs, lookups).items():
+                    result.setdefault(doc_id, []).extend(groups)
+            return result
+
+        # NOT: as notas candidatas (ou todas) menos as que satisfazem o nó
+        candidates = docs if docs is not None else sorted(self.paths)
+        excluded = self._evaluate(node[1], candidates, lookups)
+        return {doc_id: [] for doc_id in candidates if doc_id not in excluded}
+
+    def sorted_view(self, kind: str) -> List[Tuple]:
+        """
+        Todas as notas como (caminho, doc_id) ou, com kind='mtime', (mtime, doc_id), em ordem;
+        usado pelo planejador de consultas e recalculado só quando a geração muda
+        """
+        with self.lock:
+            cached = self.views.get(kind)
+            if cached is None or cached[0] != self.generation:
+                if kind == 'mtime':
+                    view = sorted((mtime, self.doc_ids[rel_path]) for rel_path, (mtime, _) in self.files.items()
+                                  if rel_path in self.doc_ids)
+                else:
+                    view = sorted(self.doc_ids.items())
+                cached = self.views[kind] = (self.generation, view)
+            return cached[1]
+
+    # ==================== CACHE DE CONSULTAS ====================
+
+    def cached_query(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Resultado de uma consulta pelo cache (chave normalizada + geração atual do vault).
+        Como a geração muda a cada alteração de nota, um resultado antigo nunca é servido.
+        Devolve uma cópia rasa, que quem chama pode alterar.
+        """
+        with self.lock:
+            generation = self.generation
+        value = self.results.get(key, generation)
+        if value is None:
+            value = compute()
+            self.results.put(key, generation, value)
+        return copy.copy(value)
+
+    def search(self, query: str, limit: Optional[int] = 100, max_matches: int = 5) -> Dict:
+        """
+        Busca notas que satisfazem a consulta: palavras (por prefixo, todas obrigatórias),
+        "frases exatas", a NEAR/k b (até k palavras de distância), OR, NOT/-termo e parênteses
+        """
+        self.refresh()
+        return self.cached_query(('search', normalize_query(query), limit, max_matches),
+                                 lambda: self._search(query, limit, max_matches))
+
+    def _search(self, query: str, limit: Optional[int], max_matches: int) -> Dict:
+        tree = parse_query(query)
+        if tree is None:
+            return {'total': 0, 'results': []}
+
+        with self.lock:
+            matched = self._evaluate(tree, None, {})
+
+            found = sorted((self.paths[doc_id], doc_id) for doc_id in matched)
+            total = len(found)
+            if limit is not None:
+                found = found[:limit]
+
+            hits = []
+            for rel_path, doc_id in found:
+                lines = []
+                line_sets = [self._lines_of(doc_id, position_lists) for position_lists in matched[doc_id]]
+                if max_matches and line_sets:
+                    lines = sorted(set.intersection(*line_sets) or set.union(*line_sets))[:max_matches]
+                hits.append((rel_path, lines))
+
+        return {
+            'total': total,
+            'results': [self._build_result(rel_path, lines) for rel_path, lines in hits]
+        }
+
+    def ranked_search(self, query: str, limit: int = 10, max_matches: int = 3) -> Dict:
+        """
+        Busca ranqueada por BM25 (qualquer termo, por prefixo), com peso extra para
+        ocorrências no nome da nota e em títulos de seção. Com frases, NEAR ou operadores
+        só as notas que satisfazem a consulta são ranqueadas. Só as k melhores notas
+        são lidas do disco para montar os trechos, com os termos marcados como ==termo==.
+        """
+        self.refresh()
+        return self.cached_query(('ranked', normalize_query(query), limit, max_matches),
+                                 lambda: self._ranked_search(query, limit, max_matches))
+
+    def _ranked_search(self, query: str, limit: int, max_matches: int) -> Dict:
+        tree = parse_query(query)
+        leaves = positive_leaves(tree)
+        tokens = list(dict.fromkeys(
+            term for leaf in leaves for term in (leaf[1] if leaf[0] == 'phrase' else [leaf[1]])
+        ))
+        if not tokens:
+            return {'total': 0, 'results': []}
+
+        with self.lock:
+            total_docs = len(self.paths) or 1
+            avg_length = self.total_length / total_docs or 1.0
+            scores: Dict[int, float] = {}
+            token_positions = {token: self._term_positions(token) for token in tokens}
+            # Com frases, proximidade ou operadores só pontuam as notas que satisfazem a consulta
+            matched = None if is_simple(tree) else self._evaluate(tree, None, {})
+
+            for token in tokens:
+                # Frequência ponderada do token (somando as expansões do prefixo) por nota
+                weighted: Dict[int, float] = {}
+                for doc_id, position_lists in token_positions[token].items():
+                    if matched is not None and doc_id not in matched:
+                        continue
+                    tf = 0.0
+                    spans = self.heading_spans.get(doc_id)
+                    for positions in position_lists:
+                        tf += len(positions)
+                        for start, end in spans or ():
+                            hits = bisect_left(positions, end) - bisect_left(positions, start)
+                            tf += hits * (self.HEADING_WEIGHT - 1)
+                    weighted[doc_id] = tf
+                for term in self._expand_title(token):
+                    for doc_id in self.title_postings[term]:
+                        if matched is not None and doc_id not in matched:
+                            continue
+                        weighted[doc_id] = weighted.get(doc_id, 0.0) + self.TITLE_WEIGHT
+
+                df = len(weighted)
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in weighted.items():
+                    norm = self.BM25_K1 * (1 - self.BM25_B + self.BM25_B * self.doc_lengths.get(doc_id, 0) / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.BM25_K1 + 1) / (tf + norm)
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+            # Linhas com mais ocorrências apenas para as notas do topo
+            hits = []
+            for doc_id, score in top:
+                line_hits: Dict[int, int] = {}
+                if matched is not None:
+                    position_lists = [positions for lists in matched[doc_id] for positions in lists]
+                else:
+                    position_lists = [positions for token in tokens for positions in token_positions[token].get(doc_id, ())]
+                for positions in position_lists:
+                    for line in self._lines_of(doc_id, [positions]):
+                        line_hits[line] = line_hits.get(line, 0) + 1
+                best = sorted(line_hits, key=lambda line: (-line_hits[line], line))[:max_matches]
+                hits.append((self.paths[doc_id], score, sorted(best)))
+
+        highlight = re.compile(r'\b(' + '|'.join(re.escape(t) for t in tokens) + r')\w*', re.IGNORECASE)
+        results = []
+        for rel_path, score, lines in hits:
+            result = self._build_result(rel_path, lines, highlight)
+            result['score'] = round(score, 4)
+            results.append(result)
+
+        return {'total': len(scores), 'results': results}
+
+    def _build_result(self, rel_path: str, lines: List[int], highlight: Optional[re.Pattern] = None) -> Dict:
+        """Monta o resultado lendo apenas as linhas encontradas"""
+        full_path = self.vault_path / rel_path
+        matches = []
+        wanted = set(lines)
+
+        if wanted:
+            try:
+                with open(full_path, 'r', encoding='utf-8') as f:
+                    for line_no, line in enumerate(f, 1):
+                        if line_no in wanted:
+                            text = line.strip()
+                            if highlight:
+                                text = highlight.sub(lambda m: f'=={m.group(0)}==', text)
+                            matches.append({'line': line_no, 'text': text})
+                            if len(matches) == len(wanted):
+                                break
+            except Exception as e:
+                logger.warning(f'[INDEX] Erro ao ler arquivo {full_path}: {str(e)}')
+
+        return {
+            'name': Path(rel_path).stem,
+            'path': rel_path,
+            'full_path': str(full_path),
+            'matches': matches
+        }
+
+
+def _merge_positions(position_lists: List[List[int]]) -> List[int]:
+    """Une listas de posições em uma lista ordenada"""
+    if len(position_lists) == 1:
+        return position_lists[0]
+    return sorted({position for positions in position_lists for position in positions})
+
+
+# ==================== INSTÂNCIAS ====================
+
+_indexes: Dict[str, VaultIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vault_index(vault_path: str) -> VaultIndex:
+    """Retorna (criando se necessário) o índice de um vault"""
+    key = str(Path(vault_path))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            metadata = MetadataStore(index_base_path(key).with_suffix('.db'))
+            index = _indexes[key] = VaultIndex(key, indexers=[
+                LinkIndex(), TagIndex(), TrigramIndex(), DateIndex(), TaskIndex(), AnchorIndex(),
+                CompletionIndex(), metadata
+            ])
+        return index
+
+
+# ==================== BENCHMARK ====================
+
+if __name__ == "__main__":
+    # Uso: python vault_index.py [caminho_do_vault] [notas_sintéticas]
+    import random
+    import sys
+    import tempfile
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1 and sys.argv[1] != '-':
+            vault = sys.argv[1]
+        else:
+            vault = os.path.join(tmp, 'vault')
+            total = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+            words = [f'palavra{i}' for i in range(3000)]
+            rng = random.Random(42)
+            for i in range(total):
+                folder = os.path.join(vault, f'pasta{i % 20}')
+                os.makedirs(folder, exist_ok=True)
+                body = '\n'.join(
+                    ' '.join(rng.choices(words, k=12)) + f' [[nota{rng.randrange(total)}]] #tag{i % 50}/sub{i % 7}'
+                    for _ in range(40)
+                )
+                with open(os.path.join(folder, f'nota{i}.md'), 'w', encoding='utf-8') as f:
+                    f.write(f'---\nstatus: s{i % 3}\nprioridade: {i % 5}\n---\n# Nota {i}\n- [ ] tarefa {i}\n{body}\n')
+
+        cpus = available_cpus()
+        print(f"=== Benchmark de indexação completa: {vault} ({cpus} CPU(s)) ===")
+        for workers in sorted({min(w, cpus) for w in (1, 2, 4, 8)}):
+            index_dir = os.path.join(tmp, f'index_{workers}')
+            index = VaultIndex(vault, index_dir=index_dir, workers=workers, indexers=[
+                LinkIndex(), TagIndex(), TrigramIndex(), DateIndex(), TaskIndex(), AnchorIndex(),
+                CompletionIndex(), MetadataStore(os.path.join(index_dir, 'bench.db'))
+            ])
+            _, changed = index.diff()
+            start = time.perf_counter()
+            count = index.update_files(changed)
+            elapsed = time.perf_counter() - start
+            print(f"  {workers} worker(s): {count} notas em {elapsed:.2f}s -> {count / elapsed:.0f} notas/s")
+
+        print("=== Índice salvo: segmentos em disco, carga e busca ===")
+        index_dir = os.path.join(tmp, 'index_1')
+        index = VaultIndex(vault, index_dir=index_dir, indexers=[])
+        index.refresh(force=True)
+        with index.lock:
+            index._flush()
+            index.save()
+        sizes = {name: os.path.getsize(os.path.join(index_dir, name)) for name in os.listdir(index_dir)}
+        segment_bytes = sum(size for name, size in sizes.items() if name.endswith('.seg'))
+        print(f"  {len(index.segments)} segmento(s): {segment_bytes / 1e6:.1f} MB; "
+              f"manifesto: {sum(size for name, size in sizes.items() if name.endswith('.pkl')) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        index = VaultIndex(vault, index_dir=index_dir, indexers=[])
+        print(f"  carga: {(time.perf_counter() - start) * 1000:.0f} ms")
+        for query in ('palavra1', 'palavra12 palavra7', 'nota', 'palavra2999 palavra1',
+                      '"palavra12 palavra7"', 'palavra12 NEAR/2 palavra7', 'palavra2999 -palavra1'):
+            start = time.perf_counter()
+            result = index.search(query, limit=20)
+            print(f"  busca '{query}': {result['total']} notas em {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        print("=== Cache de consultas (mesma consulta, sem alterações no vault) ===")
+        for query in ('palavra1', 'palavra12 palavra7'):
+            start = time.perf_counter()
+            index.search(query, limit=20)
+            print(f"  busca '{query}' repetida: {(time.perf_counter() - start) * 1000:.3f} ms")
+        print(f"  {index.results.stats()}")
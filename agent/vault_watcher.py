@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Vault Watcher
+Observa o vault (inotify/FSEvents/ReadDirectoryChangesW via watchdog, com
+fallback por polling) e mantém os índices atualizados em tempo real
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from vault_index import VaultIndex, get_vault_index
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
+    logger.warning("[WATCHER] watchdog não instalado, usando polling")
+
+# Ações publicadas para os listeners (mesmos valores esperados pelos gatilhos do Hub)
+CREATED = 'created'
+MODIFIED = 'modified'
+DELETED = 'deleted'
+MOVED = 'moved'
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """Converte eventos do watchdog em chamadas ao VaultWatcher"""
+
+    def __init__(self, watcher: 'VaultWatcher'):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            # Pastas movidas/removidas: ressincroniza pelo manifesto
+            if event.event_type in ('moved', 'deleted'):
+                self.watcher.resync()
+            return
+
+        src = self.watcher.relative(event.src_path)
+        if event.event_type == 'moved':
+            dest = self.watcher.relative(event.dest_path)
+            if src and dest:
+                self.watcher.handle(MOVED, src, dest)
+            elif dest:
+                # Salvamento atômico (arquivo temporário renomeado para .md)
+                self.watcher.handle(MODIFIED, dest)
+            elif src:
+                self.watcher.handle(DELETED, src)
+        elif src and event.event_type in ('created', 'modified', 'deleted'):
+            self.watcher.handle(event.event_type, src)
+
+
+class VaultWatcher:
+    """Mantém um VaultIndex sincronizado com o vault e notifica listeners"""
+
+    # Intervalo do polling quando o watchdog não está disponível
+    POLL_INTERVAL = 5.0
+
+    # Intervalo para gravar o índice em disco após mudanças
+    SAVE_INTERVAL = 30.0
+
+    # Alterações logo após a criação (o editor cria o arquivo e depois grava o conteúdo)
+    # atualizam o índice sem gerar um segundo evento
+    COALESCE_WINDOW = 2.0
+
+    def __init__(self, index: VaultIndex, use_polling: bool = None):
+        self.index = index
+        self.vault_path = str(index.vault_path)
+        self.use_polling = not WATCHDOG_AVAILABLE if use_polling is None else use_polling
+        self.listeners: List[Callable[[str, str, Optional[str]], None]] = []
+        self.running = False
+        self.observer = None
+        self.threads: List[threading.Thread] = []
+        self.stop_event = threading.Event()
+        # Caminho -> instante em que CREATED foi publicado
+        self.created: Dict[str, float] = {}
+        self.created_lock = threading.Lock()
+        # Serializa a comparação com o manifesto e a atualização do índice: o agente
+        # (index_note) e o observador podem tratar a mesma nota ao mesmo tempo
+        self.handle_lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[str, str, Optional[str]], None]):
+        """Registra um callback listener(action, path, dest_path)"""
+        self.listeners.append(listener)
+
+    def relative(self, full_path: str) -> Optional[str]:
+        """Converte caminho absoluto em relativo ao vault (apenas notas .md)"""
+        if not full_path or not full_path.endswith('.md'):
+            return None
+        return os.path.relpath(full_path, self.vault_path).replace(os.sep, '/')
+
+    # ==================== CONTROLE ====================
+
+    def start(self):
+        """Sincroniza o índice e começa a observar o vault"""
+        if self.running:
+            return
+
+        self.index.refresh(force=True)
+        self.running = True
+        self.stop_event.clear()
+
+        if self.use_polling:
+            self._spawn(self._poll_loop, 'vault-watcher-poll')
+            logger.info(f"[WATCHER] Observando {self.vault_path} (polling a cada {self.POLL_INTERVAL}s)")
+        else:
+            self.observer = Observer()
+            self.observer.schedule(_WatchdogHandler(self), self.vault_path, recursive=True)
+            self.observer.daemon = True
+            self.observer.start()
+            logger.info(f"[WATCHER] Observando {self.vault_path} (watchdog)")
+
+        self._spawn(self._save_loop, 'vault-watcher-save')
+        self.index.live = True
+
+    def stop(self):
+        """Para o watcher e grava o índice"""
+        if not self.running:
+            return
+
+        self.running = False
+        self.index.live = False
+        self.stop_event.set()
+
+        if self.observer:
+            self.observer.stop()
+            self.observer.join(timeout=5)
+            self.observer = None
+
+        for thread in self.threads:
+            thread.join(timeout=5)
+        self.threads = []
+
+        if self.index.dirty:
+            self.index.save()
+        logger.info(f"[WATCHER] Parado: {self.vault_path}")
+
+    def _spawn(self, target: Callable, name: str):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    # ==================== EVENTOS ====================
+
+    def handle(self, action: str, rel_path: str, dest_path: Optional[str] = None):
+        """Aplica uma mudança ao índice e notifica os listeners"""
+        try:
+            with self.handle_lock:
+                if action == DELETED:
+                    if rel_path not in self.index.files:
+                        return
+                    self.index.remove_file(rel_path)
+                elif action == MOVED:
+                    self.index.rename_file(rel_path, dest_path)
+                else:
+                    full_path = os.path.join(self.vault_path, rel_path)
+                    try:
+                        st = os.stat(full_path)
+                    except OSError:
+                        return
+                    signature = (st.st_mtime, st.st_size)
+                    previous = self.index.files.get(rel_path)
+                    if previous == signature:
+                        return
+                    action = MODIFIED if previous else CREATED
+                    self.index.update_file(rel_path, signature)
+                if self._coalesce(action, rel_path):
+                    return
+        except Exception as e:
+            logger.error(f"[WATCHER] Erro ao processar {action} {rel_path}: {e}")
+            return
+
+        logger.info(f"[WATCHER] {action}: {rel_path}" + (f" -> {dest_path}" if dest_path else ""))
+
+        for listener in self.listeners:
+            try:
+                listener(action, rel_path, dest_path)
+            except Exception as e:
+                logger.error(f"[WATCHER] Listener {getattr(listener, '__name__', listener)}: {e}")
+
+    def _coalesce(self, action: str, rel_path: str) -> bool:
+        """Registra criações e indica se a alteração faz parte de uma criação já publicada"""
+        now = time.monotonic()
+        with self.created_lock:
+            if action == CREATED:
+                self.created = {
+                    path: created for path, created in self.created.items()
+                    if now - created < self.COALESCE_WINDOW
+                }
+                self.created[rel_path] = now
+                return False
+            created = self.created.pop(rel_path, None)
+            if action == MODIFIED and created is not None and now - created < self.COALESCE_WINDOW:
+                self.created[rel_path] = created
+                return True
+            return False
+
+    def resync(self):
+        """Compara o vault com o manifesto e emite os eventos que faltaram"""
+        removed, changed = self.index.diff()
+
+        # Mesma assinatura (mtime, tamanho) em caminho novo = renomeação
+        removed_by_signature = {self.index.files.get(p): p for p in removed}
+        for rel_path, signature in changed.items():
+            old_path = removed_by_signature.pop(signature, None)
+            if old_path and rel_path not in self.index.files:
+                removed.remove(old_path)
+                self.handle(MOVED, old_path, rel_path)
+            else:
+                self.handle(MODIFIED, rel_path)
+
+        for rel_path in removed:
+            self.handle(DELETED, rel_path)
+
+    def _poll_loop(self):
+        while not self.stop_event.wait(self.POLL_INTERVAL):
+            try:
+                self.resync()
+            except Exception as e:
+                logger.error(f"[WATCHER] Erro no polling: {e}")
+
+    def _save_loop(self):
+        while not self.stop_event.wait(self.SAVE_INTERVAL):
+            try:
+                if self.index.dirty:
+                    self.index.save()
+            except Exception as e:
+                logger.error(f"[WATCHER] Erro ao salvar índice: {e}")
+
+
+class HubEventPublisher:
+    """Listener que publica as mudanças como eventos FILE_CHANGE no Hub Central"""
+
+    def __init__(self, hub_url: str, vault_path: str):
+        self.hub_url = hub_url.rstrip('/')
+        self.vault_path = vault_path
+        # Um único worker mantém a ordem dos eventos sem bloquear o watcher
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='hub-publisher')
+        self.__name__ = 'HubEventPublisher'
+
+    def __call__(self, action: str, rel_path: str, dest_path: Optional[str] = None):
+        data = {
+            'action': action,
+            'path': dest_path or rel_path,
+            'vault': self.vault_path,
+        }
+        if dest_path:
+            data['old_path'] = rel_path
+        self.executor.submit(self._post, data)
+
+    def _post(self, data: Dict):
+        try:
+            requests.post(
+                f"{self.hub_url}/event",
+                json={'type': 'file_change', 'source': 'vault_watcher', 'data': data},
+                timeout=5
+            )
+        except Exception as e:
+            logger.warning(f"[WATCHER] Hub indisponível ({self.hub_url}): {e}")
+
+
+# ==================== INSTÂNCIAS ====================
+
+_watchers: Dict[str, VaultWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def start_watcher(vault_path: str, hub_url: Optional[str] = None) -> VaultWatcher:
+    """Inicia (uma vez por vault) o watcher e a publicação de eventos no Hub"""
+    index = get_vault_index(vault_path)
+    key = str(index.vault_path)
+
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = _watchers[key] = VaultWatcher(index)
+            if hub_url:
+                watcher.add_listener(HubEventPublisher(hub_url, key))
+        watcher.start()
+        return watcher
+
+
+def get_watcher(vault_path: str) -> Optional[VaultWatcher]:
+    """Watcher em execução para o vault (None se não houver)"""
+    key = str(get_vault_index(vault_path).vault_path)
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        return watcher if watcher and watcher.running else None
+
+
+def index_note(vault_path: str, rel_path: str):
+    """
+    Indexa uma nota criada ou alterada pelo próprio agente. Com o watcher em execução
+    a mudança passa por ele, para que os listeners (Hub) recebam o evento mesmo que o
+    índice seja atualizado antes de o sistema de arquivos notificar a escrita.
+    """
+    watcher = get_watcher(vault_path)
+    if watcher:
+        watcher.handle(MODIFIED, rel_path)
+    else:
+        get_vault_index(vault_path).update_file(rel_path)
+
+
+def stop_watchers():
+    """Para todos os watchers ativos"""
+    with _watchers_lock:
+        for watcher in _watchers.values():
+            watcher.stop()
+        _watchers.clear()
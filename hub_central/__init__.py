@@ -24,6 +24,8 @@ from .execution_engine import (
     engine,
     ask_ai,
     ask_multiple,
+    ask_ai_async,
+    ask_multiple_async,
     TaskCategory,
     AIProvider
 )
@@ -62,6 +64,8 @@ __all__ = [
     "engine",
     "ask_ai",
     "ask_multiple",
+    "ask_ai_async",
+    "ask_multiple_async",
     "TaskCategory",
     "AIProvider",
     
@@ -8,17 +8,37 @@ Criado por Manus para Rudson Oliveira
 import os
 import json
 import logging
+import threading
 import time
 import asyncio
+import itertools
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+
+# Sessão HTTP (pool por host e novas tentativas) e cache de respostas: cópias dos módulos
+# do agente, mantidas idênticas (ver tests/test_http_pool.py)
+try:
+    from .http_pool import BACKOFF_FACTOR, POST_RETRY_STATUS, create_session, pool_settings
+    from .llm_cache import LLMCache, cache_key
+except ImportError:
+    from http_pool import BACKOFF_FACTOR, POST_RETRY_STATUS, create_session, pool_settings
+    from llm_cache import LLMCache, cache_key
+
+# Cliente HTTP assíncrono (opcional): sem ele, a execução assíncrona usa threads
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
 
 logger = logging.getLogger('ExecutionEngine')
 
+# URL, cabeçalhos, corpo JSON e extrator do texto da resposta de um provedor
+ProviderRequest = Tuple[str, Dict[str, str], Dict[str, Any], Callable[[Dict[str, Any]], str]]
+
 
 class AIProvider(Enum):
     """Provedores de IA disponíveis"""
@@ -56,6 +76,7 @@ class ExecutionTask:
     fallback_providers: List[AIProvider] = field(default_factory=list)
     max_retries: int = 3
     timeout: int = 60
+    use_cache: bool = True      # False: não lê nem grava o cache de respostas
     created_at: datetime = field(default_factory=datetime.now)
     
     # Resultado
@@ -64,6 +85,7 @@ class ExecutionTask:
     execution_time_ms: int = 0
     success: bool = False
     error: Optional[str] = None
+    cached: bool = False
 
 
 class DecisionEngine:
@@ -179,16 +201,66 @@ class ExecutionEngine:
     Motor de execução de tarefas
     """
     
+    # Execução assíncrona: chamadas simultâneas por provedor e conexões abertas no total
+    ASYNC_CONCURRENCY = 32
+    ASYNC_CONCURRENCY_OVERRIDES = {AIProvider.OLLAMA: 2, AIProvider.MANUS: 4}
+    ASYNC_HTTP_LIMIT = 200
+    ASYNC_FALLBACK_THREADS = 32     # threads do laço quando o aiohttp não está instalado
+    
+    # Pool de conexões HTTP por host (chamadas síncronas; acompanha as threads do laço)
+    HTTP_POOL_CONNECTIONS = 16
+    HTTP_POOL_MAXSIZE = ASYNC_FALLBACK_THREADS
+    HTTP_RETRIES = 2
+    
+    # Modelo de cada provedor (também compõe a chave do cache de respostas)
+    MODELS = {
+        AIProvider.OPENAI: "gpt-4o-mini",
+        AIProvider.CLAUDE: "claude-3-haiku-20240307",
+        AIProvider.GEMINI: "gemini-pro",
+        AIProvider.PERPLEXITY: "llama-3.1-sonar-small-128k-online",
+        AIProvider.GROQ: "llama3-8b-8192",
+        AIProvider.OLLAMA: "llama3"
+    }
+    
+    # Cache de respostas; o Manus executa ações, então não é cacheado
+    CACHE_PATH = os.path.expanduser("~/.hub_central/llm_cache.db")
+    UNCACHED_PROVIDERS = (AIProvider.MANUS,)
+    
     def __init__(self, hub=None):
         self.hub = hub
         self.decision_engine = DecisionEngine()
-        self.executor = ThreadPoolExecutor(max_workers=5)
         
         # Configurações de API
         self.api_configs = self._load_api_configs()
         
+        # Pool HTTP: tamanhos padrão da classe, sobrescritos pela seção http_pool do SYSTEM_CONTEXT
+        settings = {
+            "pool_connections": self.HTTP_POOL_CONNECTIONS,
+            "pool_maxsize": self.HTTP_POOL_MAXSIZE,
+            "retries": self.HTTP_RETRIES
+        }
+        settings.update(pool_settings(self.api_configs.get("http_pool")))
+        self.session = create_session(**settings)
+        # A mesma política vale para as chamadas assíncronas (aiohttp)
+        self.http_retries = settings["retries"]
+        self.http_backoff = settings.get("backoff_factor", BACKOFF_FACTOR)
+        
+        # Cache de respostas em disco
+        try:
+            self.cache = LLMCache(self.CACHE_PATH)
+        except Exception as e:
+            logger.error(f"[CACHE] Erro ao abrir cache de respostas: {e}")
+            self.cache = None
+        
         # Histórico de execuções
         self.execution_history: List[ExecutionTask] = []
+        self._task_ids = itertools.count(1)
+        
+        # Laço asyncio (thread própria), semáforos por provedor e sessão aiohttp
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._semaphores: Dict[AIProvider, asyncio.Semaphore] = {}
+        self._http = None
     
     def _load_api_configs(self) -> Dict[str, Any]:
         """Carrega configurações de API do SYSTEM_CONTEXT"""
@@ -228,7 +300,7 @@ class ExecutionEngine:
         providers = self.decision_engine.select_provider(category, preferred_provider)
         
         task = ExecutionTask(
-            id=f"task_{int(time.time()*1000)}",
+            id=f"task_{int(time.time()*1000)}_{next(self._task_ids)}",
             category=category,
             prompt=prompt,
             context=context or {},
@@ -244,36 +316,53 @@ class ExecutionEngine:
         """Executa uma tarefa"""
         start_time = time.time()
         
-        providers_to_try = [task.preferred_provider] + task.fallback_providers
-        providers_to_try = [p for p in providers_to_try if p is not None]
-        
-        for attempt, provider in enumerate(providers_to_try):
+        for attempt, provider in enumerate(self._providers_for(task)):
             try:
                 logger.info(f"[EXEC] Tentativa {attempt + 1} com {provider.value}")
                 
                 result = self._call_provider(provider, task)
-                
-                task.result = result
-                task.provider_used = provider
-                task.success = True
-                task.execution_time_ms = int((time.time() - start_time) * 1000)
-                
-                # Atualizar latência do provedor
-                self.decision_engine.update_provider_status(
-                    provider, True, task.execution_time_ms
-                )
-                
-                logger.info(f"[EXEC] Sucesso com {provider.value} em {task.execution_time_ms}ms")
+                self._record_success(task, provider, result, start_time)
                 break
                 
             except Exception as e:
-                logger.error(f"[EXEC] Erro com {provider.value}: {e}")
-                task.error = str(e)
-                
-                # Marcar provedor como problemático
-                self.decision_engine.update_provider_status(provider, False)
+                self._record_failure(task, provider, e)
+        
+        self._finish(task)
+        return task
+    
+    def _providers_for(self, task: ExecutionTask) -> List[AIProvider]:
+        """Provedores a tentar, na ordem"""
+        providers_to_try = [task.preferred_provider] + task.fallback_providers
+        providers_to_try = [p for p in providers_to_try if p is not None]
         
-        # Salvar no histórico
+        # Provedores com a resposta no cache primeiro (evita uma chamada paga)
+        providers_to_try.sort(key=lambda p: not self._is_cached(p, task))
+        return providers_to_try
+    
+    def _record_success(self, task: ExecutionTask, provider: AIProvider, result: str, start_time: float):
+        task.result = result
+        task.provider_used = provider
+        task.success = True
+        task.execution_time_ms = int((time.time() - start_time) * 1000)
+        
+        # Atualizar latência do provedor (respostas do cache não medem o provedor)
+        if not task.cached:
+            self.decision_engine.update_provider_status(
+                provider, True, task.execution_time_ms
+            )
+        
+        logger.info(f"[EXEC] Sucesso com {provider.value} em {task.execution_time_ms}ms"
+                    f"{' (cache)' if task.cached else ''}")
+    
+    def _record_failure(self, task: ExecutionTask, provider: AIProvider, error: Exception):
+        logger.error(f"[EXEC] Erro com {provider.value}: {error}")
+        task.error = str(error)
+        
+        # Marcar provedor como problemático
+        self.decision_engine.update_provider_status(provider, False)
+    
+    def _finish(self, task: ExecutionTask):
+        """Salva a tarefa no histórico e registra o evento no Hub"""
         self.execution_history.append(task)
         
         # Registrar no Hub se disponível
@@ -293,202 +382,380 @@ class ExecutionEngine:
                 },
                 Priority.LOW
             )
-        
-        return task
+    
+    def _cache_key(self, provider: AIProvider, task: ExecutionTask) -> Optional[str]:
+        """
+        Chave da resposta no cache, com o prompt de sistema e a temperatura da requisição
+        montada para o provedor (None se o provedor não é cacheado, não está configurado
+        ou a tarefa dispensa o cache)
+        """
+        if self.cache is None or not task.use_cache or provider in self.UNCACHED_PROVIDERS:
+            return None
+        try:
+            _, _, body, _ = self._provider_request(provider, task)
+        except ValueError:
+            return None
+        system, temperature = self._request_settings(body)
+        return cache_key(provider.value, body.get("model", self.MODELS.get(provider)), system, task.prompt, temperature)
+    
+    @staticmethod
+    def _request_settings(body: Dict[str, Any]) -> Tuple[Optional[str], Optional[float]]:
+        """Prompt de sistema e temperatura do corpo da requisição (None quando o provedor usa o padrão)"""
+        system = body.get("system")
+        for message in body.get("messages", []):
+            if message.get("role") == "system":
+                system = message["content"]
+        temperature = body.get("temperature")
+        for section in ("options", "generationConfig"):
+            temperature = body.get(section, {}).get("temperature", temperature)
+        return system, temperature
+    
+    def _is_cached(self, provider: AIProvider, task: ExecutionTask) -> bool:
+        key = self._cache_key(provider, task)
+        return key is not None and self.cache.contains(key)
+    
+    def _from_cache(self, key: Optional[str], task: ExecutionTask) -> Optional[str]:
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                task.cached = True
+                return cached["response"]
+        return None
     
     def _call_provider(self, provider: AIProvider, task: ExecutionTask) -> str:
-        """Chama um provedor de IA específico"""
+        """Chama um provedor de IA específico, consultando antes o cache de respostas"""
+        key = self._cache_key(provider, task)
+        cached = self._from_cache(key, task)
+        if cached is not None:
+            return cached
+        
+        start_time = time.time()
+        result = self._request_provider(provider, task)
+        if key and result:
+            self.cache.put(key, {"response": result}, (time.time() - start_time) * 1000)
+        return result
+    
+    def _request_provider(self, provider: AIProvider, task: ExecutionTask) -> str:
+        """Faz a requisição ao provedor"""
+        url, headers, body, parse = self._provider_request(provider, task)
+        
+        response = self.session.post(url, headers=headers, json=body, timeout=task.timeout)
+        
+        response.raise_for_status()
+        return parse(response.json())
+    
+    # ==================== REQUISIÇÕES POR PROVEDOR ====================
+    
+    def _provider_request(self, provider: AIProvider, task: ExecutionTask) -> ProviderRequest:
+        """URL, cabeçalhos, corpo e extrator do texto da resposta de um provedor"""
         
         if provider == AIProvider.OPENAI:
-            return self._call_openai(task)
+            return self._openai_request(task)
         elif provider == AIProvider.CLAUDE:
-            return self._call_claude(task)
+            return self._claude_request(task)
         elif provider == AIProvider.GEMINI:
-            return self._call_gemini(task)
+            return self._gemini_request(task)
         elif provider == AIProvider.PERPLEXITY:
-            return self._call_perplexity(task)
+            return self._perplexity_request(task)
         elif provider == AIProvider.GROQ:
-            return self._call_groq(task)
+            return self._groq_request(task)
         elif provider == AIProvider.OLLAMA:
-            return self._call_ollama(task)
+            return self._ollama_request(task)
         elif provider == AIProvider.MANUS:
-            return self._call_manus(task)
+            return self._manus_request(task)
         else:
             raise ValueError(f"Provedor não implementado: {provider}")
     
-    def _call_openai(self, task: ExecutionTask) -> str:
-        """Chama OpenAI API"""
+    def _openai_request(self, task: ExecutionTask) -> ProviderRequest:
+        """Requisição para a OpenAI API"""
         api_key = self.api_configs.get("api_keys", {}).get("openai", "")
         
         if not api_key:
             raise ValueError("OpenAI API key não configurada")
         
-        response = requests.post(
+        return (
             "https://api.openai.com/v1/chat/completions",
-            headers={
+            {
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             },
-            json={
-                "model": "gpt-4o-mini",
+            {
+                "model": self.MODELS[AIProvider.OPENAI],
                 "messages": [
                     {"role": "system", "content": "Você é um assistente inteligente."},
                     {"role": "user", "content": task.prompt}
                 ],
                 "max_tokens": 2000
             },
-            timeout=task.timeout
+            lambda data: data["choices"][0]["message"]["content"]
         )
-        
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
     
-    def _call_claude(self, task: ExecutionTask) -> str:
-        """Chama Claude API"""
+    def _claude_request(self, task: ExecutionTask) -> ProviderRequest:
+        """Requisição para a Claude API"""
         api_key = self.api_configs.get("api_keys", {}).get("claude", "")
         
         if not api_key:
             raise ValueError("Claude API key não configurada")
         
-        response = requests.post(
+        return (
             "https://api.anthropic.com/v1/messages",
-            headers={
+            {
                 "x-api-key": api_key,
                 "Content-Type": "application/json",
                 "anthropic-version": "2023-06-01"
             },
-            json={
-                "model": "claude-3-haiku-20240307",
+            {
+                "model": self.MODELS[AIProvider.CLAUDE],
                 "max_tokens": 2000,
                 "messages": [
                     {"role": "user", "content": task.prompt}
                 ]
             },
-            timeout=task.timeout
+            lambda data: data["content"][0]["text"]
         )
-        
-        response.raise_for_status()
-        return response.json()["content"][0]["text"]
     
-    def _call_gemini(self, task: ExecutionTask) -> str:
-        """Chama Gemini API"""
+    def _gemini_request(self, task: ExecutionTask) -> ProviderRequest:
+        """Requisição para a Gemini API"""
         api_key = self.api_configs.get("api_keys", {}).get("gemini", "")
         
         if not api_key:
             raise ValueError("Gemini API key não configurada")
         
-        response = requests.post(
-            f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={api_key}",
-            headers={"Content-Type": "application/json"},
-            json={
+        return (
+            f"https://generativelanguage.googleapis.com/v1beta/models/{self.MODELS[AIProvider.GEMINI]}:generateContent?key={api_key}",
+            {"Content-Type": "application/json"},
+            {
                 "contents": [{"parts": [{"text": task.prompt}]}]
             },
-            timeout=task.timeout
+            lambda data: data["candidates"][0]["content"]["parts"][0]["text"]
         )
-        
-        response.raise_for_status()
-        return response.json()["candidates"][0]["content"]["parts"][0]["text"]
     
-    def _call_perplexity(self, task: ExecutionTask) -> str:
-        """Chama Perplexity API"""
+    def _perplexity_request(self, task: ExecutionTask) -> ProviderRequest:
+        """Requisição para a Perplexity API"""
         api_key = self.api_configs.get("api_keys", {}).get("perplexity", "")
         
         if not api_key:
             raise ValueError("Perplexity API key não configurada")
         
-        response = requests.post(
+        return (
             "https://api.perplexity.ai/chat/completions",
-            headers={
+            {
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             },
-            json={
-                "model": "llama-3.1-sonar-small-128k-online",
+            {
+                "model": self.MODELS[AIProvider.PERPLEXITY],
                 "messages": [
                     {"role": "user", "content": task.prompt}
                 ]
             },
-            timeout=task.timeout
+            lambda data: data["choices"][0]["message"]["content"]
         )
-        
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
     
-    def _call_groq(self, task: ExecutionTask) -> str:
-        """Chama Groq API"""
+    def _groq_request(self, task: ExecutionTask) -> ProviderRequest:
+        """Requisição para a Groq API"""
         api_key = self.api_configs.get("api_keys", {}).get("groq", "")
         
         if not api_key:
             raise ValueError("Groq API key não configurada")
         
-        response = requests.post(
+        return (
             "https://api.groq.com/openai/v1/chat/completions",
-            headers={
+            {
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             },
-            json={
-                "model": "llama3-8b-8192",
+            {
+                "model": self.MODELS[AIProvider.GROQ],
                 "messages": [
                     {"role": "user", "content": task.prompt}
                 ]
             },
-            timeout=task.timeout
+            lambda data: data["choices"][0]["message"]["content"]
         )
-        
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
     
-    def _call_ollama(self, task: ExecutionTask) -> str:
-        """Chama Ollama local"""
-        response = requests.post(
+    def _ollama_request(self, task: ExecutionTask) -> ProviderRequest:
+        """Requisição para o Ollama local"""
+        return (
             "http://localhost:11434/api/generate",
-            json={
-                "model": "llama3",
+            {},
+            {
+                "model": self.MODELS[AIProvider.OLLAMA],
                 "prompt": task.prompt,
                 "stream": False
             },
-            timeout=task.timeout
+            lambda data: data["response"]
         )
-        
-        response.raise_for_status()
-        return response.json()["response"]
     
-    def _call_manus(self, task: ExecutionTask) -> str:
-        """Chama Manus Bridge"""
-        response = requests.post(
+    def _manus_request(self, task: ExecutionTask) -> ProviderRequest:
+        """Requisição para o Manus Bridge"""
+        return (
             "http://localhost:5000/ai/query",
-            json={
+            {},
+            {
                 "prompt": task.prompt,
                 "context": task.context
             },
-            timeout=task.timeout
+            lambda data: data.get("response", "")
         )
-        
-        response.raise_for_status()
-        return response.json().get("response", "")
     
-    # ==================== EXECUÇÃO PARALELA ====================
+    # ==================== EXECUÇÃO ASSÍNCRONA ====================
     
-    def execute_parallel(self, tasks: List[ExecutionTask]) -> List[ExecutionTask]:
-        """Executa múltiplas tarefas em paralelo"""
-        futures = {
-            self.executor.submit(self.execute, task): task
-            for task in tasks
-        }
-        
-        results = []
-        for future in as_completed(futures):
-            task = futures[future]
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """Laço asyncio do motor, em uma thread própria (criado no primeiro uso)"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                if not AIOHTTP_AVAILABLE:
+                    loop.set_default_executor(ThreadPoolExecutor(
+                        max_workers=self.ASYNC_FALLBACK_THREADS, thread_name_prefix="execution-engine"
+                    ))
+                threading.Thread(target=loop.run_forever, name="execution-engine-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+    
+    def _semaphore(self, provider: AIProvider) -> asyncio.Semaphore:
+        # Só é usado dentro do laço do motor
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            limit = self.ASYNC_CONCURRENCY_OVERRIDES.get(provider, self.ASYNC_CONCURRENCY)
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(limit)
+        return semaphore
+    
+    def _http_session(self) -> "aiohttp.ClientSession":
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.ASYNC_HTTP_LIMIT),
+                cookie_jar=aiohttp.DummyCookieJar()
+            )
+        return self._http
+    
+    async def _request_provider_async(self, provider: AIProvider, task: ExecutionTask) -> str:
+        """Faz a requisição ao provedor sem bloquear o laço"""
+        if not AIOHTTP_AVAILABLE:
+            # Sem aiohttp: requisição síncrona em uma thread do laço (limitada pelo semáforo)
+            return await asyncio.to_thread(self._request_provider, provider, task)
+        
+        url, headers, body, parse = self._provider_request(provider, task)
+        return parse(await self._post_async(url, headers, body, task.timeout))
+    
+    async def _post_async(self, url: str, headers: Dict[str, str], body: Dict[str, Any], timeout: float) -> Any:
+        """
+        POST com a política de novas tentativas da sessão síncrona: falhas ao conectar e
+        respostas 429/503 são repetidas até http_retries vezes, com espera exponencial
+        (ou a indicada em Retry-After). Timeouts e 502/504 não são repetidos: o provedor
+        pode já ter gerado (e cobrado) a resposta.
+        """
+        for attempt in range(self.http_retries + 1):
+            retry_after = None
             try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                task.error = str(e)
-                task.success = False
-                results.append(task)
+                async with self._http_session().post(
+                    url, headers=headers, json=body, timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    if response.status not in POST_RETRY_STATUS or attempt == self.http_retries:
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+                    retry_after = response.headers.get("Retry-After")
+                    error = f"HTTP {response.status}"
+            except aiohttp.ClientConnectorError as e:
+                # Só falhas ao conectar: a requisição não chegou ao provedor
+                if attempt == self.http_retries:
+                    raise
+                error = str(e) or type(e).__name__
+            
+            delay = self._retry_delay(attempt, retry_after)
+            logger.warning(f"[EXEC] {error} em {url}; nova tentativa em {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Espera antes da nova tentativa: Retry-After (em segundos) ou espera exponencial"""
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return self.http_backoff * (2 ** attempt)
+    
+    async def _call_provider_async(self, provider: AIProvider, task: ExecutionTask) -> str:
+        # O cache é SQLite (bloqueante): consultas e gravações vão para uma thread
+        key = self._cache_key(provider, task)
+        if key:
+            cached = await asyncio.to_thread(self._from_cache, key, task)
+            if cached is not None:
+                return cached
+        
+        async with self._semaphore(provider):
+            start_time = time.time()
+            result = await self._request_provider_async(provider, task)
+        if key and result:
+            await asyncio.to_thread(self.cache.put, key, {"response": result}, (time.time() - start_time) * 1000)
+        return result
+    
+    async def _execute_async(self, task: ExecutionTask) -> ExecutionTask:
+        start_time = time.time()
+        
+        try:
+            # A ordem dos provedores consulta o cache (SQLite): fora do laço
+            providers = await asyncio.to_thread(self._providers_for, task)
+            for attempt, provider in enumerate(providers):
+                try:
+                    logger.info(f"[EXEC] Tentativa {attempt + 1} com {provider.value}")
+                    
+                    result = await self._call_provider_async(provider, task)
+                    self._record_success(task, provider, result, start_time)
+                    break
+                    
+                except Exception as e:
+                    self._record_failure(task, provider, e)
+        except asyncio.CancelledError:
+            task.success = False
+            task.error = "Execução cancelada"
+            raise
+        finally:
+            self._finish(task)
         
-        return results
+        return task
+    
+    async def _execute_parallel(self, tasks: List[ExecutionTask], timeout: Optional[float]) -> List[ExecutionTask]:
+        running = [asyncio.ensure_future(self._execute_async(task)) for task in tasks]
+        try:
+            _, pending = await asyncio.wait(running, timeout=timeout)
+        except asyncio.CancelledError:
+            pending = running
+            raise
+        finally:
+            # Cancelamento cooperativo: as tarefas pendentes param no próximo await
+            for future in pending:
+                future.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        if pending:
+            logger.warning(f"[EXEC] {len(pending)} tarefa(s) cancelada(s) após {timeout}s")
+        return tasks
+    
+    async def execute_parallel_async(self, tasks: List[ExecutionTask], timeout: Optional[float] = None) -> List[ExecutionTask]:
+        """
+        Executa múltiplas tarefas concorrentemente no laço asyncio do motor, com no máximo
+        ASYNC_CONCURRENCY chamadas simultâneas por provedor. Tarefas não concluídas em
+        timeout segundos (ou quando quem aguarda é cancelado) são canceladas.
+        Retorna as tarefas na ordem recebida.
+        """
+        if not tasks:
+            return []
+        loop = self._event_loop()
+        if asyncio.get_running_loop() is loop:
+            return await self._execute_parallel(tasks, timeout)
+        # Chamado de outro laço: executa no laço do motor (semáforos e sessão HTTP são dele)
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self._execute_parallel(tasks, timeout), loop)
+        )
+    
+    def execute_parallel(self, tasks: List[ExecutionTask], timeout: Optional[float] = None) -> List[ExecutionTask]:
+        """Executa múltiplas tarefas em paralelo (versão síncrona de execute_parallel_async)"""
+        if not tasks:
+            return []
+        return asyncio.run_coroutine_threadsafe(self._execute_parallel(tasks, timeout), self._event_loop()).result()
     
     # ==================== ESTATÍSTICAS ====================
     
@@ -513,6 +780,7 @@ class ExecutionEngine:
             "success_rate": (successful / total * 100) if total > 0 else 0,
             "average_execution_time_ms": avg_time,
             "provider_usage": provider_usage,
+            "cache": self.cache.stats() if self.cache is not None else None,
             "provider_status": {p.value: s for p, s in self.decision_engine.provider_status.items()}
         }
 
@@ -521,7 +789,7 @@ class ExecutionEngine:
 
 engine = ExecutionEngine()
 
-def ask_ai(prompt: str, category: str = None, provider: str = None) -> str:
+def ask_ai(prompt: str, category: str = None, provider: str = None, use_cache: bool = True) -> str:
     """
     Função simples para fazer perguntas à IA
     
@@ -529,6 +797,7 @@ def ask_ai(prompt: str, category: str = None, provider: str = None) -> str:
         prompt: A pergunta ou comando
         category: Categoria opcional (code, research, creative, etc)
         provider: Provedor preferido opcional (openai, claude, gemini, etc)
+        use_cache: False para ignorar o cache de respostas
     
     Returns:
         Resposta da IA
@@ -537,6 +806,7 @@ def ask_ai(prompt: str, category: str = None, provider: str = None) -> str:
     preferred = AIProvider(provider) if provider else None
     
     task = engine.create_task(prompt, task_category, preferred_provider=preferred)
+    task.use_cache = use_cache
     result = engine.execute(task)
     
     if result.success:
@@ -545,10 +815,32 @@ def ask_ai(prompt: str, category: str = None, provider: str = None) -> str:
         raise Exception(f"Erro na execução: {result.error}")
 
 
-def ask_multiple(prompts: List[str]) -> List[str]:
-    """Executa múltiplas perguntas em paralelo"""
+def ask_multiple(prompts: List[str], timeout: float = None) -> List[str]:
+    """Executa múltiplas perguntas em paralelo (respostas na ordem das perguntas)"""
+    tasks = [engine.create_task(p) for p in prompts]
+    results = engine.execute_parallel(tasks, timeout)
+    return [r.result if r.success else f"Erro: {r.error}" for r in results]
+
+
+async def ask_ai_async(prompt: str, category: str = None, provider: str = None, use_cache: bool = True) -> str:
+    """Versão assíncrona de ask_ai"""
+    task_category = TaskCategory(category) if category else None
+    preferred = AIProvider(provider) if provider else None
+    
+    task = engine.create_task(prompt, task_category, preferred_provider=preferred)
+    task.use_cache = use_cache
+    result = (await engine.execute_parallel_async([task]))[0]
+    
+    if result.success:
+        return result.result
+    else:
+        raise Exception(f"Erro na execução: {result.error}")
+
+
+async def ask_multiple_async(prompts: List[str], timeout: float = None) -> List[str]:
+    """Versão assíncrona de ask_multiple"""
     tasks = [engine.create_task(p) for p in prompts]
-    results = engine.execute_parallel(tasks)
+    results = await engine.execute_parallel_async(tasks, timeout)
     return [r.result if r.success else f"Erro: {r.error}" for r in results]
 
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+HTTP Pool
+Sessão HTTP compartilhada pelos clientes de IA: conexões keep-alive reaproveitadas
+por host (sem novo handshake TCP/TLS a cada chamada) e novas tentativas em falhas transitórias
+"""
+
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Hosts com pool mantido e conexões keep-alive por host
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 10
+
+# Novas tentativas em falhas de conexão e respostas de sobrecarga (espera exponencial,
+# respeitando Retry-After); timeouts de leitura não são repetidos para não dobrar a espera.
+# Um POST de chat é pago e não idempotente: após 502/504 o provedor pode já ter gerado a
+# resposta, então ele só é repetido em 429/503 (recusado antes de ser processado)
+RETRIES = 2
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS = (429, 502, 503, 504)
+POST_RETRY_STATUS = (429, 503)
+
+
+class ProviderRetry(Retry):
+    """Retry que repete métodos não idempotentes só nos status de POST_RETRY_STATUS"""
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method.upper() not in Retry.DEFAULT_ALLOWED_METHODS and status_code not in POST_RETRY_STATUS:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def create_session(pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE,
+                   retries: int = RETRIES, backoff_factor: float = BACKOFF_FACTOR) -> requests.Session:
+    """Sessão com pool de conexões por host e política de novas tentativas"""
+    retry = ProviderRetry(
+        total=retries,
+        connect=retries,
+        read=0,
+        other=0,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=None,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # Sessão compartilhada entre provedores e usuários: não guarda cookies
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def pool_settings(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parâmetros de create_session presentes na seção http_pool de uma configuração"""
+    settings = {}
+    for name, convert in (('pool_connections', int), ('pool_maxsize', int),
+                          ('retries', int), ('backoff_factor', float)):
+        if (config or {}).get(name) is not None:
+            settings[name] = convert(config[name])
+    return settings
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Sessão global (criada no primeiro uso)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def configure_http_pool(pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE,
+                        retries: int = RETRIES, backoff_factor: float = BACKOFF_FACTOR):
+    """Substitui a sessão global (as conexões da anterior são fechadas)"""
+    global _session
+    with _session_lock:
+        previous = _session
+        _session = create_session(pool_connections, pool_maxsize, retries, backoff_factor)
+    if previous is not None:
+        previous.close()
+    logger.info(f'[HTTP] Pool configurado: {pool_connections} hosts, {pool_maxsize} conexões por host, '
+                f'{retries} novas tentativas')
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_session().post(url, **kwargs)
+
+
+# ==================== STREAMING ====================
+
+def _iter_lines(response: requests.Response) -> Iterator[str]:
+    # Bytes divididos só em \r/\n e decodificados como UTF-8: text/event-stream sem charset
+    # seria lido como ISO-8859-1, e splitlines em texto também quebra em \u2028
+    for line in response.iter_lines():
+        yield line.decode('utf-8', errors='replace')
+
+
+def iter_sse(response: requests.Response) -> Iterator[Tuple[str, str]]:
+    """(evento, dados) de uma resposta text/event-stream, à medida que chegam"""
+    event, data = None, []
+    for line in _iter_lines(response):
+        if not line:
+            if data:
+                yield event or 'message', '\n'.join(data)
+            event, data = None, []
+            continue
+        if line.startswith(':'):
+            continue
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'event':
+            event = value
+        elif field == 'data':
+            data.append(value)
+    if data:
+        yield event or 'message', '\n'.join(data)
+
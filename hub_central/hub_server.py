@@ -29,6 +29,8 @@ try:
     from storage_connectors import storage_manager
     from triggers_manager import TriggersManager, get_triggers_manager
     from triggers_api import triggers_bp, init_triggers_api
+    from triggers_system import BuiltInTriggers
+    from execution_engine import engine, AIProvider, TaskCategory
     logger.info("[IMPORT] Módulos carregados com sucesso")
 except ImportError as e:
     logger.error(f"[IMPORT] Erro ao importar módulos: {e}")
@@ -42,6 +44,10 @@ CORS(app)
 hub = None
 triggers = None
 
+# Gatilhos padrão registrados pelo servidor: só o de notas novas (eventos file_change
+# do Vault Watcher); health_check, auto_backup etc. continuam desativados por padrão
+BUILTIN_TRIGGERS = ["new_note_handler"]
+
 
 def init_hub():
     """Inicializa o Hub Central e componentes"""
@@ -50,6 +56,9 @@ def init_hub():
     # Inicializar Hub Central
     hub = HubCentral()
     
+    # Gatilho de notas novas para eventos file_change do Vault Watcher
+    BuiltInTriggers(hub, BUILTIN_TRIGGERS)
+    
     # Inicializar gerenciador de gatilhos
     config_path = os.path.expanduser("~/.hub_central/triggers_config.json")
     
@@ -158,29 +167,54 @@ def create_event():
 
 @app.route('/ai/ask', methods=['POST'])
 def ai_ask():
-    """Envia prompt para o motor de decisão de IA"""
-    global hub
+    """
+    Envia um prompt ("prompt") ou vários ("prompts") para o motor de decisão de IA.
+    Os prompts são executados concorrentemente no laço asyncio do motor; os que não
+    terminarem em "timeout" segundos são cancelados.
+    """
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not (data.get("prompt") or data.get("prompts")):
+        return jsonify({"error": "Prompt é obrigatório"}), 400
     
-    if not hub:
-        return jsonify({"error": "Hub não inicializado"}), 500
+    prompts = data["prompts"] if data.get("prompts") else [data["prompt"]]
+    if not isinstance(prompts, list) or not all(isinstance(prompt, str) and prompt.strip() for prompt in prompts):
+        return jsonify({"error": "prompt deve ser um texto e prompts uma lista de textos"}), 400
     
-    data = request.get_json()
+    provider = data.get("provider", "auto")
     
-    if not data or "prompt" not in data:
-        return jsonify({"error": "Prompt é obrigatório"}), 400
+    try:
+        preferred = None if provider in (None, "", "auto") else AIProvider(provider)
+        category = TaskCategory(data["category"]) if data.get("category") else None
+        timeout = float(data["timeout"]) if data.get("timeout") is not None else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    prompt = data["prompt"]
-    provider = data.get("provider", "auto")
+    tasks = []
+    for prompt in prompts:
+        task = engine.create_task(prompt, category, preferred_provider=preferred)
+        task.use_cache = data.get("cache", True)
+        tasks.append(task)
     
     # Executar via motor de execução
-    result = hub.execution_engine.execute({
-        "prompt": prompt,
-        "provider": provider
-    })
+    tasks = engine.execute_parallel(tasks, timeout)
+    
+    results = [{
+        "task_id": task.id,
+        "success": task.success,
+        "result": task.result,
+        "provider": task.provider_used.value if task.provider_used else None,
+        "cached": task.cached,
+        "execution_time_ms": task.execution_time_ms,
+        "error": None if task.success else task.error
+    } for task in tasks]
+    
+    if "prompts" not in data:
+        return jsonify(results[0])
     
     return jsonify({
-        "success": True,
-        "result": result
+        "success": all(r["success"] for r in results),
+        "results": results
     })
 
 
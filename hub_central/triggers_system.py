@@ -32,62 +32,57 @@ class BuiltInTriggers:
     Gatilhos pré-configurados do sistema
     """
     
-    def __init__(self, hub):
+    def __init__(self, hub, names: List[str] = None):
         self.hub = hub
         self.scheduled_jobs = []
-        self._setup_builtin_triggers()
-    
-    def _setup_builtin_triggers(self):
-        """Configura gatilhos padrão"""
-        
-        # 1. Health Check - Verifica saúde do sistema a cada 5 minutos
-        self.hub.register_trigger(
-            name="health_check",
-            condition=lambda e: e.type.value == "scheduled" and e.data.get("job") == "health_check",
-            action=self._action_health_check
-        )
-        
-        # 2. Auto Backup - Backup automático a cada hora
-        self.hub.register_trigger(
-            name="auto_backup",
-            condition=lambda e: e.type.value == "scheduled" and e.data.get("job") == "auto_backup",
-            action=self._action_auto_backup
-        )
-        
-        # 3. Daily Summary - Resumo diário às 23:00
-        self.hub.register_trigger(
-            name="daily_summary",
-            condition=lambda e: e.type.value == "scheduled" and e.data.get("job") == "daily_summary",
-            action=self._action_daily_summary
-        )
-        
-        # 4. Error Alert - Alerta quando há muitos erros
-        self.hub.register_trigger(
-            name="error_alert",
-            condition=lambda e: self._condition_error_threshold(e),
-            action=self._action_error_alert
-        )
-        
-        # 5. New Note Created - Quando uma nova nota é criada no Obsidian
-        self.hub.register_trigger(
-            name="new_note_handler",
-            condition=lambda e: e.type.value == "file_change" and e.data.get("action") == "created",
-            action=self._action_new_note
-        )
-        
-        # 6. AI Response Logger - Registra todas as respostas de IA
-        self.hub.register_trigger(
-            name="ai_response_logger",
-            condition=lambda e: e.type.value == "ai_response",
-            action=self._action_log_ai_response
-        )
-        
-        # 7. Webhook Processor - Processa webhooks recebidos
-        self.hub.register_trigger(
-            name="webhook_processor",
-            condition=lambda e: e.type.value == "webhook",
-            action=self._action_process_webhook
-        )
+        self._setup_builtin_triggers(names)
+    
+    def _setup_builtin_triggers(self, names: List[str] = None):
+        """Configura gatilhos padrão (apenas os informados em names, se houver)"""
+        builtin = [
+            # 1. Health Check - Verifica saúde do sistema a cada 5 minutos
+            ("health_check",
+             lambda e: e.type.value == "scheduled" and e.data.get("job") == "health_check",
+             self._action_health_check),
+            
+            # 2. Auto Backup - Backup automático a cada hora
+            ("auto_backup",
+             lambda e: e.type.value == "scheduled" and e.data.get("job") == "auto_backup",
+             self._action_auto_backup),
+            
+            # 3. Daily Summary - Resumo diário às 23:00
+            ("daily_summary",
+             lambda e: e.type.value == "scheduled" and e.data.get("job") == "daily_summary",
+             self._action_daily_summary),
+            
+            # 4. Error Alert - Alerta quando há muitos erros
+            ("error_alert",
+             lambda e: self._condition_error_threshold(e),
+             self._action_error_alert),
+            
+            # 5. New Note Created - Quando uma nova nota é criada no Obsidian
+            ("new_note_handler",
+             lambda e: e.type.value == "file_change" and e.data.get("action") == "created",
+             self._action_new_note),
+            
+            # 6. AI Response Logger - Registra todas as respostas de IA
+            ("ai_response_logger",
+             lambda e: e.type.value == "ai_response",
+             self._action_log_ai_response),
+            
+            # 7. Webhook Processor - Processa webhooks recebidos
+            ("webhook_processor",
+             lambda e: e.type.value == "webhook",
+             self._action_process_webhook),
+        ]
+        
+        unknown = set(names or []) - {name for name, _, _ in builtin}
+        if unknown:
+            raise ValueError(f"Gatilhos padrão desconhecidos: {sorted(unknown)}")
+        
+        for name, condition, action in builtin:
+            if names is None or name in names:
+                self.hub.register_trigger(name=name, condition=condition, action=action)
         
         logger.info("[TRIGGERS] Gatilhos padrão configurados")
     
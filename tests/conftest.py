@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Configuração comum dos testes: módulos do agente e do Hub no path, HOME isolado
+(índices, caches e configurações vão para um diretório temporário) e fixtures de vault
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'hub_central'))
+sys.path.insert(0, str(ROOT / 'agent'))
+
+# Antes de importar os módulos: os caminhos padrão são calculados a partir do HOME
+_home = tempfile.mkdtemp(prefix='obsidian-agent-tests-')
+os.environ['HOME'] = _home
+os.environ['USERPROFILE'] = _home
+
+API_KEY = 'test-key'
+
+
+def write_notes(vault: Path, notes: dict):
+    """Cria as notas {caminho relativo: conteúdo} no vault"""
+    for rel_path, content in notes.items():
+        path = vault / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def vault_indexers(index_dir: Path) -> list:
+    """Os mesmos indexadores de get_vault_index"""
+    from anchor_index import AnchorIndex
+    from completion_index import CompletionIndex
+    from date_index import DateIndex
+    from link_index import LinkIndex
+    from metadata_store import MetadataStore
+    from tag_index import TagIndex
+    from task_index import TaskIndex
+    from trigram_index import TrigramIndex
+
+    return [
+        LinkIndex(), TagIndex(), TrigramIndex(), DateIndex(), TaskIndex(), AnchorIndex(),
+        CompletionIndex(), MetadataStore(str(index_dir / 'metadata.db'))
+    ]
+
+
+@pytest.fixture
+def vault(tmp_path):
+    path = tmp_path / 'vault'
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def make_index(tmp_path):
+    """Cria um VaultIndex com índice em tmp_path (o mesmo diretório a cada chamada)"""
+    from vault_index import VaultIndex
+
+    def make(vault: Path, **kwargs) -> 'VaultIndex':
+        index_dir = tmp_path / 'index'
+        index_dir.mkdir(exist_ok=True)
+        index = VaultIndex(str(vault), index_dir=str(index_dir), indexers=vault_indexers(index_dir), **kwargs)
+        index.refresh(force=True)
+        return index
+
+    return make
+
+
+@pytest.fixture
+def client(vault):
+    """Cliente Flask do agente autenticado, com o vault configurado"""
+    import agent
+
+    config = dict(agent.load_config())
+    config.update({'api_key': API_KEY, 'vault_path': str(vault)})
+    agent.save_config(config)
+
+    test_client = agent.app.test_client()
+    test_client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {API_KEY}'
+    return test_client
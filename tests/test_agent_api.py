@@ -0,0 +1,76 @@
+"""Testes dos endpoints de notas do agente"""
+
+from conftest import write_notes
+
+
+def test_requires_auth(client):
+    response = client.post('/obsidian/note/search', json={'query': 'x'},
+                           headers={'Authorization': 'Bearer errada'})
+
+    assert response.status_code == 401
+
+
+def test_create_note_in_subfolder_is_indexed(client, vault):
+    response = client.post('/obsidian/note/create', json={
+        'title': 'Projetos/Plano', 'content': 'cronograma do trimestre'
+    })
+
+    assert response.status_code == 200
+    assert (vault / 'Projetos' / 'Plano.md').read_text(encoding='utf-8') == 'cronograma do trimestre'
+
+    result = client.post('/obsidian/note/search', json={'query': 'cronograma'}).get_json()
+    assert [hit['path'] for hit in result['results']] == ['Projetos/Plano.md']
+
+
+def test_create_note_outside_vault_is_rejected(client, vault):
+    response = client.post('/obsidian/note/create', json={'title': '../fora', 'content': 'x'})
+
+    assert response.status_code == 400
+    assert not (vault.parent / 'fora.md').exists()
+
+
+def test_create_existing_note_conflicts(client, vault):
+    write_notes(vault, {'Alpha.md': 'já existe'})
+
+    response = client.post('/obsidian/note/create', json={'title': 'Alpha'})
+
+    assert response.status_code == 409
+
+
+def test_search_limit_accepts_numeric_strings(client, vault):
+    write_notes(vault, {f'Nota {i}.md': 'termo comum' for i in range(3)})
+
+    result = client.post('/obsidian/note/search', json={'query': 'comum', 'limit': '2'}).get_json()
+
+    assert result['success']
+    assert result['total'] == 3
+    assert len(result['results']) == 2
+
+
+def test_search_rejects_invalid_limit(client):
+    for limit in ('abc', [1], True):
+        response = client.post('/obsidian/note/search', json={'query': 'x', 'limit': limit})
+        assert response.status_code == 400
+
+
+def test_find_rejects_invalid_limit(client):
+    response = client.post('/obsidian/advanced/find', json={'query': 'x', 'limit': 'muitos'})
+
+    assert response.status_code == 400
+
+def test_intelligent_create_note_stays_in_vault(client, vault, monkeypatch):
+    import agent
+
+    results = []
+    monkeypatch.setattr(agent.intelligent_agent, 'process_command', lambda text: {
+        'command': 'create_note', 'parameters': {'title': text, 'content': 'x'}
+    })
+    monkeypatch.setattr(agent.intelligent_agent, 'generate_response',
+                        lambda command, api_result: results.append(api_result) or 'ok')
+
+    client.post('/intelligent/process', json={'text': '../fora'})
+    client.post('/intelligent/process', json={'text': 'Pasta/Dentro'})
+
+    assert not (vault.parent / 'fora.md').exists()
+    assert [result['success'] for result in results] == [False, True]
+    assert (vault / 'Pasta' / 'Dentro.md').exists()
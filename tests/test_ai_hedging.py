@@ -0,0 +1,129 @@
+"""Testes da corrida entre provedores (hedging): a perdedora é cancelada de fato"""
+
+import json
+import threading
+import time
+
+import pytest
+
+import http_pool
+from ai_integration import AIIntegration
+from llm_cache import LLMCache
+
+
+@pytest.fixture
+def ai(tmp_path):
+    integration = AIIntegration()
+    integration.config_path = str(tmp_path / 'ai_config.json')
+    integration.cache = LLMCache(str(tmp_path / 'llm_cache.db'))
+    for name in ('openai', 'groq'):
+        integration.providers[name].update({'enabled': True, 'api_key': 'k'})
+    integration.active_provider = 'openai'
+    integration.fallback_providers = ['groq']
+    integration.hedge_delay = 0.05
+    return integration
+
+
+class FakeResponse:
+    """Resposta SSE lenta (5 s), no formato das APIs compatíveis com OpenAI"""
+
+    status_code = 200
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.closed.set()
+
+    def iter_lines(self):
+        for _ in range(250):
+            yield b'data: ' + json.dumps({'choices': [{'delta': {'content': 'lento '}}]}).encode()
+            yield b''
+            time.sleep(0.02)
+
+
+def record_calls(ai, monkeypatch):
+    """Resultado de cada _timed_chat por provedor, gravado quando a thread termina"""
+    results = {}
+    original = ai._timed_chat
+
+    def timed(provider_name, *args):
+        result = original(provider_name, *args)
+        results[provider_name] = result
+        return result
+
+    monkeypatch.setattr(ai, '_timed_chat', timed)
+    return results
+
+
+def chunks(*texts):
+    yield from texts
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_loser_closes_its_response_and_is_not_recorded(ai, monkeypatch):
+    slow = FakeResponse()
+    real_stream = ai._stream_with_provider
+
+    def stream(provider_name, message, system, provider):
+        if provider_name == 'openai':
+            monkeypatch.setattr(http_pool, 'post', lambda *args, **kwargs: slow)
+            return real_stream(provider_name, message, system, provider)
+        return chunks('rápido')
+
+    monkeypatch.setattr(ai, '_stream_with_provider', stream)
+    results = record_calls(ai, monkeypatch)
+
+    result = ai.chat('pergunta', hedge=True)
+
+    assert result['success'] and result['response'] == 'rápido'
+    assert result['hedge'] == {'launched': ['openai', 'groq'], 'winner': 'groq'}
+    assert slow.closed.wait(2)
+    assert wait_for(lambda: 'openai' in results)
+    assert results['openai'].get('cancelled')
+
+    system = ai._system_prompt(None, None)
+    assert ai.cache.get(ai._cache_key('openai', 'pergunta', system)) is None
+    assert ai.cache.get(ai._cache_key('groq', 'pergunta', system))['response'] == 'rápido'
+    assert 'openai' not in ai.latencies
+    assert len(ai.latencies['groq']) == 1
+
+
+def test_cancelled_before_start_makes_no_request(ai, monkeypatch):
+    def stream(*args):
+        raise AssertionError('não deveria chamar o provedor')
+
+    monkeypatch.setattr(ai, '_stream_with_provider', stream)
+    cancel = threading.Event()
+    cancel.set()
+
+    result = ai._timed_chat('openai', 'pergunta', 'system', cancel=cancel)
+
+    assert result['cancelled'] and not result['success']
+    assert ai.cache.stats()['entries'] == 0
+
+
+def test_failed_stream_hands_over_to_the_next_provider(ai, monkeypatch):
+    def stream(provider_name, *args):
+        if provider_name == 'openai':
+            raise RuntimeError('OpenAI error: 500')
+        return chunks('', 'resposta')
+
+    monkeypatch.setattr(ai, '_stream_with_provider', stream)
+
+    result = ai.chat('pergunta', hedge=True)
+
+    assert result['provider'] == 'groq'
+    assert result['response'] == 'resposta'
@@ -0,0 +1,79 @@
+"""Testes do AnchorIndex: resolução de [[Nota#Seção]] e [[Nota#^id]] e expansão de embeds"""
+
+import pytest
+
+from conftest import write_notes
+from obsidian_advanced import ObsidianAdvanced
+
+NOTES = {
+    'Projetos/Alfa.md': (
+        '---\nstatus: ativo\n---\n'
+        '# Alfa\nResumo\n\n'
+        '## Fase 1: início\nPreparar ambiente\n\n'
+        '## Escopo\nItem importante ^item\n\n'
+        '### Detalhes\nSubseção\n'
+    ),
+    'Arquivo/Antigo/Alfa.md': 'Nota homônima mais funda',
+    'Diário.md': 'Hoje:\n![[Alfa#Escopo]]\nE o bloco: ![[Alfa#^item]]\nAnexo: ![[foto.png]]',
+    'Ciclo.md': 'Eu mesmo: ![[Ciclo]]',
+}
+
+
+@pytest.fixture
+def advanced(vault):
+    write_notes(vault, NOTES)
+    return ObsidianAdvanced(str(vault))
+
+
+def test_resolve_heading_block_and_note(advanced):
+    section = advanced.read_fragment('[[Alfa#Escopo]]')
+    assert (section['path'], section['kind'], section['level']) == ('Projetos/Alfa.md', 'heading', 2)
+    assert section['content'] == '## Escopo\nItem importante ^item\n\n### Detalhes\nSubseção'
+
+    assert advanced.read_fragment('[[Alfa#Fase 1 início]]')['heading'] == 'Fase 1: início'
+    assert advanced.read_fragment('![[Alfa#^item]]')['content'] == 'Item importante'
+
+    note = advanced.read_fragment('[[Projetos/Alfa]]')
+    assert note['kind'] == 'note'
+    assert note['content'].startswith('# Alfa')
+    assert advanced.read_fragment('[[Antigo/Alfa]]')['content'] == 'Nota homônima mais funda'
+
+    assert advanced.read_fragment('[[Alfa#Inexistente]]') is None
+    assert advanced.read_fragment('[[Beta]]') is None
+
+
+def test_fragment_after_edit_is_reindexed(advanced, vault):
+    advanced.read_fragment('[[Alfa#Escopo]]')
+    write_notes(vault, {'Projetos/Alfa.md': '# Escopo\nNovo texto maior que o anterior'})
+
+    assert advanced.read_fragment('[[Alfa#Escopo]]')['content'] == '# Escopo\nNovo texto maior que o anterior'
+
+
+def test_render_embeds(advanced):
+    rendered = advanced.render_embeds('Hoje:\n![[Alfa#^item]]\n![[foto.png]]')
+
+    assert rendered == 'Hoje:\nItem importante\n![[foto.png]]'
+    # Embeds recursivos param na profundidade máxima
+    assert advanced.render_embeds('![[Ciclo]]', max_depth=2) == 'Eu mesmo: Eu mesmo: ![[Ciclo]]'
+
+
+def test_render_endpoint(client, vault):
+    write_notes(vault, NOTES)
+
+    data = client.post('/obsidian/advanced/render', json={'path': 'Diário.md'}).get_json()
+    assert data['success']
+    assert 'Item importante' in data['content'] and '![[foto.png]]' in data['content']
+
+    assert client.post('/obsidian/advanced/render', json={'path': 'Nada.md'}).status_code == 404
+    assert client.post('/obsidian/advanced/render', json={'content': 'x', 'max_depth': 'fundo'}).status_code == 400
+
+
+@pytest.mark.parametrize('path', ['../segredo.md', '../../etc/passwd', '/etc/passwd', 'Projetos/../../segredo.md'])
+def test_render_rejects_paths_outside_vault(client, vault, path):
+    (vault.parent / 'segredo.md').write_text('segredo', encoding='utf-8')
+
+    response = client.post('/obsidian/advanced/render', json={'path': path})
+
+    assert response.status_code == 400
+    assert 'segredo' not in response.get_data(as_text=True).replace('segredo.md', '')
+
@@ -0,0 +1,96 @@
+"""Testes do CompletionIndex: autocompletar de títulos, aliases e tags por prefixo"""
+
+import os
+
+import pytest
+
+from completion_index import note_aliases, word_suffixes
+from conftest import write_notes
+
+
+def test_note_aliases():
+    assert note_aliases({'aliases': ['A', '"B"']}) == ['A', 'B']
+    assert note_aliases({'alias': 'Um, Dois'}) == ['Um', 'Dois']
+    assert note_aliases({}) == []
+
+
+def test_word_suffixes():
+    assert word_suffixes('ata reuniao semanal') == ['ata reuniao semanal', 'reuniao semanal', 'semanal']
+
+
+@pytest.fixture
+def completions(vault, make_index):
+    write_notes(vault, {
+        'Trabalho/Reunião semanal.md': '#reuniao #projeto/alfa',
+        'Atas/Ata 2025-01-10.md': '---\naliases: [Reunião de janeiro]\n---\n#reuniao',
+        'Reunião.md': '#reunioes-antigas',
+        'Outra.md': 'sem relação',
+    })
+    # Ordem de modificação: Ata (mais antiga), Reunião semanal, Reunião (mais recente)
+    for age, path in enumerate(['Reunião.md', 'Trabalho/Reunião semanal.md', 'Atas/Ata 2025-01-10.md']):
+        os.utime(vault / path, (1_700_000_000 - age, 1_700_000_000 - age))
+    index = make_index(vault)
+    return lambda prefix, **kwargs: index.indexers['completions'].complete(prefix, recency=index.files, **kwargs)
+
+
+def test_notes_by_title_alias_and_word(completions):
+    notes = completions('reun')['notes']
+
+    assert [(n['path'], n['kind']) for n in notes] == [
+        ('Reunião.md', 'title'), ('Trabalho/Reunião semanal.md', 'title'), ('Atas/Ata 2025-01-10.md', 'alias')
+    ]
+    assert notes[2]['match'] == 'Reunião de janeiro'
+    assert [n['path'] for n in completions('semanal')['notes']] == ['Trabalho/Reunião semanal.md']
+
+
+def test_exact_match_comes_first(completions):
+    assert completions('reuniao semanal')['notes'][0]['path'] == 'Trabalho/Reunião semanal.md'
+
+
+def test_tags_by_count(completions):
+    assert completions('reun', kinds=['tags']) == {'tags': [
+        {'tag': 'reuniao', 'count': 2}, {'tag': 'reunioes-antigas', 'count': 1}
+    ]}
+    assert completions('proj', kinds=['tags'])['tags'] == [{'tag': 'projeto', 'count': 1}, {'tag': 'projeto/alfa', 'count': 1}]
+
+
+def test_limit(completions):
+    assert len(completions('reun', limit=1)['notes']) == 1
+
+
+def test_autocomplete_endpoint(client, vault):
+    write_notes(vault, {'Reunião.md': '#reuniao'})
+
+    data = client.get('/obsidian/autocomplete?prefix=REUNI').get_json()
+    assert data['notes'][0]['path'] == 'Reunião.md'
+    assert data['tags'] == [{'tag': 'reuniao', 'count': 1}]
+    assert client.get('/obsidian/autocomplete?prefix=r&types=outros').status_code == 400
+
+
+def test_bulk_load_sorts_once_and_matches_incremental_updates(monkeypatch):
+    import completion_index
+    from completion_index import CompletionIndex
+
+    notes = [(i, f'Pasta/Nota {i}.md', {'frontmatter': {'aliases': [f'Apelido {i}']}, 'tags': [f'tag{i % 3}/sub']})
+             for i in range(30)]
+    incremental = CompletionIndex()
+    for doc_id, rel_path, note in notes:
+        incremental.add(doc_id, rel_path, note)
+
+    def no_insort(*args):
+        raise AssertionError('insort durante a carga em lote')
+
+    bulk = CompletionIndex()
+    monkeypatch.setattr(completion_index, 'insort', no_insort)
+    bulk.begin_bulk()
+    for doc_id, rel_path, note in notes:
+        bulk.add(doc_id, rel_path, note)
+    # Consultas e reindexações no meio do lote continuam corretas
+    assert [n['path'] for n in bulk.complete('nota 1', limit=2)['notes']] == ['Pasta/Nota 1.md', 'Pasta/Nota 19.md']
+    bulk.add(*notes[0])
+    bulk.remove(29, notes[29][1])
+    bulk.add(*notes[29])
+    bulk.end_bulk()
+
+    assert bulk.entries == incremental.entries
+    assert bulk.tag_counts == incremental.tag_counts
@@ -0,0 +1,97 @@
+"""Testes do DateIndex: datas do nome e do frontmatter, períodos e nota do dia"""
+
+from datetime import date
+
+import pytest
+
+from conftest import write_notes
+from date_index import DateIndex, parse_date, period_range
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2025-01-31', '2025-01-31'),
+    ('Reunião 31-01-2025', '2025-01-31'),
+    ('31/01/2025', '2025-01-31'),
+    ('20250131 diário', '2025-01-31'),
+    ('2025-02-30 e depois 2025-03-01', '2025-03-01'),
+    ('versão 123456789', None),
+    ('sem data', None),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+def test_period_range():
+    wednesday = date(2025, 1, 15)
+    assert period_range('today', wednesday) == ('2025-01-15', '2025-01-15')
+    assert period_range('week', wednesday) == ('2025-01-13', '2025-01-19')
+    assert period_range('last_week', wednesday) == ('2025-01-06', '2025-01-12')
+    assert period_range('month', wednesday) == ('2025-01-01', '2025-01-31')
+    assert period_range('last_month', wednesday) == ('2024-12-01', '2024-12-31')
+    with pytest.raises(ValueError):
+        period_range('decade', wednesday)
+
+
+def test_sync_between_and_latest():
+    dates = DateIndex()
+    dates.sync(['Diário/2025-01-10.md', 'PROJETOS/2025-01-05 plano.md', 'Diário/20250112.md', 'Sem data.md'])
+
+    assert [e['path'] for e in dates.between('2025-01-06', '2025-01-12')] == ['Diário/2025-01-10.md', 'Diário/20250112.md']
+    assert dates.on('2025-01-05')[0]['source'] == 'name'
+    assert dates.latest()['path'] == 'Diário/20250112.md'
+    assert dates.latest(before='2025-01-11', prefix='PROJETOS/')['path'] == 'PROJETOS/2025-01-05 plano.md'
+
+    assert dates.sync(['Diário/2025-01-10.md']) == (0, 2)
+    assert len(dates.between()) == 1
+
+
+def test_frontmatter_date_and_rename(vault, make_index):
+    write_notes(vault, {
+        'Ata.md': '---\ndate: 2025-02-01\n---\ntexto',
+        '2025-02-02.md': '---\ndate: 2025-02-02\n---\nmesma data',
+    })
+    index = make_index(vault)
+    dates = index.indexers['dates']
+
+    assert dates.between('2025-02-01', '2025-02-28') == [
+        {'date': '2025-02-01', 'path': 'Ata.md', 'source': 'frontmatter'},
+        {'date': '2025-02-02', 'path': '2025-02-02.md', 'source': 'name'},
+    ]
+
+    (vault / 'Ata.md').rename(vault / 'Ata renomeada.md')
+    index.rename_file('Ata.md', 'Ata renomeada.md')
+    assert dates.on('2025-02-01') == [{'date': '2025-02-01', 'path': 'Ata renomeada.md', 'source': 'frontmatter'}]
+
+
+def test_dates_endpoint(client, vault):
+    write_notes(vault, {'Diário/2025-01-07.md': 'x', 'Diário/2025-01-20.md': 'y'})
+
+    data = client.get('/obsidian/advanced/dates?start=2025-01-01&end=2025-01-10').get_json()
+    assert [note['path'] for note in data['notes']] == ['Diário/2025-01-07.md']
+
+    assert client.get('/obsidian/advanced/dates?period=decade').status_code == 400
+
+
+class NoPlugins:
+    def get_command_for_action(self, text):
+        return None
+
+
+@pytest.mark.parametrize('text, command', [
+    ('notas da semana passada', 'notes_period'),
+    ('listar notas do mês', 'notes_period'),
+    ('notas de ontem', 'notes_period'),
+    ('criar nota reuniao da semana', 'create_note'),
+    ('nova nota sobre o mesmo tema', 'create_note'),
+    ('buscar nota do mestrado', 'search_notes'),
+    ('listar notas', 'list_notes'),
+])
+def test_period_commands_do_not_steal_other_commands(text, command):
+    from intelligent_agent import IntelligentAgent
+
+    assistant = IntelligentAgent.__new__(IntelligentAgent)
+    assistant.command_patterns = assistant._build_command_patterns()
+    assistant.plugin_manager = NoPlugins()
+    assistant.commands_processed = 0
+
+    assert assistant.process_command(text)['command'] == command
@@ -0,0 +1,177 @@
+"""Testes da execução assíncrona do motor: novas tentativas no aiohttp e cache fora do laço"""
+
+import asyncio
+import threading
+import types
+
+import pytest
+
+from execution_engine import AIProvider, ExecutionEngine, ExecutionTask, TaskCategory
+from llm_cache import LLMCache, cache_key
+
+aiohttp = pytest.importorskip('aiohttp')
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+    async def json(self, content_type=None):
+        return self.payload
+
+
+class FakeSession:
+    """Devolve (ou levanta) os resultados na ordem, um por requisição"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(ExecutionEngine, '_load_api_configs', lambda self: {'api_keys': {'openai': 'k'}})
+    instance = ExecutionEngine()
+    instance.cache = LLMCache(str(tmp_path / 'engine_cache.db'))
+    instance.http_backoff = 0
+    return instance
+
+
+def post(engine, session):
+    engine._http_session = lambda: session
+    return asyncio.run(engine._post_async('http://ia.local/chat', {}, {}, 5))
+
+
+def test_overload_response_is_retried(engine):
+    session = FakeSession(FakeResponse(503, headers={'Retry-After': '0'}), FakeResponse(200, {'ok': True}))
+
+    assert post(engine, session) == {'ok': True}
+    assert session.calls == 2
+
+
+def test_connect_error_is_retried(engine):
+    refused = aiohttp.ClientConnectorError(types.SimpleNamespace(host='ia.local', port=80, ssl=None),
+                                           OSError(111, 'Connection refused'))
+    session = FakeSession(refused, FakeResponse(200, {'ok': True}))
+
+    assert post(engine, session) == {'ok': True}
+    assert session.calls == 2
+
+
+@pytest.mark.parametrize('outcome', [
+    FakeResponse(502), FakeResponse(504), aiohttp.ServerDisconnectedError()
+])
+def test_post_that_may_have_been_processed_is_not_retried(engine, outcome):
+    # O provedor pode já ter gerado (e cobrado) a resposta
+    session = FakeSession(outcome, FakeResponse(200, {'ok': True}))
+
+    with pytest.raises(aiohttp.ClientError):
+        post(engine, session)
+    assert session.calls == 1
+
+
+def test_timeout_is_not_retried(engine):
+    session = FakeSession(aiohttp.ServerTimeoutError(), FakeResponse(200, {'ok': True}))
+
+    with pytest.raises(asyncio.TimeoutError):
+        post(engine, session)
+    assert session.calls == 1
+
+
+def test_retries_are_limited(engine):
+    session = FakeSession(*[FakeResponse(429) for _ in range(engine.http_retries + 1)])
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        post(engine, session)
+    assert session.calls == engine.http_retries + 1
+
+
+def test_client_error_is_not_retried(engine):
+    session = FakeSession(FakeResponse(401), FakeResponse(200, {'ok': True}))
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        post(engine, session)
+    assert session.calls == 1
+
+
+def test_retry_delay(engine):
+    engine.http_backoff = 0.5
+
+    assert engine._retry_delay(0) == 0.5
+    assert engine._retry_delay(2) == 2.0
+    assert engine._retry_delay(0, '7') == 7.0
+    assert engine._retry_delay(1, 'Wed, 21 Oct 2015 07:28:00 GMT') == 1.0
+
+
+def test_cache_is_used_off_the_event_loop(engine, monkeypatch):
+    threads = []
+    for name in ('get', 'put', 'contains'):
+        original = getattr(engine.cache, name)
+
+        def recorded(*args, _original=original):
+            threads.append(threading.current_thread())
+            return _original(*args)
+
+        monkeypatch.setattr(engine.cache, name, recorded)
+
+    async def request(provider, task):
+        return 'resposta'
+
+    monkeypatch.setattr(engine, '_request_provider_async', request)
+
+    def run():
+        task = ExecutionTask(id='t', category=TaskCategory.CONVERSATION, prompt='oi',
+                             preferred_provider=AIProvider.OPENAI)
+        return asyncio.run(engine._execute_async(task))
+
+    assert run().result == 'resposta'
+    second = run()
+    assert second.cached and second.result == 'resposta'
+    assert threads and threading.main_thread() not in threads
+
+
+def test_cache_key_uses_the_request_system_prompt_and_temperature(engine, monkeypatch):
+    task = ExecutionTask(id='t', category=TaskCategory.CONVERSATION, prompt='oi')
+    model = engine.MODELS[AIProvider.OPENAI]
+    default = engine._cache_key(AIProvider.OPENAI, task)
+    assert default == cache_key('openai', model, 'Você é um assistente inteligente.', 'oi', None)
+
+    original = engine._openai_request
+
+    def request(task, system='Outro sistema', temperature=None):
+        url, headers, body, parse = original(task)
+        body['messages'][0]['content'] = system
+        if temperature is not None:
+            body['temperature'] = temperature
+        return url, headers, body, parse
+
+    monkeypatch.setattr(engine, '_openai_request', request)
+    assert engine._cache_key(AIProvider.OPENAI, task) == cache_key('openai', model, 'Outro sistema', 'oi', None)
+
+    monkeypatch.setattr(engine, '_openai_request', lambda task: request(task, temperature=0.2))
+    assert engine._cache_key(AIProvider.OPENAI, task) == cache_key('openai', model, 'Outro sistema', 'oi', 0.2)
+
+
+def test_unconfigured_provider_has_no_cache_key(engine):
+    task = ExecutionTask(id='t', category=TaskCategory.CONVERSATION, prompt='oi')
+
+    assert engine._cache_key(AIProvider.CLAUDE, task) is None
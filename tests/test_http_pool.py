@@ -0,0 +1,111 @@
+"""Testes da sessão HTTP compartilhada (pool por host e novas tentativas) do agente e do Hub"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_pool
+from conftest import ROOT
+
+
+def adapter_of(session):
+    return session.get_adapter('https://api.example.com')
+
+
+def test_pool_settings_keeps_known_keys():
+    config = {'pool_maxsize': '32', 'backoff_factor': 1, 'retries': None, 'timeout': 5}
+
+    assert http_pool.pool_settings(config) == {'pool_maxsize': 32, 'backoff_factor': 1.0}
+    assert http_pool.pool_settings(None) == {}
+
+
+def test_create_session_pool_and_retry_policy():
+    session = http_pool.create_session(pool_connections=4, pool_maxsize=8, retries=3)
+    adapter = adapter_of(session)
+
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 8
+    assert adapter.max_retries.total == 3
+    assert adapter.max_retries.read == 0
+    assert set(adapter.max_retries.status_forcelist) == {429, 502, 503, 504}
+    assert session.get_adapter('http://localhost:11434') is adapter
+
+
+def test_configure_http_pool_replaces_the_global_session():
+    previous = http_pool.get_session()
+    http_pool.configure_http_pool(**http_pool.pool_settings({'pool_maxsize': 3, 'retries': 0}))
+    try:
+        session = http_pool.get_session()
+        assert session is not previous
+        assert adapter_of(session)._pool_maxsize == 3
+        assert adapter_of(session).max_retries.total == 0
+    finally:
+        http_pool.configure_http_pool()
+
+
+def test_engine_session_reads_the_http_pool_section(monkeypatch):
+    from execution_engine import ExecutionEngine
+
+    monkeypatch.setattr(ExecutionEngine, '_load_api_configs',
+                        lambda self: {'api_keys': {}, 'http_pool': {'pool_maxsize': 5}})
+    engine = ExecutionEngine()
+
+    adapter = adapter_of(engine.session)
+    assert adapter._pool_maxsize == 5
+    assert adapter._pool_connections == ExecutionEngine.HTTP_POOL_CONNECTIONS
+    assert adapter.max_retries.total == ExecutionEngine.HTTP_RETRIES
+
+
+@pytest.fixture
+def flaky_server():
+    """Servidor local que responde cada status da fila uma vez e depois 200"""
+    state = {'statuses': [], 'calls': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def respond(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self.rfile.read(length)
+            state['calls'] += 1
+            status = state['statuses'].pop(0) if state['statuses'] else 200
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            if status in (429, 503):
+                self.send_header('Retry-After', '0')
+            self.end_headers()
+
+        do_GET = do_POST = respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state['url'] = f'http://127.0.0.1:{server.server_address[1]}/'
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('method, status, calls', [
+    ('POST', 429, 2),
+    ('POST', 503, 2),
+    ('POST', 502, 1),
+    ('POST', 504, 1),
+    ('GET', 502, 2),
+    ('GET', 504, 2),
+])
+def test_retry_policy_by_method(flaky_server, method, status, calls):
+    session = http_pool.create_session(backoff_factor=0)
+    flaky_server['statuses'] = [status]
+
+    response = session.request(method, flaky_server['url'], json={'prompt': 'oi'}, timeout=5)
+
+    assert flaky_server['calls'] == calls
+    assert response.status_code == (200 if calls == 2 else status)
+
+
+def test_hub_copies_match_the_agent_modules():
+    # O Hub é implantado sem a pasta do agente: leva cópias idênticas destes módulos
+    for name in ('http_pool.py', 'llm_cache.py'):
+        assert (ROOT / 'hub_central' / name).read_bytes() == (ROOT / 'agent' / name).read_bytes()
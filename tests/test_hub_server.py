@@ -0,0 +1,70 @@
+"""Testes do endpoint /ai/ask do Hub: validação dos prompts e formato da resposta"""
+
+import pytest
+
+import hub_server
+
+
+@pytest.fixture
+def hub_client(monkeypatch):
+    def execute_parallel(tasks, timeout=None):
+        for task in tasks:
+            task.success = True
+            task.result = f'resposta: {task.prompt}'
+        return tasks
+
+    monkeypatch.setattr(hub_server.engine, 'execute_parallel', execute_parallel)
+    return hub_server.app.test_client()
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'prompt': ''},
+    {'prompts': 'texto solto'},
+    {'prompts': ['ok', 3]},
+    {'prompts': ['ok', '  ']},
+    {'prompt': {'texto': 'x'}},
+    ['prompt'],
+])
+def test_invalid_prompts_are_rejected(hub_client, body):
+    response = hub_client.post('/ai/ask', json=body)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_single_prompt(hub_client):
+    response = hub_client.post('/ai/ask', json={'prompt': 'oi'})
+
+    assert response.status_code == 200
+    assert response.get_json()['result'] == 'resposta: oi'
+
+
+def test_prompt_list(hub_client):
+    response = hub_client.post('/ai/ask', json={'prompts': ['a', 'b']})
+
+    data = response.get_json()
+    assert data['success']
+    assert [r['result'] for r in data['results']] == ['resposta: a', 'resposta: b']
+
+
+def test_invalid_provider(hub_client):
+    assert hub_client.post('/ai/ask', json={'prompt': 'oi', 'provider': 'nenhum'}).status_code == 400
+
+
+def test_server_registers_only_the_new_note_trigger():
+    from hub_central import HubCentral
+    from triggers_system import BuiltInTriggers
+
+    hub = HubCentral()
+    BuiltInTriggers(hub, hub_server.BUILTIN_TRIGGERS)
+
+    assert [trigger.name for trigger in hub.triggers.values()] == ['new_note_handler']
+
+
+def test_unknown_builtin_trigger_is_rejected():
+    from hub_central import HubCentral
+    from triggers_system import BuiltInTriggers
+
+    with pytest.raises(ValueError):
+        BuiltInTriggers(HubCentral(), ['inexistente'])
@@ -0,0 +1,66 @@
+"""Testes do LinkIndex: backlinks, relatório e deltas versionados do grafo"""
+
+from conftest import write_notes
+
+
+def test_backlinks_and_report(vault, make_index):
+    write_notes(vault, {
+        'Alpha.md': 'Veja [[Beta]] e [[Beta#Intro|a introdução]]',
+        'Beta.md': '# Intro\nTexto',
+        'Gamma.md': 'Link para [[Inexistente]]'
+    })
+    links = make_index(vault).indexers['links']
+
+    backlinks = links.backlinks('Beta')
+    assert [(b['path'], b['count'], b['headings']) for b in backlinks] == [('Alpha.md', 2, ['Intro'])]
+    assert links.unresolved_links()['items'][0]['target'] == 'Inexistente'
+    assert [n['path'] for n in links.orphan_notes()['items']] == ['Alpha.md', 'Gamma.md']
+
+
+def test_delta_since_version(vault, make_index):
+    write_notes(vault, {'Alpha.md': 'sem links'})
+    index = make_index(vault)
+    links = index.indexers['links']
+    since = links.version
+
+    write_notes(vault, {'Alpha.md': 'agora com [[Beta]]', 'Beta.md': 'alvo'})
+    index.update_file('Alpha.md')
+    index.update_file('Beta.md')
+
+    delta = links.delta(since)
+    assert not delta['full']
+    assert delta['version'] == links.version
+    edges = [edge for change in delta['changes'] for edge in change['edges_added']]
+    assert any(edge == {'from': 'Alpha', 'to': 'Beta'} for edge in edges)
+    nodes = [node['path'] for change in delta['changes'] for node in change['nodes_added']]
+    assert 'Beta.md' in nodes
+
+    assert links.delta(links.version) == {'full': False, 'version': links.version, 'changes': []}
+
+
+def test_delta_after_rebuild_returns_full_graph(vault, make_index):
+    write_notes(vault, {f'Nota {i}.md': f'[[Nota {i + 1}]]' for i in range(5)})
+    index = make_index(vault)
+    links = index.indexers['links']
+    before = links.version
+
+    # Reconstrução com menos mudanças que as vistas pelo cliente
+    index.reset()
+    write_notes(vault, {'Nota 0.md': 'sem links'})
+    index.refresh(force=True)
+
+    assert links.version > before
+    for since in (before, before - 1, 0):
+        delta = links.delta(since)
+        assert delta['full'], since
+        assert len(delta['nodes']) == 5
+
+
+def test_delta_with_unknown_future_version(vault, make_index):
+    write_notes(vault, {'Alpha.md': '[[Beta]]'})
+    links = make_index(vault).indexers['links']
+
+    delta = links.delta(links.version + 10)
+
+    assert delta['full']
+    assert delta['version'] == links.version
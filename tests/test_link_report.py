@@ -0,0 +1,78 @@
+"""Testes do relatório incremental de links não resolvidos e notas órfãs"""
+
+import pytest
+
+from conftest import write_notes
+
+
+@pytest.fixture
+def index(vault, make_index):
+    write_notes(vault, {
+        'Alfa.md': '[[Beta]] [[Fantasma]] [[Fantasma|de novo]] ![[foto.png]]',
+        'Beta.md': '[[Alfa]] [[Outro fantasma]]',
+        'Solta.md': 'ninguém me linka',
+        'Pasta/Gama.md': '[[Fantasma]] [[Gama]]',
+    })
+    return make_index(vault)
+
+
+def report(index):
+    links = index.indexers['links']
+    unresolved = links.unresolved_links()
+    return (
+        [(item['target'], item['count'], item['sources']) for item in unresolved['items']],
+        [item['path'] for item in links.orphan_notes()['items']],
+        links.report_counts()
+    )
+
+
+def test_initial_report(index):
+    unresolved, orphans, counts = report(index)
+
+    assert unresolved == [('Fantasma', 3, ['Alfa.md', 'Pasta/Gama.md']), ('Outro fantasma', 1, ['Beta.md'])]
+    # Autolinks não tiram a nota da lista de órfãs; anexos não contam como links não resolvidos
+    assert orphans == ['Pasta/Gama.md', 'Solta.md']
+    assert counts == {'notes': 4, 'unresolved': 2, 'unresolved_links': 4, 'orphans': 2}
+
+
+def test_report_follows_changes(vault, index):
+    write_notes(vault, {'Fantasma.md': 'agora existo', 'Beta.md': '[[Solta]]'})
+    index.update_file('Fantasma.md')
+    index.update_file('Beta.md')
+
+    unresolved, orphans, counts = report(index)
+    assert unresolved == []
+    # Beta deixou de linkar Alfa e passou a linkar Solta
+    assert orphans == ['Alfa.md', 'Pasta/Gama.md']
+
+    index.remove_file('Fantasma.md')
+    unresolved, orphans, _ = report(index)
+    assert unresolved == [('Fantasma', 3, ['Alfa.md', 'Pasta/Gama.md'])]
+
+    index.rename_file('Solta.md', 'Renomeada.md')
+    (vault / 'Solta.md').rename(vault / 'Renomeada.md')
+    unresolved, orphans, _ = report(index)
+    assert ('Solta', 1, ['Beta.md']) in unresolved
+    assert 'Renomeada.md' in orphans
+
+
+def test_report_paging(index):
+    links = index.indexers['links']
+
+    page = links.unresolved_links(limit=1, offset=1)
+    assert page['total'] == 2
+    assert [item['target'] for item in page['items']] == ['Outro fantasma']
+    assert [item['path'] for item in links.orphan_notes(limit=1)['items']] == ['Pasta/Gama.md']
+
+
+def test_report_endpoint(client, vault):
+    write_notes(vault, {'A.md': '[[Nada]]'})
+
+    data = client.get('/obsidian/advanced/links/report').get_json()
+    assert data['counts']['unresolved'] == 1
+    assert data['orphans']['items'] == [{'name': 'A', 'path': 'A.md'}]
+    assert client.get('/obsidian/advanced/links/report?kind=x').status_code == 400
+    assert client.get('/obsidian/advanced/links/report?limit=muitos').status_code == 400
+    assert client.get('/obsidian/advanced/links/report?offset=-1').get_json()['orphans']['items'] == [
+        {'name': 'A', 'path': 'A.md'}
+    ]
@@ -0,0 +1,155 @@
+"""Testes do cache de respostas da IA (TTL, despejo LRU, estatísticas) e do use_cache=False"""
+
+import pytest
+
+from ai_integration import AIIntegration
+from llm_cache import LLMCache, cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(str(tmp_path / 'llm_cache.db'), ttl=60)
+
+
+def age(cache, seconds):
+    """Envelhece todas as entradas"""
+    cache.db.execute('UPDATE responses SET created = created - ?', (seconds,))
+    cache.db.commit()
+
+
+def test_cache_key_depends_on_every_parameter():
+    base = cache_key('openai', 'gpt', 'sys', 'oi', 0.7)
+
+    assert base == cache_key('openai', 'gpt', 'sys', 'oi', 0.7)
+    assert base != cache_key('openai', 'gpt', 'sys', 'oi', 0.2)
+    assert base != cache_key('groq', 'gpt', 'sys', 'oi', 0.7)
+    assert cache_key('openai', 'gpt', None, 'oi', None) == cache_key('openai', 'gpt', '', 'oi', None)
+
+
+def test_ttl_expires_entries(cache):
+    cache.put('k', {'response': 'r'}, 100)
+    assert cache.contains('k')
+    assert cache.get('k') == {'response': 'r'}
+
+    age(cache, 61)
+
+    assert not cache.contains('k')
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_ttl_zero_never_expires(tmp_path):
+    cache = LLMCache(str(tmp_path / 'c.db'), ttl=0)
+    cache.put('k', {'response': 'r'}, 1)
+    age(cache, 10 ** 6)
+
+    assert cache.get('k') is not None
+
+
+def test_lru_eviction_by_entries(cache):
+    cache.configure(max_entries=2)
+    cache.put('a', {'response': 'a'}, 1)
+    cache.put('b', {'response': 'b'}, 1)
+    cache.db.execute("UPDATE responses SET last_used = last_used - 10 WHERE key = 'b'")
+    cache.get('a')
+    cache.put('c', {'response': 'c'}, 1)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_lru_eviction_by_bytes_and_oversized_values(cache):
+    cache.configure(max_bytes=1000)
+    cache.put('grande', {'response': 'x' * 400}, 1)
+    assert cache.stats()['entries'] == 0
+
+    for key in 'abcde':
+        cache.put(key, {'response': 'x' * 200}, 1)
+
+    stats = cache.stats()
+    assert stats['bytes'] <= 1000
+    assert stats['entries'] < 5
+    assert cache.contains('e')
+
+
+def test_expired_entries_are_evicted_first(cache):
+    cache.configure(max_entries=2)
+    cache.put('velha', {'response': 'v'}, 1)
+    age(cache, 61)
+    cache.put('a', {'response': 'a'}, 1)
+    cache.put('b', {'response': 'b'}, 1)
+
+    assert cache.contains('a') and cache.contains('b')
+
+
+def test_stats_count_hits_and_saved_latency(cache):
+    cache.put('k', {'response': 'r'}, 250)
+    cache.get('k')
+    cache.get('k')
+    cache.get('outra')
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['hit_ratio'] == 0.667
+    assert stats['saved_ms'] == 500
+
+
+@pytest.fixture
+def ai(tmp_path, monkeypatch):
+    integration = AIIntegration()
+    integration.config_path = str(tmp_path / 'ai_config.json')
+    integration.cache = LLMCache(str(tmp_path / 'ai_cache.db'))
+    integration.providers['openai'].update({'enabled': True, 'api_key': 'k'})
+    integration.active_provider = 'openai'
+    calls = []
+
+    def chat(provider_name, message, system, provider):
+        calls.append(message)
+        return {'success': True, 'response': f'resposta {len(calls)}', 'provider': provider_name}
+
+    monkeypatch.setattr(integration, '_chat_with_provider', chat)
+    integration.calls = calls
+    return integration
+
+
+def test_chat_uses_the_cache(ai):
+    assert ai.chat('oi')['response'] == 'resposta 1'
+    second = ai.chat('oi')
+
+    assert second['cached'] and second['response'] == 'resposta 1'
+    assert len(ai.calls) == 1
+
+
+def test_chat_without_cache_neither_reads_nor_writes(ai):
+    ai.chat('oi')
+    fresh = ai.chat('oi', use_cache=False)
+    assert fresh['response'] == 'resposta 2' and not fresh.get('cached')
+
+    ai.chat('nova', use_cache=False)
+    assert ai.cache.stats()['entries'] == 1
+    assert ai.chat('oi')['response'] == 'resposta 1'
+
+
+def test_engine_honours_use_cache(tmp_path, monkeypatch):
+    from execution_engine import AIProvider, ExecutionEngine, ExecutionTask, TaskCategory
+
+    engine = ExecutionEngine()
+    engine.api_configs = {'api_keys': {'openai': 'k'}}
+    engine.cache = LLMCache(str(tmp_path / 'engine_cache.db'))
+    calls = []
+    monkeypatch.setattr(engine, '_request_provider', lambda provider, task: calls.append(task.prompt) or 'ok')
+
+    def task(use_cache):
+        return ExecutionTask(id='t', category=TaskCategory.CONVERSATION, prompt='oi',
+                             preferred_provider=AIProvider.OPENAI, use_cache=use_cache)
+
+    engine._call_provider(AIProvider.OPENAI, task(False))
+    assert engine.cache.stats()['entries'] == 0
+
+    engine._call_provider(AIProvider.OPENAI, task(True))
+    cached = task(True)
+    engine._call_provider(AIProvider.OPENAI, cached)
+    assert cached.cached
+    engine._call_provider(AIProvider.OPENAI, task(False))
+    assert len(calls) == 3
@@ -0,0 +1,63 @@
+"""Testes do MetadataStore: compilação de consultas Dataview para SQL e execução"""
+
+import pytest
+
+from conftest import write_notes
+from metadata_store import compile_query
+from obsidian_advanced import ObsidianAdvanced
+
+
+def test_limit_is_pushed_into_sql():
+    compiled = compile_query('LIST FROM "Projetos" SORT prioridade DESC LIMIT 5')
+
+    assert compiled.sql.endswith(' LIMIT ?')
+    assert compiled.params[-1] == 5
+
+
+def test_limit_with_tag_source_stays_out_of_sql():
+    compiled = compile_query('LIST FROM #projeto LIMIT 5')
+
+    assert 'LIMIT' not in compiled.sql
+    assert compiled.tag_expression == '#projeto'
+    assert compiled.limit == 5
+
+
+@pytest.mark.parametrize('query', ['LIST LIMIT x', 'LIST WHERE', 'TABLE a FROM #t LIMIT -1'])
+def test_invalid_queries(query):
+    with pytest.raises(ValueError):
+        compile_query(query)
+
+
+@pytest.fixture
+def advanced(vault):
+    notes = {
+        f'Projetos/P{i}.md': f'---\nprioridade: {i}\nstatus: {"done" if i % 2 else "open"}\n---\n'
+                             + ('#projeto' if i < 6 else '')
+        for i in range(10)
+    }
+    notes['Outra.md'] = '---\nprioridade: 99\n---\n#projeto'
+    write_notes(vault, notes)
+    return ObsidianAdvanced(str(vault))
+
+
+def names(result):
+    return [note['name'] for note in result['results']]
+
+
+def test_where_sort_limit(advanced):
+    result = advanced.dataview_query('TABLE prioridade FROM "Projetos" WHERE status = "open" SORT prioridade DESC LIMIT 3')
+
+    assert names(result) == ['P8', 'P6', 'P4']
+    assert [note['fields']['prioridade'] for note in result['results']] == ['8', '6', '4']
+
+
+def test_tag_source_with_limit(advanced):
+    result = advanced.dataview_query('LIST FROM #projeto WHERE prioridade > 2 SORT prioridade DESC LIMIT 2')
+
+    assert names(result) == ['Outra', 'P5']
+
+
+def test_tag_source_without_limit(advanced):
+    result = advanced.dataview_query('LIST FROM #projeto AND -#inexistente SORT prioridade')
+
+    assert names(result) == ['P0', 'P1', 'P2', 'P3', 'P4', 'P5', 'Outra']
@@ -0,0 +1,76 @@
+"""Testes do note_analyzer: análise em uma passada, cache por assinatura e tags derivadas"""
+
+import os
+
+from conftest import write_notes
+from note_analyzer import NoteCache, analyze_content
+
+NOTE = (
+    '---\ntags: [a, b]\ntitle: X\n---\n'
+    '# Título\n'
+    'Texto [[Alvo#Seção|alias]] #tag\n'
+    '- [ ] tarefa #t1 📅 2025-01-01\n'
+    '- [x] feita\n'
+    '\n'
+    'Parágrafo ^bloco'
+)
+
+
+def test_single_pass_analysis():
+    note = analyze_content(NOTE)
+
+    assert note['frontmatter'] == {'tags': ['a', 'b'], 'title': 'X'}
+    assert note['body_start'] == 4
+    assert note['links'] == [{
+        'target': 'Alvo', 'alias': 'alias', 'heading': 'Seção', 'block': None, 'embed': False, 'line': 6
+    }]
+    assert note['tags'] == ['a', 'b', 't1', 'tag']
+    assert [(t['line'], t['done']) for t in note['tasks']] == [(7, False), (8, True)]
+    assert [(h['level'], h['text']) for h in note['headings']] == [(1, 'Título')]
+    block = note['blocks'][0]
+    assert block['id'] == 'bloco'
+    assert NOTE.encode('utf-8')[block['start']:block['end']].decode('utf-8') == 'Parágrafo ^bloco'
+
+
+def test_heading_fragments_are_not_tags():
+    note = analyze_content('Veja [[Note#Heading]] e ![[Alpha#Seção Dois]]\n- [ ] revisar [[Note#Heading]] #ação')
+
+    assert note['tags'] == ['ação']
+
+
+def test_cache_is_keyed_by_signature(tmp_path):
+    path = tmp_path / 'nota.md'
+    path.write_text('#antes', encoding='utf-8')
+    cache = NoteCache(max_entries=1)
+
+    assert cache.analyze_file(path)['tags'] == ['antes']
+    assert cache.analyze_file(path)['tags'] == ['antes']
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+    path.write_text('#depois', encoding='utf-8')
+    st = path.stat()
+    os.utime(path, (st.st_atime, st.st_mtime + 1))
+    assert cache.analyze_file(path)['tags'] == ['depois']
+
+    other = tmp_path / 'outra.md'
+    other.write_text('x', encoding='utf-8')
+    cache.analyze_file(other)
+    assert cache.stats()['entries'] == 1
+
+    path.unlink()
+    assert cache.analyze_file(path) is None
+
+
+def test_autocomplete_and_tasks_ignore_heading_fragments(client, vault):
+    write_notes(vault, {
+        'Note.md': '# Heading\nTexto',
+        'Tarefas.md': '- [ ] ler [[Note#Heading]] #leitura\n- [ ] ver ![[Note#Heading]]'
+    })
+
+    tags = client.get('/obsidian/autocomplete?prefix=h&types=tags').get_json()['tags']
+    assert tags == []
+    tags = client.get('/obsidian/autocomplete?prefix=lei&types=tags').get_json()['tags']
+    assert tags == [{'tag': 'leitura', 'count': 1}]
+
+    tasks = client.get('/obsidian/advanced/tasks').get_json()['tasks']
+    assert [task['tags'] for task in tasks] == [['leitura'], []]
@@ -0,0 +1,88 @@
+"""Testes da busca de notas por nome: TrigramIndex e resolução de nomes no ObsidianAPI"""
+
+import pytest
+
+from conftest import write_notes
+from intelligent_agent import IntelligentAgent, ObsidianAPI
+from trigram_index import TrigramIndex, normalize_name
+
+NOTES = ['Reunião semanal.md', 'Projetos/Plano de Ação.md', 'Projetos/plano.md', 'Arquivo/Plano.md', 'Diário/2025-01-10.md']
+
+
+def test_normalize_name():
+    assert normalize_name('Projetos/Plano_de-Ação.md') == 'projetos plano de acao'
+
+
+def test_trigram_search_is_typo_tolerant():
+    names = TrigramIndex()
+    names.sync(NOTES)
+
+    assert names.search('reuniao semnal')[0]['path'] == 'Reunião semanal.md'
+    assert names.search('xyz') == []
+
+
+def test_contains_and_sync():
+    names = TrigramIndex()
+    names.sync(NOTES)
+
+    assert names.contains('plano') == ['Arquivo/Plano.md', 'Projetos/Plano de Ação.md', 'Projetos/plano.md']
+    assert names.contains('ACAO') == ['Projetos/Plano de Ação.md']
+    assert names.contains('no') == ['Arquivo/Plano.md', 'Projetos/Plano de Ação.md', 'Projetos/plano.md']
+
+    assert names.sync(NOTES[:2]) == (0, 3)
+    assert names.contains('plano') == ['Projetos/Plano de Ação.md']
+
+
+@pytest.fixture
+def api(vault):
+    write_notes(vault, {path: 'x' for path in NOTES})
+    return ObsidianAPI({'paths': {'vault': str(vault)}})
+
+
+def test_search_notes_is_substring_match(api):
+    assert api.search_notes('semanal') == ['Reunião semanal.md']
+    assert api.search_notes('plano') == ['Arquivo/Plano.md', 'Projetos/Plano de Ação.md', 'Projetos/plano.md']
+    assert api.search_notes('plano', limit=1) == ['Arquivo/Plano.md']
+    # Erros de digitação não casam por substring; ficam para suggest_notes
+    assert api.search_notes('semnal') == []
+    assert api.suggest_notes('reuniao semnal')[0] == 'Reunião semanal.md'
+
+
+def test_resolve_note_only_exact_or_case_insensitive(api):
+    assert api.resolve_note('Projetos/plano') == 'Projetos/plano.md'
+    assert api.resolve_note('arquivo/plano.md') == 'Arquivo/Plano.md'
+    assert api.resolve_note('reunião SEMANAL') == 'Reunião semanal.md'
+    # Nome presente em mais de uma pasta: ambíguo
+    assert api.resolve_note('plano') is None
+    # Nome parecido não abre outra nota
+    assert api.resolve_note('reuniao semnal') is None
+    assert api.resolve_note('Plano de Ação 2') is None
+
+
+@pytest.fixture
+def assistant(api, monkeypatch):
+    opened = []
+    monkeypatch.setattr(api, 'open_note', lambda path: opened.append(path) or {'success': True})
+    agent = IntelligentAgent.__new__(IntelligentAgent)
+    agent.obsidian_api = api
+    agent.opened = opened
+    return agent
+
+
+def open_note(agent, name):
+    return agent.generate_response({'command': 'open_note', 'parameters': {'note_name': name}}, None)
+
+
+def test_open_note_command(assistant):
+    assert open_note(assistant, 'reuniao') == 'Nota aberta: Reunião semanal.md'
+    assert assistant.opened == ['Reunião semanal.md']
+
+
+def test_open_note_command_asks_when_ambiguous_or_fuzzy(assistant):
+    response = open_note(assistant, 'plano')
+    assert 'Qual delas?' in response and 'Arquivo/Plano.md' in response
+
+    response = open_note(assistant, 'reuniao semnal')
+    assert "nao encontrada. Voce quis dizer" in response and 'Reunião semanal.md' in response
+
+    assert assistant.opened == []
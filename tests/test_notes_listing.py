@@ -0,0 +1,76 @@
+"""Testes da listagem de notas: paginação por cursor e streaming NDJSON"""
+
+import json
+import os
+
+import pytest
+
+from conftest import write_notes
+
+
+@pytest.fixture
+def notes(vault):
+    write_notes(vault, {f'Pasta/Nota {i}.md': 'x' * i for i in range(5)})
+    # mtime crescente com o número da nota
+    for i in range(5):
+        path = vault / 'Pasta' / f'Nota {i}.md'
+        os.utime(path, (1_700_000_000 + i, 1_700_000_000 + i))
+    return vault
+
+
+def collect(client, query):
+    pages, url = [], f'/obsidian/notes?{query}'
+    while True:
+        data = client.get(url).get_json()
+        assert data['success']
+        pages.append([note['name'] for note in data['notes']])
+        if not data['next_cursor']:
+            return pages
+        url = f'/obsidian/notes?{query}&cursor={data["next_cursor"]}'
+
+
+def test_unpaginated_listing(client, notes):
+    data = client.get('/obsidian/notes').get_json()
+
+    assert data['count'] == 5
+    assert 'next_cursor' not in data
+
+
+def test_paginate_by_path(client, notes):
+    assert collect(client, 'limit=2') == [['Nota 0', 'Nota 1'], ['Nota 2', 'Nota 3'], ['Nota 4']]
+
+
+def test_paginate_by_mtime(client, notes):
+    assert collect(client, 'limit=3&sort=mtime') == [['Nota 4', 'Nota 3', 'Nota 2'], ['Nota 1', 'Nota 0']]
+    assert collect(client, 'limit=3&sort=mtime&order=asc') == [['Nota 0', 'Nota 1', 'Nota 2'], ['Nota 3', 'Nota 4']]
+
+
+def test_cursor_from_another_sort_is_rejected(client, notes):
+    cursor = client.get('/obsidian/notes?limit=2').get_json()['next_cursor']
+
+    response = client.get(f'/obsidian/notes?limit=2&sort=mtime&cursor={cursor}')
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=abc', 'limit=2.5', 'limit=2&sort=size',
+                                   'limit=2&order=up', 'limit=2&cursor=lixo'])
+def test_invalid_parameters(client, notes, query):
+    assert client.get(f'/obsidian/notes?{query}').status_code == 400
+
+
+def test_huge_limit_is_capped(client, notes):
+    import agent
+
+    assert agent.int_param('100000', None, minimum=0) == 1000
+    data = client.get('/obsidian/notes?limit=100000').get_json()
+    assert data['count'] == 5 and not data['next_cursor']
+
+
+def test_ndjson_streaming(client, notes):
+    response = client.get('/obsidian/notes?format=ndjson')
+
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(note['path'] for note in lines) == [f'Pasta/Nota {i}.md' for i in range(5)]
+    assert {note['size'] for note in lines} == set(range(5))
@@ -0,0 +1,71 @@
+"""Testes do cache de resultados de consultas (normalização, geração e despejo LRU)"""
+
+from conftest import write_notes
+from query_cache import QueryCache, normalize_query
+
+
+def test_normalize_query_collapses_spaces_outside_quotes():
+    assert normalize_query('  a   AND\tb ') == 'a AND b'
+    assert normalize_query('"frase   exata"  x') == '"frase   exata" x'
+
+
+def test_hits_and_misses():
+    cache = QueryCache()
+    assert cache.get('q', 1) is None
+    cache.put('q', 1, ['a'])
+    assert cache.get('q', 1) == ['a']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_new_generation_discards_entries():
+    cache = QueryCache()
+    cache.put('q', 1, ['a'])
+    assert cache.get('q', 2) is None
+    assert cache.stats()['entries'] == 0
+    # Um resultado calculado numa geração antiga não entra mais
+    cache.put('q', 1, ['a'])
+    assert cache.get('q', 2) is None
+
+
+def test_lru_eviction_by_entries():
+    cache = QueryCache(max_entries=2)
+    cache.put('a', 1, 1)
+    cache.put('b', 1, 2)
+    cache.get('a', 1)
+    cache.put('c', 1, 3)
+    assert cache.get('b', 1) is None
+    assert cache.get('a', 1) == 1 and cache.get('c', 1) == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_lru_eviction_by_bytes():
+    cache = QueryCache(max_bytes=4000)
+    for key in 'abcde':
+        cache.put(key, 1, 'x' * 900)
+    stats = cache.stats()
+    assert stats['bytes'] <= 4000
+    assert stats['evictions'] >= 1
+    assert cache.get('a', 1) is None
+    assert cache.get('e', 1) is not None
+
+
+def test_oversized_value_is_not_stored():
+    cache = QueryCache(max_bytes=1000)
+    cache.put('big', 1, 'x' * 500)
+    assert cache.get('big', 1) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_index_search_is_cached_until_a_note_changes(vault, make_index):
+    write_notes(vault, {'Alfa.md': 'projeto cliente', 'Beta.md': 'outro assunto'})
+    index = make_index(vault)
+
+    first = index.search('projeto')
+    assert [r['path'] for r in first['results']] == ['Alfa.md']
+    index.search('  projeto ')
+    assert index.results.stats()['hits'] == 1
+
+    write_notes(vault, {'Beta.md': 'agora também projeto'})
+    index.update_file('Beta.md')
+    assert sorted(r['path'] for r in index.search('projeto')['results']) == ['Alfa.md', 'Beta.md']
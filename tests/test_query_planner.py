@@ -0,0 +1,90 @@
+"""Testes da consulta combinada (QueryPlanner): filtros, ordem do plano, explain e limite"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+from conftest import write_notes
+from obsidian_advanced import ObsidianAdvanced
+from query_planner import parse_since
+
+OLD = datetime(2023, 1, 1).timestamp()
+NEW = datetime(2024, 6, 1).timestamp()
+
+
+@pytest.fixture
+def advanced(vault):
+    notes = {f'Diario/D{i:02}.md': f'registro do dia {i}' for i in range(20)}
+    notes.update({
+        'Projetos/Alfa.md': '#projeto/ativo\nreunião com cliente',
+        'Projetos/Beta.md': '#projeto\nplanejamento interno',
+        'Projetos/Gama.md': '#projeto/ativo\ncliente novo',
+        'Outros/Delta.md': '#projeto/ativo\ncliente antigo',
+    })
+    write_notes(vault, notes)
+    for rel_path in notes:
+        mtime = NEW if rel_path in ('Projetos/Gama.md', 'Outros/Delta.md') else OLD
+        os.utime(vault / rel_path, (mtime, mtime))
+    return ObsidianAdvanced(str(vault))
+
+
+def paths(result):
+    return [r['path'] for r in result['results']]
+
+
+def test_parse_since():
+    assert parse_since('2024-06-01') == NEW
+    assert parse_since(NEW) == NEW
+    with pytest.raises(ValueError):
+        parse_since('ontem')
+
+
+def test_filters_are_combined(advanced):
+    assert paths(advanced.find_notes(folder='Projetos', tag='#projeto/ativo')) == ['Projetos/Alfa.md', 'Projetos/Gama.md']
+    assert paths(advanced.find_notes(tag='#projeto/ativo', text='cliente', modified_since='2024-01-01')) == \
+        ['Outros/Delta.md', 'Projetos/Gama.md']
+    assert paths(advanced.find_notes(folder='Projetos/', text='cliente')) == ['Projetos/Alfa.md', 'Projetos/Gama.md']
+
+
+def test_text_filter_returns_matching_lines(advanced):
+    result = advanced.find_notes(folder='Projetos', text='cliente novo')
+
+    assert paths(result) == ['Projetos/Gama.md']
+    assert result['results'][0]['matches']
+
+
+def test_without_filters_is_an_error(advanced):
+    with pytest.raises(ValueError):
+        advanced.find_notes(folder='/')
+
+
+def test_explain_starts_with_the_most_selective_filter(advanced):
+    result = advanced.find_notes(folder='Diario', tag='#projeto/ativo', explain=True)
+
+    plan = result['plan']
+    assert [step['filter'] for step in plan] == ['tag', 'folder']
+    assert plan[0]['estimate'] <= plan[1]['estimate']
+    # A pasta só vê as notas que restaram da tag, e nenhuma está no Diario
+    assert plan[1]['input'] == plan[0]['rows']
+    assert result['total'] == 0
+    assert 'total_ms' in result
+
+
+def test_limit_keeps_the_total(advanced):
+    result = advanced.find_notes(folder='Diario', limit=5)
+
+    assert result['total'] == 20
+    assert paths(result) == [f'Diario/D{i:02}.md' for i in range(5)]
+
+
+def test_find_endpoint(client, vault):
+    write_notes(vault, {'Projetos/Alfa.md': '#projeto\ncliente', 'Beta.md': '#projeto'})
+
+    response = client.post('/obsidian/advanced/find', json={'folder': 'Projetos', 'tag': '#projeto'})
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 1
+
+    assert client.post('/obsidian/advanced/find', json={}).status_code == 400
+    assert client.post('/obsidian/advanced/find', json={'tag': '#projeto', 'limit': 'x'}).status_code == 400
+    assert client.post('/obsidian/advanced/find', json={'modified_since': 'ontem'}).status_code == 400
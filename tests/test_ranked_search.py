@@ -0,0 +1,61 @@
+"""Testes da busca ranqueada (BM25) com trechos destacados"""
+
+import pytest
+
+from conftest import write_notes
+
+
+@pytest.fixture
+def index(vault, make_index):
+    write_notes(vault, {
+        'Reunião cliente.md': 'Pauta da reunião com o cliente\nPrazo do projeto',
+        'Diário.md': 'Hoje teve reunião.\nNada sobre clientes.\n' + 'texto de enchimento ' * 50,
+        'Projeto.md': '# Cliente\nContrato do cliente e reunião de kickoff',
+        'Outra.md': 'Nada a ver'
+    })
+    return make_index(vault)
+
+
+def test_orders_by_relevance_with_title_boost(index):
+    result = index.ranked_search('reunião cliente')
+
+    assert result['total'] == 3
+    assert [hit['path'] for hit in result['results']][0] == 'Reunião cliente.md'
+    assert result['results'][-1]['path'] == 'Diário.md'
+    scores = [hit['score'] for hit in result['results']]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_snippets_highlight_terms(index):
+    hit = index.ranked_search('contrato')['results'][0]
+
+    assert hit['path'] == 'Projeto.md'
+    assert any('==Contrato==' in match['text'] for match in hit['matches'])
+
+
+def test_limit_keeps_total(index):
+    result = index.ranked_search('reunião', limit=1)
+
+    assert result['total'] == 3
+    assert len(result['results']) == 1
+
+
+def test_operators_restrict_ranked_notes(index):
+    # Termos são comparados por prefixo: -cliente também exclui 'clientes'
+    assert index.ranked_search('reunião -cliente')['total'] == 0
+
+    result = index.ranked_search('reunião -kickoff')
+    assert sorted(hit['path'] for hit in result['results']) == ['Diário.md', 'Reunião cliente.md']
+
+
+def test_no_terms(index):
+    assert index.ranked_search('   ') == {'total': 0, 'results': []}
+
+
+def test_ranked_endpoint(client, vault):
+    write_notes(vault, {'A.md': 'alfa beta', 'B.md': 'alfa alfa alfa'})
+
+    data = client.post('/obsidian/note/search', json={'query': 'alfa', 'ranked': True}).get_json()
+
+    assert data['success']
+    assert [hit['path'] for hit in data['results']] == ['B.md', 'A.md']
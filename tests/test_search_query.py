@@ -0,0 +1,63 @@
+"""Testes das consultas de texto: parser, frases, NEAR/k e operadores booleanos"""
+
+import pytest
+
+from conftest import write_notes
+from search_query import intersect_sorted, near_matches, parse_query, phrase_starts
+
+
+def test_parse_query_tree():
+    assert parse_query('alfa beta') == ('and', [('term', 'alfa', True), ('term', 'beta', True)])
+    assert parse_query('"Reunião Cliente"') == ('phrase', ['reunião', 'cliente'])
+    assert parse_query('a NEAR/3 b') == ('near', ('term', 'a', True), ('term', 'b', True), 3)
+    assert parse_query('a NEAR b')[3] == 5
+    assert parse_query('a OR b -c') == ('or', [('term', 'a', True), ('and', [('term', 'b', True), ('not', ('term', 'c', True))])])
+    assert parse_query('e-mail') == ('phrase', ['e', 'mail'])
+    assert parse_query('(a OR b) c)') == ('and', [('or', [('term', 'a', True), ('term', 'b', True)]), ('term', 'c', True)])
+    assert parse_query('  ') is None
+    # Operadores só em maiúsculas
+    assert parse_query('a or b') == ('and', [('term', 'a', True), ('term', 'or', True), ('term', 'b', True)])
+
+
+def test_sorted_list_helpers():
+    assert intersect_sorted([3, 50, 900], list(range(0, 1000, 3))) == [3, 900]
+    assert phrase_starts([[1, 10, 20], [2, 15, 21], [3, 22]]) == [1, 20]
+    assert near_matches([10, 50], [13, 40, 70], 3) == [10, 13]
+
+
+@pytest.fixture
+def index(vault, make_index):
+    write_notes(vault, {
+        'A.md': 'reunião com o cliente sobre o contrato',
+        'B.md': 'cliente pediu reunião\n\noutro parágrafo',
+        'C.md': 'reunião interna sem ninguém de fora e depois o cliente ligou',
+        'D.md': 'e-mail do cliente',
+    })
+    return make_index(vault)
+
+
+def found(index, query):
+    return [hit['path'] for hit in index.search(query, limit=None)['results']]
+
+
+@pytest.mark.parametrize('query, paths', [
+    ('reunião cliente', ['A.md', 'B.md', 'C.md']),
+    ('"reunião com o cliente"', ['A.md']),
+    ('"cliente reunião"', []),
+    ('reunião NEAR/3 cliente', ['A.md', 'B.md']),
+    ('reunião NEAR/20 cliente', ['A.md', 'B.md', 'C.md']),
+    ('reunião -contrato', ['B.md', 'C.md']),
+    ('contrato OR ligou', ['A.md', 'C.md']),
+    ('(contrato OR ligou) NOT interna', ['A.md']),
+    ('e-mail', ['D.md']),
+    ('"reun"', []),
+    ('reun', ['A.md', 'B.md', 'C.md']),
+])
+def test_search_operators(index, query, paths):
+    assert found(index, query) == paths
+
+
+def test_phrase_match_lines(index):
+    hit = index.search('"pediu reunião"')['results'][0]
+
+    assert [match['line'] for match in hit['matches']] == [1]
@@ -0,0 +1,106 @@
+"""Testes dos segmentos em disco: codificação das postings, round-trip, fusão e corrupção"""
+
+import random
+
+import pytest
+
+from segment_store import (SegmentError, Segment, decode_postings, decode_varints, encode_postings,
+                           merge_segments, write_segment, write_varint)
+
+
+def test_varints():
+    out = bytearray()
+    values = [0, 1, 127, 128, 300, 2 ** 35]
+    for value in values:
+        write_varint(out, value)
+
+    assert decode_varints(bytes(out)) == values
+
+
+def test_postings_round_trip():
+    postings = {3: [0, 5, 9], 10: [200], 700: [1, 100000]}
+    data = bytes(encode_postings(postings))
+
+    assert decode_postings(data) == postings
+    # Só as notas cuja versão atual está no segmento
+    assert decode_postings(data, owners={3: 1, 10: 2, 700: 1}, segment_id=1) == {3: [0, 5, 9], 700: [1, 100000]}
+    # Busca binária por poucas notas em postings grandes
+    many = {doc_id: [doc_id] for doc_id in range(0, 1000, 3)}
+    data = bytes(encode_postings(many))
+    assert decode_postings(data, owners={9: 0, 10: 0}, docs=[9, 10]) == {9: [9]}
+
+
+@pytest.fixture
+def terms():
+    rng = random.Random(7)
+    words = sorted({f'{prefix}{i}' for prefix in ('ação', 'casa', 'cas', 'z') for i in range(40)})
+    return {word: {doc: sorted(rng.sample(range(500), 3)) for doc in rng.sample(range(100), 4)} for word in words}
+
+
+def test_segment_round_trip(tmp_path, terms):
+    segment = write_segment(tmp_path / 'a.seg', terms, segment_id=1)
+    try:
+        read = {term: segment.postings(offset, size) for term, offset, size in segment.iter_terms()}
+        assert read == terms
+        assert [term for term, _, _ in segment.iter_terms('casa1')] == sorted(t for t in terms if t.startswith('casa1'))
+        assert list(segment.iter_terms('ação3')) and not list(segment.iter_terms('inexistente'))
+        term, offset, _ = next(segment.iter_terms('z7'))
+        assert segment.doc_count(offset) == len(terms[term])
+    finally:
+        segment.close()
+
+    reopened = Segment(tmp_path / 'a.seg', segment_id=1)
+    assert sum(1 for _ in reopened.iter_terms()) == len(terms)
+    reopened.close()
+
+
+def test_merge_keeps_current_versions(tmp_path):
+    old = write_segment(tmp_path / 'old.seg', {'alfa': {1: [0], 2: [3]}, 'beta': {1: [1]}}, segment_id=1)
+    new = write_segment(tmp_path / 'new.seg', {'alfa': {2: [7]}, 'gama': {3: [0]}}, segment_id=2)
+    # Nota 2 foi reindexada no segmento 2; nota 1 continua no 1
+    owners = {1: 1, 2: 2, 3: 2}
+
+    merged = merge_segments(tmp_path / 'merged.seg', [old, new], owners, segment_id=3)
+    try:
+        result = {term: merged.postings(offset, size) for term, offset, size in merged.iter_terms()}
+    finally:
+        for segment in (old, new, merged):
+            segment.close()
+
+    assert result == {'alfa': {1: [0], 2: [7]}, 'beta': {1: [1]}, 'gama': {3: [0]}}
+
+
+def test_corruption_is_detected(tmp_path, terms):
+    path = tmp_path / 'a.seg'
+    write_segment(path, terms).close()
+    data = bytearray(path.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(SegmentError):
+        Segment(path)
+
+    path.write_bytes(b'OASG')
+    with pytest.raises(SegmentError):
+        Segment(path)
+
+
+def test_index_reloads_from_segments(vault, make_index):
+    from conftest import write_notes
+
+    write_notes(vault, {f'N{i}.md': f'comum termo{i} "frase exata {i}"' for i in range(30)})
+    index = make_index(vault)
+    with index.lock:
+        index._flush()
+        index.save()
+    assert index.segments
+
+    reloaded = make_index(vault)
+    assert reloaded.search('comum', limit=None)['total'] == 30
+    assert reloaded.search('termo7')['results'][0]['path'] == 'N7.md'
+
+    # Nova versão da nota: as postings antigas no segmento deixam de valer
+    write_notes(vault, {'N7.md': 'conteúdo novo'})
+    reloaded.update_file('N7.md')
+    assert reloaded.search('termo7')['total'] == 0
+    assert reloaded.search('comum', limit=None)['total'] == 29
@@ -0,0 +1,97 @@
+"""Testes do streaming das respostas da IA: leitura de SSE, chat_stream e o endpoint /ai/chat"""
+
+import json
+
+import pytest
+
+import http_pool
+from ai_integration import AIIntegration
+from llm_cache import LLMCache
+
+
+class FakeResponse:
+    def __init__(self, raw: bytes):
+        self.raw = raw
+
+    def iter_lines(self):
+        return iter(self.raw.splitlines())
+
+
+def test_iter_sse_events():
+    raw = ('data: {"a": 1}\n\n'
+           ': comentário\n'
+           'event: content_block_delta\ndata: linha 1\ndata: linha 2\n\n'
+           'data: ação').encode('utf-8')
+
+    assert list(http_pool.iter_sse(FakeResponse(raw))) == [
+        ('message', '{"a": 1}'),
+        ('content_block_delta', 'linha 1\nlinha 2'),
+        ('message', 'ação'),
+    ]
+
+
+@pytest.fixture
+def ai(tmp_path):
+    integration = AIIntegration()
+    integration.config_path = str(tmp_path / 'ai_config.json')
+    integration.cache = LLMCache(str(tmp_path / 'llm_cache.db'))
+    for name in ('openai', 'groq'):
+        integration.providers[name].update({'enabled': True, 'api_key': 'k'})
+    integration.active_provider = 'openai'
+    integration.fallback_providers = ['groq']
+    return integration
+
+
+def chunks(*texts, error=None):
+    yield from texts
+    if error:
+        raise RuntimeError(error)
+
+
+def test_chat_stream_falls_back_before_the_first_token(ai, monkeypatch):
+    streams = {'openai': lambda: chunks(error='OpenAI error: 500'), 'groq': lambda: chunks('Olá', ', mundo')}
+    monkeypatch.setattr(ai, '_stream_with_provider', lambda name, *args: streams[name]())
+
+    events = list(ai.chat_stream('oi'))
+
+    assert [e['type'] for e in events] == ['start', 'token', 'token', 'done']
+    assert events[0]['provider'] == 'groq'
+    assert events[-1]['response'] == 'Olá, mundo'
+
+
+def test_chat_stream_error_after_first_token_keeps_partial_text(ai, monkeypatch):
+    monkeypatch.setattr(ai, '_stream_with_provider', lambda name, *args: chunks('parcial', error='conexão caiu'))
+
+    events = list(ai.chat_stream('oi'))
+
+    assert events[-1]['type'] == 'error'
+    assert events[-1]['provider'] == 'openai'
+    assert events[-1]['response'] == 'parcial'
+
+
+def test_chat_stream_serves_cached_answer(ai, monkeypatch):
+    monkeypatch.setattr(ai, '_stream_with_provider', lambda name, *args: chunks('resposta'))
+    list(ai.chat_stream('oi'))
+
+    events = list(ai.chat_stream('oi'))
+
+    assert events[0]['cached'] and events[-1]['response'] == 'resposta'
+
+
+def test_ai_chat_endpoint_streams_events(client, monkeypatch):
+    import agent
+
+    def fake_stream(message, context, provider=None, use_cache=True):
+        yield {'type': 'start', 'provider': 'groq'}
+        yield {'type': 'token', 'text': 'ção'}
+        yield {'type': 'done', 'success': True, 'response': 'ção'}
+
+    monkeypatch.setattr(agent, 'chat_with_ai_stream', fake_stream)
+
+    response = client.post('/ai/chat', json={'message': 'oi', 'stream': True})
+
+    assert response.mimetype == 'text/event-stream'
+    events = [(event, json.loads(data)) for event, data in
+              http_pool.iter_sse(FakeResponse(response.get_data()))]
+    assert [event for event, _ in events] == ['start', 'token', 'done']
+    assert events[1][1] == {'text': 'ção'}
@@ -0,0 +1,60 @@
+"""Testes da extração de tags inline e do TagIndex (tags hierárquicas e expressões)"""
+
+import pytest
+
+from conftest import write_notes
+from note_analyzer import find_inline_tags
+from tag_index import iter_bits
+
+
+@pytest.mark.parametrize('text, tags', [
+    ('#projeto e #projeto/sub-tarefa', ['projeto', 'projeto/sub-tarefa']),
+    ('Acentos: #ação #revisão', ['ação', 'revisão']),
+    ('Veja [[Gamma#Intro]] e [[Nota#Seção|alias]]', []),
+    ('![[Alpha#Seção Dois]] #real', ['real']),
+    ('[link](Nota.md#secao) e [ancora](#topo)', []),
+    ('`#codigo` fora #tag', ['tag']),
+    ('issue#12, pagina#secao, ##duplo', []),
+    ('#2024 não é tag, #v2024 é', ['v2024']),
+    ('(#entre) parênteses', ['entre']),
+])
+def test_find_inline_tags(text, tags):
+    assert find_inline_tags(text) == tags
+
+
+def tagged(index, expression):
+    tags = index.indexers['tags']
+    return sorted(index.paths[doc_id] for doc_id in iter_bits(tags.query(expression)))
+
+
+@pytest.fixture
+def index(vault, make_index):
+    write_notes(vault, {
+        'Alpha.md': '---\ntags: [frontmatter]\n---\n# Alpha\n#projeto/trabalho e #ação',
+        'Beta.md': '#projeto/pessoal #urgente\nLink [[Alpha#Alpha]]',
+        'Gamma.md': 'Sem tags, só ![[Beta#Seção Dois]] e [[Alpha#Intro]]'
+    })
+    return make_index(vault)
+
+
+def test_wikilink_fragments_are_not_tags(index):
+    counts = index.indexers['tags'].counts()
+
+    assert set(counts) == {'frontmatter', 'projeto', 'projeto/trabalho', 'projeto/pessoal', 'ação', 'urgente'}
+    assert tagged(index, '#Intro') == []
+    assert tagged(index, '#Alpha') == []
+
+
+def test_hierarchical_queries(index):
+    assert tagged(index, '#projeto') == ['Alpha.md', 'Beta.md']
+    assert tagged(index, '#projeto/trabalho') == ['Alpha.md']
+    assert tagged(index, '#projeto AND #urgente') == ['Beta.md']
+    assert tagged(index, '#frontmatter OR #urgente') == ['Alpha.md', 'Beta.md']
+    assert tagged(index, 'NOT #projeto') == ['Gamma.md']
+    assert tagged(index, '#projeto -(#ação)') == ['Beta.md']
+    assert tagged(index, '#AÇÃO') == ['Alpha.md']
+
+
+def test_invalid_expression(index):
+    with pytest.raises(ValueError):
+        index.indexers['tags'].query('(#projeto')
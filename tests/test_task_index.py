@@ -0,0 +1,86 @@
+"""Testes do TaskIndex: datas, tags e filtros das tarefas do vault"""
+
+import pytest
+
+from conftest import write_notes
+from task_index import build_task
+
+
+def test_build_task_dates_and_tags():
+    task = build_task('Nota.md', {
+        'line': 3, 'done': False,
+        'text': 'enviar proposta 📅 2025-01-15 ⏳ 2025-01-10 #cliente/acme [[Cliente#Contato]]'
+    })
+
+    assert task['due'] == '2025-01-15'
+    assert task['scheduled'] == '2025-01-10'
+    assert task['completed'] is None
+    assert task['tags'] == ['cliente/acme']
+
+    task = build_task('Nota.md', {'line': 1, 'done': True, 'text': 'feita due:: 2025-02-01 completion:: 2025-02-02'})
+    assert (task['due'], task['completed']) == ('2025-02-01', '2025-02-02')
+
+
+@pytest.fixture
+def index(vault, make_index):
+    write_notes(vault, {
+        'Projetos/Alfa.md': '- [ ] proposta 📅 2025-01-15 #cliente\n- [x] kickoff 📅 2025-01-02\n- [ ] sem data #cliente/acme',
+        'Pessoal.md': '- [ ] médico 📅 2025-01-10\n  - [ ] subtarefa #saude',
+    })
+    return make_index(vault)
+
+
+def texts(result):
+    return [task['text'].split()[0] for task in result['tasks']]
+
+
+def test_query_filters(index):
+    tasks = index.indexers['tasks']
+
+    assert tasks.counts() == {'open': 4, 'done': 1}
+    assert texts(tasks.query()) == ['médico', 'proposta', 'subtarefa', 'sem']
+    assert texts(tasks.query(status='done')) == ['kickoff']
+    assert texts(tasks.query(status='all', due_before='2025-01-10')) == ['kickoff', 'médico']
+    assert texts(tasks.query(tag='cliente')) == ['proposta', 'sem']
+    assert texts(tasks.query(folder='Projetos', status='all')) == ['kickoff', 'proposta', 'sem']
+
+    page = tasks.query(limit=2, offset=1)
+    assert page['total'] == 4
+    assert texts(page) == ['proposta', 'subtarefa']
+
+    with pytest.raises(ValueError):
+        tasks.query(status='todas')
+
+
+def test_update_and_remove(vault, index):
+    tasks = index.indexers['tasks']
+
+    write_notes(vault, {'Pessoal.md': '- [x] médico 📅 2025-01-10'})
+    index.update_file('Pessoal.md')
+    assert tasks.counts() == {'open': 2, 'done': 2}
+
+    index.remove_file('Projetos/Alfa.md')
+    assert tasks.counts() == {'open': 0, 'done': 1}
+    assert tasks.query(status='all', due_before='2025-12-31')['total'] == 1
+
+
+def test_tasks_endpoint(client, vault):
+    write_notes(vault, {'A.md': '- [ ] ler 📅 2025-01-15\n- [x] feito'})
+
+    data = client.get('/obsidian/advanced/tasks?status=all').get_json()
+    assert data['count'] == 2
+    assert client.get('/obsidian/advanced/tasks?status=x').status_code == 400
+
+
+@pytest.mark.parametrize('query', ['limit=abc', 'offset=1.5', 'limit=&offset=0'])
+def test_tasks_endpoint_rejects_non_numeric_paging(client, vault, query):
+    write_notes(vault, {'A.md': '- [ ] ler'})
+
+    assert client.get(f'/obsidian/advanced/tasks?{query}').status_code == 400
+
+
+def test_tasks_endpoint_bounds_paging(client, vault):
+    write_notes(vault, {'A.md': '- [ ] um\n- [ ] dois\n- [ ] três'})
+
+    assert client.get('/obsidian/advanced/tasks?limit=0').get_json()['count'] == 1
+    assert client.get('/obsidian/advanced/tasks?offset=-2').get_json()['count'] == 3
@@ -0,0 +1,175 @@
+"""Testes do índice invertido do vault: busca, persistência e atualização incremental"""
+
+import pytest
+
+from conftest import write_notes
+
+
+def paths(result):
+    return [hit['path'] for hit in result['results']]
+
+
+def test_search_finds_notes_by_prefix(vault, make_index):
+    write_notes(vault, {
+        'Alpha.md': 'Reunião sobre arquitetura do índice',
+        'Projetos/Beta.md': 'Arquitetura de plugins',
+        'Gamma.md': 'Lista de compras'
+    })
+    index = make_index(vault)
+
+    result = index.search('arquitet')
+
+    assert result['total'] == 2
+    assert paths(result) == ['Alpha.md', 'Projetos/Beta.md']
+    assert result['results'][0]['matches'][0]['line'] == 1
+
+
+def test_search_limit(vault, make_index):
+    write_notes(vault, {f'Nota {i}.md': 'termo comum' for i in range(5)})
+    index = make_index(vault)
+
+    result = index.search('comum', limit=2)
+
+    assert result['total'] == 5
+    assert len(result['results']) == 2
+
+
+def test_index_persists_between_instances(vault, make_index):
+    write_notes(vault, {'Alpha.md': 'conteúdo persistente'})
+    make_index(vault).save()
+
+    reloaded = make_index(vault)
+
+    assert reloaded.refresh(force=True) == {'updated': 0, 'removed': 0}
+    assert paths(reloaded.search('persistente')) == ['Alpha.md']
+
+
+def test_update_and_remove_file(vault, make_index):
+    write_notes(vault, {'Alpha.md': 'primeira versão'})
+    index = make_index(vault)
+
+    write_notes(vault, {'Alpha.md': 'segunda versão', 'Sub/Beta.md': 'nota nova'})
+    assert index.update_file('Alpha.md')
+    assert index.update_file('Sub/Beta.md')
+
+    assert index.search('primeira')['total'] == 0
+    assert paths(index.search('segunda')) == ['Alpha.md']
+    assert paths(index.search('nova')) == ['Sub/Beta.md']
+
+    index.remove_file('Sub/Beta.md')
+    assert index.search('nova')['total'] == 0
+    assert 'Sub/Beta.md' not in index.files
+
+
+def test_refresh_detects_deleted_notes(vault, make_index):
+    write_notes(vault, {'Alpha.md': 'alpha', 'Beta.md': 'beta'})
+    index = make_index(vault)
+
+    (vault / 'Beta.md').unlink()
+
+    assert index.refresh(force=True) == {'updated': 0, 'removed': 1}
+    assert index.search('beta')['total'] == 0
+
+
+def test_workers_are_capped_at_available_cpus(vault, make_index, monkeypatch):
+    import vault_index
+
+    monkeypatch.setattr(vault_index, 'available_cpus', lambda: 1)
+    assert make_index(vault, workers=8).workers == 1
+    assert make_index(vault).workers == 1
+
+    monkeypatch.setattr(vault_index, 'available_cpus', lambda: 4)
+    assert make_index(vault, workers=8).workers == 4
+    assert make_index(vault, workers=2).workers == 2
+
+
+def test_parallel_build_matches_sequential(vault, tmp_path, monkeypatch, caplog):
+    import vault_index
+    from conftest import vault_indexers
+
+    write_notes(vault, {
+        f'pasta{i % 3}/nota{i}.md': f'# Nota {i}\ntermo{i % 5} comum [[nota{(i + 1) % 40}]] #tag{i % 4}'
+        for i in range(40)
+    })
+    monkeypatch.setattr(vault_index, 'available_cpus', lambda: 2)
+    monkeypatch.setattr(vault_index.VaultIndex, 'PARALLEL_THRESHOLD', 8)
+    monkeypatch.setattr(vault_index.VaultIndex, 'BULK_THRESHOLD', 8)
+    monkeypatch.setattr(vault_index.VaultIndex, 'CHUNK_SIZE', 4)
+
+    def build(name, workers):
+        index_dir = tmp_path / name
+        index_dir.mkdir()
+        index = vault_index.VaultIndex(str(vault), index_dir=str(index_dir), workers=workers,
+                                       indexers=vault_indexers(index_dir))
+        assert index.refresh(force=True)['updated'] == 40
+        return index
+
+    sequential, parallel = build('seq', 1), build('par', 2)
+    assert 'Pool de processos indisponível' not in caplog.text
+    assert parallel.vocabulary == sorted(parallel.vocabulary)
+
+    for query in ('comum', 'termo3', '"nota 7"', 'nota'):
+        assert paths(parallel.search(query, limit=None)) == paths(sequential.search(query, limit=None))
+    assert parallel.indexers['tags'].counts() == sequential.indexers['tags'].counts()
+    assert parallel.indexers['completions'].entries == sequential.indexers['completions'].entries
+
+
+def test_parallel_build_does_not_block_readers(vault, tmp_path, monkeypatch):
+    import threading
+    import vault_index
+    from conftest import vault_indexers
+
+    write_notes(vault, {f'nota{i}.md': f'termo comum {i}' for i in range(24)})
+    monkeypatch.setattr(vault_index, 'available_cpus', lambda: 2)
+    monkeypatch.setattr(vault_index.VaultIndex, 'PARALLEL_THRESHOLD', 8)
+    monkeypatch.setattr(vault_index.VaultIndex, 'BULK_THRESHOLD', 8)
+    monkeypatch.setattr(vault_index.VaultIndex, 'CHUNK_SIZE', 4)
+
+    index = vault_index.VaultIndex(str(vault), index_dir=str(tmp_path / 'index'), workers=2,
+                                   indexers=vault_indexers(tmp_path))
+    answered = []
+
+    class ReaderCheckingExecutor(vault_index.ProcessPoolExecutor):
+        """Entre um lote e outro, uma consulta em outra thread precisa responder"""
+
+        def map(self, fn, *iterables):
+            for results in super().map(fn, *iterables):
+                reader = threading.Thread(target=lambda: answered.append(index.search('comum')['total']))
+                reader.start()
+                reader.join(timeout=5)
+                assert not reader.is_alive()
+                yield results
+
+    monkeypatch.setattr(vault_index, 'ProcessPoolExecutor', ReaderCheckingExecutor)
+
+    assert index.refresh(force=True)['updated'] == 24
+    # Consultas durante a reconstrução veem o índice parcial, crescendo lote a lote
+    assert answered == sorted(answered) and answered[0] < 24
+    assert index.search('comum')['total'] == 24
+
+
+def test_vault_stats_come_from_the_index(vault, make_index, monkeypatch):
+    from obsidian_advanced import ObsidianAdvanced
+
+    write_notes(vault, {
+        'Alfa.md': '---\ntags: [projeto]\n---\nUma nota com [[Beta]] e [[Beta|de novo]] #ideia',
+        'Beta.md': 'Três palavras aqui',
+        'Pasta/Gama.md': '#ideia [[Alfa]] [[Fantasma]]',
+    })
+    index = make_index(vault)
+    index.save()
+    expected = {
+        'total_notes': 3, 'total_words': 14, 'total_links': 3, 'total_tags': 2,
+        'tags': ['ideia', 'projeto'], 'avg_words_per_note': 4
+    }
+
+    # Nenhuma nota é reanalisada: vaults maiores que o NoteCache não o esvaziam
+    monkeypatch.setattr(ObsidianAdvanced, 'analyze_note', lambda self, path: pytest.fail(path))
+    assert ObsidianAdvanced(str(vault), index=index).get_vault_stats() == expected
+    assert ObsidianAdvanced(str(vault), index=make_index(vault)).get_vault_stats() == expected
+
+    write_notes(vault, {'Beta.md': 'agora só duas'})
+    index.update_file('Beta.md')
+    index.remove_file('Pasta/Gama.md')
+    stats = ObsidianAdvanced(str(vault), index=index).get_vault_stats()
+    assert (stats['total_notes'], stats['total_words'], stats['total_links']) == (2, 11, 1)
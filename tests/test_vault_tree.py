@@ -0,0 +1,113 @@
+"""Testes da árvore de notas da API REST do Obsidian (listagem concorrente de pastas em cache)"""
+
+import threading
+
+import pytest
+
+from intelligent_agent import ObsidianAPI
+
+TREE = {
+    '': ['Raiz.md', 'Projetos/', 'Diário/', 'imagem.png'],
+    'Projetos': ['Alfa.md', 'Clientes/'],
+    'Projetos/Clientes': ['Beta.md'],
+    'Diário': ['2025-01-10.md'],
+}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """ObsidianAPI sem vault local, com a listagem de pastas simulada"""
+    api = ObsidianAPI({'paths': {'vault': ''}})
+    calls = []
+    lock = threading.Lock()
+
+    def list_notes(folder=''):
+        with lock:
+            calls.append(folder)
+        if folder == 'Diário' and api.fail_diary:
+            raise ConnectionError('falhou')
+        return {'files': TREE[folder]}
+
+    api.fail_diary = False
+    api.calls = calls
+    monkeypatch.setattr(api, 'list_notes', list_notes)
+    return api
+
+
+def test_tree_lists_all_folders(api):
+    assert api._get_all_notes() == ['Diário/2025-01-10.md', 'Projetos/Alfa.md', 'Projetos/Clientes/Beta.md', 'Raiz.md']
+    assert sorted(api.calls) == sorted(TREE)
+    assert api._get_all_notes('Projetos') == ['Projetos/Alfa.md', 'Projetos/Clientes/Beta.md']
+
+
+def test_tree_is_cached_until_ttl_or_invalidation(api, monkeypatch):
+    version, _ = api._vault_tree()
+    api._get_all_notes()
+    assert len(api.calls) == len(TREE)
+    assert api._vault_tree()[0] == version
+
+    api.invalidate_tree()
+    assert api._vault_tree()[0] == version + 1
+    assert len(api.calls) == 2 * len(TREE)
+
+    monkeypatch.setattr(ObsidianAPI, 'TREE_TTL', -1)
+    assert api._vault_tree()[0] == version + 2
+
+
+def test_failed_folder_is_skipped(api):
+    api.fail_diary = True
+
+    assert api._get_all_notes() == ['Projetos/Alfa.md', 'Projetos/Clientes/Beta.md', 'Raiz.md']
+
+
+def test_remote_name_index_follows_tree(api):
+    assert api.search_notes('beta') == ['Projetos/Clientes/Beta.md']
+    assert api.get_vault_stats()['total_notes'] == 4
+
+
+def test_partial_tree_is_not_cached(api):
+    api.fail_diary = True
+    version, notes = api._vault_tree()
+    assert 'Diário/2025-01-10.md' not in notes
+
+    # A próxima chamada lista de novo em vez de servir a árvore parcial até o TTL
+    api.fail_diary = False
+    version, notes = api._vault_tree()
+    assert 'Diário/2025-01-10.md' in notes
+    assert len(api.calls) == 2 * len(TREE)
+    assert api._vault_tree()[0] == version
+
+
+def test_list_notes_raises_when_the_api_fails(monkeypatch):
+    api = ObsidianAPI({'paths': {'vault': ''}})
+    monkeypatch.setattr(api, '_request', lambda method, endpoint, **kwargs: None)
+
+    with pytest.raises(ConnectionError):
+        api.list_notes('Projetos')
+
+
+def test_folder_workers_do_not_outlive_the_listing(api):
+    api._vault_tree()
+
+    assert not [t for t in threading.enumerate() if t.name.startswith('obsidian-tree')]
+
+
+@pytest.mark.parametrize('method, endpoint, status, invalidates', [
+    ('POST', '/commands/daily-notes', 204, True),
+    ('PUT', '/vault/Nova.md', 204, True),
+    ('DELETE', '/vault/Velha.md', 204, True),
+    ('POST', '/commands/daily-notes', 404, False),
+    ('GET', '/vault/', 200, False),
+    ('POST', '/open/Raiz.md', 200, False),
+])
+def test_writes_invalidate_the_tree(api, monkeypatch, method, endpoint, status, invalidates):
+    import intelligent_agent
+
+    monkeypatch.setattr(intelligent_agent.requests, 'request',
+                        lambda *args, **kwargs: type('Response', (), {'status_code': status})())
+    monkeypatch.setattr(intelligent_agent, 'log_activity', lambda *args: None)
+    version, _ = api._vault_tree()
+
+    api._request(method, endpoint)
+
+    assert (api._vault_tree()[0] != version) == invalidates
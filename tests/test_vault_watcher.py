@@ -0,0 +1,120 @@
+"""Testes do VaultWatcher: eventos publicados para criação, alteração, renomeação e remoção"""
+
+import os
+import time
+
+import pytest
+
+import vault_watcher
+from conftest import write_notes
+from vault_watcher import CREATED, DELETED, MODIFIED, MOVED, VaultWatcher
+
+
+@pytest.fixture
+def watched(vault, make_index):
+    """Watcher (sem threads) sobre um índice já sincronizado e a lista de eventos publicados"""
+    write_notes(vault, {'Alpha.md': 'nota existente'})
+    watcher = VaultWatcher(make_index(vault), use_polling=True)
+    events = []
+    watcher.add_listener(lambda action, path, dest: events.append((action, path, dest)))
+    return watcher, events
+
+
+def touch(path, content):
+    path.write_text(content, encoding='utf-8')
+    # Garante assinatura (mtime, tamanho) diferente mesmo em sistemas de arquivos de baixa resolução
+    st = path.stat()
+    os.utime(path, (st.st_atime, st.st_mtime + 1))
+
+
+def test_external_create_publishes_single_event(watched, vault):
+    watcher, events = watched
+
+    # O editor cria o arquivo vazio e logo depois grava o conteúdo
+    (vault / 'Nova.md').write_text('', encoding='utf-8')
+    watcher.handle(CREATED, 'Nova.md')
+    touch(vault / 'Nova.md', 'conteúdo da nota nova')
+    watcher.handle(MODIFIED, 'Nova.md')
+
+    assert events == [(CREATED, 'Nova.md', None)]
+    assert watcher.index.search('conteúdo')['total'] == 1
+
+
+def test_modification_after_window_is_published(watched, vault):
+    watcher, events = watched
+    watcher.COALESCE_WINDOW = 0.0
+
+    (vault / 'Nova.md').write_text('', encoding='utf-8')
+    watcher.handle(CREATED, 'Nova.md')
+    touch(vault / 'Nova.md', 'texto')
+    watcher.handle(MODIFIED, 'Nova.md')
+
+    assert events == [(CREATED, 'Nova.md', None), (MODIFIED, 'Nova.md', None)]
+
+
+def test_unchanged_file_publishes_nothing(watched):
+    watcher, events = watched
+
+    watcher.handle(MODIFIED, 'Alpha.md')
+
+    assert events == []
+
+
+def test_existing_note_modification(watched, vault):
+    watcher, events = watched
+
+    touch(vault / 'Alpha.md', 'nota alterada')
+    watcher.handle(MODIFIED, 'Alpha.md')
+
+    assert events == [(MODIFIED, 'Alpha.md', None)]
+    assert watcher.index.search('alterada')['total'] == 1
+
+
+def test_resync_detects_rename_and_delete(watched, vault):
+    watcher, events = watched
+    write_notes(vault, {'Beta.md': 'outra nota'})
+    watcher.index.refresh(force=True)
+
+    os.rename(vault / 'Alpha.md', vault / 'Renomeada.md')
+    (vault / 'Beta.md').unlink()
+    watcher.resync()
+
+    assert events == [(MOVED, 'Alpha.md', 'Renomeada.md'), (DELETED, 'Beta.md', None)]
+    assert 'Renomeada.md' in watcher.index.files
+    assert 'Beta.md' not in watcher.index.files
+
+
+def test_concurrent_handling_publishes_one_creation(watched, vault, monkeypatch):
+    import threading
+
+    watcher, events = watched
+    (vault / 'Nova.md').write_text('conteúdo', encoding='utf-8')
+    update_file = watcher.index.update_file
+
+    def slow_update(*args):
+        time.sleep(0.1)
+        return update_file(*args)
+
+    monkeypatch.setattr(watcher.index, 'update_file', slow_update)
+    # O agente (index_note) e o observador tratam a mesma nota nova ao mesmo tempo
+    threads = [threading.Thread(target=watcher.handle, args=(action, 'Nova.md')) for action in (MODIFIED, CREATED)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert events == [(CREATED, 'Nova.md', None)]
+
+def test_api_create_publishes_event_while_watching(client, vault):
+    events = []
+    watcher = vault_watcher.start_watcher(str(vault))
+    watcher.add_listener(lambda action, path, dest: events.append((action, path, dest)))
+    try:
+        response = client.post('/obsidian/note/create', json={'title': 'Pela API', 'content': 'texto'})
+        assert response.status_code == 200
+        # Eventos do sistema de arquivos que chegam depois não duplicam a criação
+        time.sleep(0.5)
+    finally:
+        vault_watcher.stop_watchers()
+
+    assert events == [(CREATED, 'Pela API.md', None)]